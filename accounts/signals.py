@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from accounts.models import CustomUser, SiteGroup
+from app.dal.auth.repo import CachedUserRepository, CachedSiteGroupRepository
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_users(sender, using, **kwargs):
+    # Сброс после фиксации, иначе параллельный запрос закеширует старые строки под новым поколением
+    transaction.on_commit(CachedUserRepository(None).invalidate, using=using)
+
+
+@receiver([post_save, post_delete], sender=SiteGroup)
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def invalidate_site_groups(sender, using, **kwargs):
+    transaction.on_commit(CachedSiteGroupRepository(None).invalidate, using=using)
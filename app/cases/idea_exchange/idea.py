@@ -10,6 +10,7 @@ from app.domain.idea_exchange.types import IdeaID, ChainID
 from app.exceptions.auth import PermissionDenied
 from app.exceptions.idea_exchange import IdeaIsNotEdiatable, HasNoPermissions
 from app.framework.data_access_layer.order_object.values import ASC
+from app.framework.data_access_layer.pagination import Page
 
 
 class IdeaCase:
@@ -18,7 +19,11 @@ class IdeaCase:
         self.idea_uow = uow_cls()
         self.chain_uow = chain_uow_class()
 
-    def user_ideas(self, author_id, offset: int = 0, limit: Optional[int] = None) -> list[IdeaUoDto]:
+    def user_ideas_page(self, author_id, after: Optional[str] = None, limit: int = 20) -> Page[IdeaUoDto]:
+        """
+        Страница идей пользователя для бесконечной прокрутки, следующая страница запрашивается
+        по next_cursor предыдущей
+        """
         with self.idea_uow:
             idea_qo = IdeaQO(
                 author_id=UserID(author_id),
@@ -26,15 +31,23 @@ class IdeaCase:
             idea_oo = IdeaOO(
                 created_at=ASC()
             )
-            ideas = self.idea_uow.fetch_ideas(idea_qo, idea_oo, offset=offset, limit=limit)
-            return [self.idea_uow.convert_idea_to_output(i) for i in ideas]
+            page = self.idea_uow.fetch_ideas_page(idea_qo, idea_oo, after=after, limit=limit)
+            return Page(
+                items=[self.idea_uow.convert_idea_to_output(i) for i in page.items],
+                next_cursor=page.next_cursor
+            )
 
-    def fetch_idea(self, idea_uid: str) -> IdeaUoDto:
+    def fetch_idea(self, idea_uid: str) -> Optional[IdeaUoDto]:
+        """
+        :return: None, если идеи нет
+        """
         with self.idea_uow:
             idea_qo = IdeaQO(
                 idea_uid=idea_uid
             )
             idea = self.idea_uow.fetch_idea(idea_qo)
+            if idea is None:
+                return None
             return self.idea_uow.convert_idea_to_output(idea)
 
 
@@ -119,3 +132,6 @@ class ChainCase:
             chains_ids = self.chain_uow.fetch_chains(chain_qo)
         return chains_ids
 
+    def fetch_chain_choices(self) -> list[tuple[ChainID, str]]:
+        # Read-модель без сущностей: транзакция не нужна, а при попадании в кеш запросов в базу нет совсем
+        return self.chain_uow.fetch_chain_choices()
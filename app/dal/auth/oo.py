@@ -1,9 +1,13 @@
+from dataclasses import dataclass
+
 from app.framework.data_access_layer.order_object.base import ABSOrderObject
 
 
+@dataclass(frozen=True, slots=True)
 class UserOO(ABSOrderObject):
     pass
 
 
+@dataclass(frozen=True, slots=True)
 class SiteGroupOO(ABSOrderObject):
     pass
@@ -7,12 +7,12 @@ from app.framework.data_access_layer.query_object.values import QueryParamCompar
 from app.framework.data_access_layer.values import Empty
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UserQO(ABSQueryObject):
     user_id: Optional[Union[UserID, QueryParamComparison, Empty]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SiteGroupQO(ABSQueryObject):
     group_id: Optional[Union[GroupID, QueryParamComparison, Empty]] = Empty()
 
@@ -2,7 +2,10 @@ from accounts.models import CustomUser, SiteGroup
 from app.dal.auth.dto import SiteGroupDalDto
 from app.domain.auth.core import User
 from app.domain.auth.core import UserID, GroupID
-from app.framework.data_access_layer.vendor.django.repository import DjangoRepository, OoOrmMapperLine, QoOrmMapperLine
+from app.framework.data_access_layer.vendor.django.caching_repository import DjangoCachingRepository
+from app.framework.data_access_layer.vendor.django.repository import DjangoRepository, OoOrmMapperLine, \
+    QoOrmMapperLine, M2MOrmMapperLine
+from app.framework.injector.main import inject
 
 
 class UserRepository(DjangoRepository):
@@ -38,12 +41,19 @@ class SiteGroupRepository(DjangoRepository):
         return SiteGroupDalDto(
             group_id=GroupID(orm_model.id),
             name=orm_model.name,
-            users_ids_in_group=list(CustomUser.groups.through.objects.filter(sitegroup_id=orm_model.id).values_list('customuser_id', flat=True))
+            users_ids_in_group=[UserID(i) for i in orm_model.users_ids_in_group]
         )
 
     def _dto_to_orm(self, dto: SiteGroupDalDto) -> SiteGroup:
         pass
 
+    @property
+    def _m2m_orm_fields_mapping(self) -> list[M2MOrmMapperLine]:
+        return [
+            M2MOrmMapperLine(orm_field_name='customuser',
+                             attr_name='users_ids_in_group')
+        ]
+
     @property
     def _qo_orm_fields_mapping(self) -> list[QoOrmMapperLine]:
         return [
@@ -55,3 +65,17 @@ class SiteGroupRepository(DjangoRepository):
     @property
     def _oo_orm_fields_mapping(self) -> list[OoOrmMapperLine]:
         return []
+
+
+class CachedUserRepository(DjangoCachingRepository):
+
+    repository_cls = UserRepository
+    cache_factory = inject('Cache')
+    ttl = 60
+
+
+class CachedSiteGroupRepository(DjangoCachingRepository):
+
+    repository_cls = SiteGroupRepository
+    cache_factory = inject('Cache')
+    ttl = 60
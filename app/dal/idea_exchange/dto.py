@@ -18,6 +18,7 @@ class IdeaDalDto(IDTO):
     is_deleted: bool
     created_at: datetime
     updated_at: datetime
+    version: int
 
 
 @dataclass
@@ -29,6 +30,15 @@ class ChainDalDto(IDTO):
     is_deleted: bool
     created_at: datetime
     updated_at: datetime
+    version: int
+
+
+@dataclass(slots=True)
+class ChainIdDalDto(IDTO):
+    """
+    Проекция ChainDalDto, когда нужен только id, например для списка выбора цепочки
+    """
+    chain_id: ChainID
 
 
 @dataclass
@@ -49,3 +59,4 @@ class ChainLinkDalDto(IDTO):
     chain_id: ChainID
     number_of_related_ideas: int
     is_deleted: bool
+    version: int
@@ -6,27 +6,27 @@ from app.framework.data_access_layer.order_object.values import OrderParamCompar
 from app.framework.data_access_layer.values import Empty
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class IdeaOO(ABSOrderObject):
     created_at: Optional[Union[str, Empty, OrderParamComparison]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChainOO(ABSOrderObject):
     created_at: Optional[Union[str, Empty, OrderParamComparison]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActorOO(ABSOrderObject):
     created_at: Optional[Union[str, Empty, OrderParamComparison]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChainLinkOO(ABSOrderObject):
     created_at: Optional[Union[str, Empty, OrderParamComparison]] = Empty()
     order: Optional[Union[str, Empty, OrderParamComparison]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ManagerOO(ABSOrderObject):
     pass
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional, Union
 
 from app.domain.auth.core import UserID
@@ -8,7 +9,7 @@ from app.framework.data_access_layer.query_object.values import QueryParamCompar
 from app.framework.data_access_layer.values import Empty
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class IdeaQO(ABSQueryObject):
     name: Optional[Union[str, Empty, QueryParamComparison[str]]] = Empty()
     chain_id: Optional[Union[ChainID, Empty, QueryParamComparison[ChainID]]] = Empty()
@@ -17,9 +18,11 @@ class IdeaQO(ABSQueryObject):
     author_id: Optional[Union[UserID, Empty, QueryParamComparison[UserID]]] = Empty()
     current_chain_link_id: Optional[Union[ChainLinkID, Empty, QueryParamComparison[ChainLinkID]]] = Empty()
     is_deleted: Optional[Union[bool, Empty, QueryParamComparison[bool]]] = Empty()
+    created_at: Optional[Union[datetime, Empty, QueryParamComparison[datetime]]] = Empty()
+    updated_at: Optional[Union[datetime, Empty, QueryParamComparison[datetime]]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChainQO(ABSQueryObject):
     chain_id: Optional[Union[ChainID, Empty, QueryParamComparison[ChainID]]] = Empty()
     author_id: Optional[Union[UserID, Empty, QueryParamComparison[UserID]]] = Empty()
@@ -28,7 +31,7 @@ class ChainQO(ABSQueryObject):
     is_deleted: Optional[Union[bool, Empty, QueryParamComparison[bool]]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChainLinkQO(ABSQueryObject):
     chain_link_id: Optional[Union[ChainLinkID, Empty, QueryParamComparison[ChainLinkID]]] = Empty()
     chain_id: Optional[Union[ChainID, Empty, QueryParamComparison[ChainID]]] = Empty()
@@ -37,22 +40,22 @@ class ChainLinkQO(ABSQueryObject):
     is_deleted: Optional[Union[bool, Empty, QueryParamComparison[bool]]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AuthorQO(ABSQueryObject):
     author_id: Optional[Union[UserID, Empty, QueryParamComparison[UserID]]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChainEditorQO(ABSQueryObject):
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ManagerQO(ABSQueryObject):
     user_id: Optional[Union[UserID, QueryParamComparison[UserID], Empty]] = Empty()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActorQO(ABSQueryObject):
     actor_id: Optional[Union[ActorID, Empty, QueryParamComparison[ActorID]]] = Empty()
     name: Optional[Union[str, Empty, QueryParamComparison[str]]] = Empty()
\ No newline at end of file
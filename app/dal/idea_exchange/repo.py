@@ -1,11 +1,16 @@
 from typing import TYPE_CHECKING
 
+from django.db.models import Count, QuerySet
+
 from app.dal.auth.repo import UserRepository
 from app.dal.idea_exchange.dto import IdeaDalDto, ChainDalDto, ActorDalDto, ChainLinkDalDto
 from app.dal.idea_exchange.mapper import ManagerMapper
-from app.domain.auth.core import UserID
+from app.domain.auth.core import UserID, GroupID
 from app.domain.idea_exchange.types import IdeaID, ChainID, ChainLinkID, ActorID
-from app.framework.data_access_layer.vendor.django.repository import DjangoRepository, OoOrmMapperLine, QoOrmMapperLine
+from app.framework.data_access_layer.vendor.django.caching_repository import DjangoCachingRepository
+from app.framework.data_access_layer.vendor.django.repository import DjangoRepository, OoOrmMapperLine, \
+    QoOrmMapperLine, M2MOrmMapperLine
+from app.framework.injector.main import inject
 from idea.models import Idea, Chain, Actor, ChainLink
 
 if TYPE_CHECKING:
@@ -40,8 +45,16 @@ class IdeaRepository(DjangoRepository):
                             qo_field_name='is_deleted'),
             QoOrmMapperLine(orm_field_name='idea_uid',
                             qo_field_name='idea_uid'),
+            QoOrmMapperLine(orm_field_name='created_at',
+                            qo_field_name='created_at'),
+            QoOrmMapperLine(orm_field_name='updated_at',
+                            qo_field_name='updated_at'),
         ]
 
+    @property
+    def _projection_orm_fields_mapping(self) -> dict[str, str]:
+        return {'idea_id': 'id'}
+
     @property
     def _oo_orm_fields_mapping(self) -> list[OoOrmMapperLine]:
         return [
@@ -49,6 +62,16 @@ class IdeaRepository(DjangoRepository):
                             oo_field_name='created_at')
         ]
 
+    @property
+    def _changed_fields_orm_mapping(self) -> dict[str, list[str]]:
+        return {
+            'name': ['name'],
+            'body': ['body'],
+            'chain': ['chain'],
+            'current_chain_link': ['current_chain_link'],
+            'is_deleted': ['is_deleted'],
+        }
+
     def _orm_to_dto(self, idea: Idea) -> IdeaDalDto:
         return IdeaDalDto(
             idea_id=IdeaID(idea.id),
@@ -60,7 +83,8 @@ class IdeaRepository(DjangoRepository):
             is_deleted=idea.is_deleted,
             created_at=idea.created_at,
             updated_at=idea.updated_at,
-            idea_uid=idea.idea_uid
+            idea_uid=idea.idea_uid,
+            version=idea.version
         )
 
     def _dto_to_orm(self, dto: 'DomainIdea') -> Idea:
@@ -102,6 +126,10 @@ class ChainRepository(DjangoRepository):
                             qo_field_name='is_deleted'),
         ]
 
+    @property
+    def _projection_orm_fields_mapping(self) -> dict[str, str]:
+        return {'chain_id': 'id'}
+
     @property
     def _oo_orm_fields_mapping(self) -> list[OoOrmMapperLine]:
         return [
@@ -117,7 +145,8 @@ class ChainRepository(DjangoRepository):
             accept_chain_link_id=ChainLinkID(chain.accept_chain_link_id),
             is_deleted=chain.is_deleted,
             created_at=chain.created_at,
-            updated_at=chain.updated_at
+            updated_at=chain.updated_at,
+            version=chain.version
         )
 
     def _dto_to_orm(self, dto: 'DomainChain') -> Chain:
@@ -128,6 +157,9 @@ class ChainLinkDjangoRepository(DjangoRepository):
 
     model = ChainLink
 
+    def _get_queryset(self) -> QuerySet:
+        return super()._get_queryset().annotate(number_of_related_ideas=Count('idea'))
+
     @property
     def _qo_orm_fields_mapping(self) -> list[QoOrmMapperLine]:
         return [
@@ -146,6 +178,10 @@ class ChainLinkDjangoRepository(DjangoRepository):
                             qo_field_name='is_deleted'),
         ]
 
+    @property
+    def _projection_orm_fields_mapping(self) -> dict[str, str]:
+        return {'chain_link_id': 'id'}
+
     @property
     def _oo_orm_fields_mapping(self) -> list[OoOrmMapperLine]:
         return [
@@ -163,8 +199,9 @@ class ChainLinkDjangoRepository(DjangoRepository):
             is_technical=orm_model.is_technical,
             order=orm_model.order,
             chain_id=ChainID(orm_model.chain_id),
-            number_of_related_ideas=orm_model.idea_set.count(),
-            is_deleted=orm_model.is_deleted
+            number_of_related_ideas=orm_model.number_of_related_ideas,
+            is_deleted=orm_model.is_deleted,
+            version=orm_model.version
         )
 
     def _dto_to_orm(self, dto: 'DomainChainLink') -> ChainLink:
@@ -179,13 +216,22 @@ class ActorRepository(DjangoRepository):
         return ActorDalDto(
             actor_id=ActorID(orm_model.id),
             name=orm_model.name,
-            manager_ids=list(orm_model.managers.values_list('id', flat=True)),
-            groups_ids=list(orm_model.groups.values_list('id', flat=True))
+            manager_ids=[UserID(i) for i in orm_model.manager_ids],
+            groups_ids=[GroupID(i) for i in orm_model.groups_ids]
         )
 
     def _dto_to_orm(self, dto: 'DomainActor') -> Actor:
         pass
 
+    @property
+    def _m2m_orm_fields_mapping(self) -> list[M2MOrmMapperLine]:
+        return [
+            M2MOrmMapperLine(orm_field_name='managers',
+                             attr_name='manager_ids'),
+            M2MOrmMapperLine(orm_field_name='groups',
+                             attr_name='groups_ids'),
+        ]
+
     @property
     def _qo_orm_fields_mapping(self) -> list[QoOrmMapperLine]:
         return [
@@ -204,6 +250,13 @@ class ActorRepository(DjangoRepository):
         ]
 
 
+class CachedActorRepository(DjangoCachingRepository):
+
+    repository_cls = ActorRepository
+    cache_factory = inject('Cache')
+    ttl = 60
+
+
 class ManagerRepository(UserRepository):
 
     def _orm_to_dto(self, orm_model: 'CustomUser') -> 'DomainManager':
@@ -1,26 +1,88 @@
-from typing import Iterable, Type
+import asyncio
+from typing import Iterable, Type, Optional, Union
 
 from app.dal.auth.qo import SiteGroupQO, UserQO
 from app.dal.idea_exchange.dto import ActorDalDto, ChainDalDto, ChainLinkDalDto
 from app.dal.idea_exchange.oo import ChainLinkOO
 from app.dal.idea_exchange.qo import ManagerQO, ActorQO, ChainLinkQO, ChainQO
+from app.domain.auth.core import User, UserID, GroupID
 from app.domain.idea_exchange.main import Manager, ManagerGroup, Actor, ChainLink, Chain, ChainEditor
-from app.domain.idea_exchange.types import ChainLinkID
-from app.framework.data_access_layer.db_result_generator import DBResultGenerator
+from app.domain.idea_exchange.types import ChainLinkID, ChainID, ActorID
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator, FORWARD_ONLY
 from app.framework.data_access_layer.lazy import LazyWrapper
 from app.framework.data_access_layer.order_object.values import ASC
-from app.framework.data_access_layer.query_object.values import IN
-from app.framework.data_access_layer.repository import ABSRepository
-from app.framework.data_logic_layer.builders import ABSEntityFromRepoBuilder
+from app.framework.data_access_layer.query_object.values import IN, QueryParamComparison
+from app.framework.data_access_layer.repository import ABSRepository, AsyncABSRepository
+from app.framework.data_access_layer.values import Empty
+from app.framework.data_logic_layer.builders import ABSEntityFromRepoBuilder, AsyncABSEntityFromRepoBuilder
+from app.framework.data_logic_layer.identity_map import IdentityMap
+
+
+def _assemble_actors(
+        identity_map: IdentityMap,
+        actors_dtos: list[ActorDalDto],
+        groups_dtos: list,
+        managers: dict[UserID, Manager]
+) -> list[Actor]:
+    """
+    Собрать акторов из уже извлеченных DTO акторов, групп и менеджеров, без ленивых полей
+    """
+    groups = {
+        i.group_id: ManagerGroup(
+            group_id=i.group_id,
+            name=i.name,
+            managers=[managers[user_id] for user_id in i.users_ids_in_group if user_id in managers]
+        ) for i in groups_dtos
+    }
+    return [
+        identity_map.get_or_build(
+            Actor,
+            actor_dto.actor_id,
+            lambda actor_dto=actor_dto: Actor(
+                actor_id=actor_dto.actor_id,
+                name=actor_dto.name,
+                managers=[managers[i] for i in actor_dto.manager_ids if i in managers],
+                groups=[groups[i] for i in actor_dto.groups_ids if i in groups]
+            )
+        ) for actor_dto in actors_dtos
+    ]
+
+
+def _assemble_chain(identity_map: IdentityMap, chain_dto: ChainDalDto, chain_links: list[ChainLink]) -> Chain:
+    """
+    Собрать цепочку, технические звенья и автор которой уже лежат в карте идентичности
+    """
+    return identity_map.add(Chain, chain_dto.chain_id, Chain(
+        chain_id=chain_dto.chain_id,
+        chain_links=chain_links,
+        author=ChainEditor.from_user(identity_map.get(User, chain_dto.author_id)),
+        reject_chain_link=identity_map.get(ChainLink, chain_dto.reject_chain_link_id),
+        accept_chain_link=identity_map.get(ChainLink, chain_dto.accept_chain_link_id),
+        _meta_is_deleted=chain_dto.is_deleted,
+        _meta_version=chain_dto.version
+    ))
 
 
 class ManagerBuilder(ABSEntityFromRepoBuilder):
-    def __init__(self, manager_repo: ABSRepository, manager_qo: ManagerQO):
-        super().__init__()
+    def __init__(self, manager_repo: ABSRepository, manager_qo: ManagerQO, identity_map: Optional[IdentityMap] = None):
+        super().__init__(identity_map=identity_map)
         self._manager_repo = manager_repo
         self._manager_qo = manager_qo
     
+    def _batch_load_managers(self, users_ids: list[UserID]) -> Iterable[tuple[UserID, Manager]]:
+        for manager in self._manager_repo.fetch_many(
+            filter_params=ManagerQO(user_id=IN(users_ids)), cache_size=FORWARD_ONLY
+        ):
+            yield manager.user_id, manager
+
     def build_lazy_many(self) -> LazyWrapper[DBResultGenerator[Manager]]:
+        """
+        Менеджеры, заданные только списком id, извлекаются через загрузчик карты идентичности:
+        менеджеры всех ленивых полей, подготовленных до первого обращения, приходят одним запросом
+        """
+        users_ids = self._manager_qo.user_id
+        if isinstance(users_ids, IN) and self._manager_qo == ManagerQO(user_id=users_ids):
+            return self._identity_map.loader(Manager, self._batch_load_managers).lazy_many(users_ids.value)
         lazy = LazyWrapper(
             method=self._manager_repo.fetch_many,
             params={"filter_params": self._manager_qo}
@@ -28,7 +90,7 @@ class ManagerBuilder(ABSEntityFromRepoBuilder):
         return lazy
     
     def build_many(self) -> Iterable[Manager]:
-        yield from self._manager_repo.fetch_many(filter_params=self._manager_qo)
+        yield from self._manager_repo.fetch_many(filter_params=self._manager_qo, cache_size=FORWARD_ONLY)
 
 
 class ManagerGroupsBuilder(ABSEntityFromRepoBuilder):
@@ -39,8 +101,9 @@ class ManagerGroupsBuilder(ABSEntityFromRepoBuilder):
             group_qo: SiteGroupQO,
             manager_repo: ABSRepository,
             manager_builder_class: Type[ABSEntityFromRepoBuilder] = ManagerBuilder,
+            identity_map: Optional[IdentityMap] = None
         ):
-        super().__init__()
+        super().__init__(identity_map=identity_map)
         self._group_repo = group_repo
         self._group_qo = group_qo
         self._manager_builder_class = manager_builder_class
@@ -48,9 +111,10 @@ class ManagerGroupsBuilder(ABSEntityFromRepoBuilder):
 
     def _build_manager_group(self, group_dto):
         manager_qo = ManagerQO(user_id=IN(group_dto.users_ids_in_group))
-        managers = self._manager_builder(
+        managers = self._manager_builder_class(
             manager_repo=self._manager_repo,
-            manager_qo=manager_qo
+            manager_qo=manager_qo,
+            identity_map=self._identity_map
         ).build_lazy_many()
         return ManagerGroup(
                 group_id=group_dto.group_id,
@@ -59,11 +123,23 @@ class ManagerGroupsBuilder(ABSEntityFromRepoBuilder):
             )
 
     def _build_lazy_many(self, *args, **kwargs) -> DBResultGenerator[ManagerGroup]:
-        groups_dtos = self._group_repo.fetch_many(filter_params=self._group_qo)
+        groups_dtos = self._group_repo.fetch_many(filter_params=self._group_qo, cache_size=FORWARD_ONLY)
         return DBResultGenerator((self._build_manager_group(i) for i in groups_dtos))
 
-    
+    def _batch_load_groups(self, groups_ids: list[GroupID]) -> Iterable[tuple[GroupID, ManagerGroup]]:
+        for group_dto in self._group_repo.fetch_many(
+            filter_params=SiteGroupQO(group_id=IN(groups_ids)), cache_size=FORWARD_ONLY
+        ):
+            yield group_dto.group_id, self._build_manager_group(group_dto)
+
     def build_lazy_many(self) -> LazyWrapper[Iterable[ManagerGroup]]:
+        """
+        Группы, заданные только списком id, извлекаются через загрузчик карты идентичности,
+        а менеджеры всех групп пачки затем тоже приходят одним запросом
+        """
+        groups_ids = self._group_qo.group_id
+        if isinstance(groups_ids, IN) and self._group_qo == SiteGroupQO(group_id=groups_ids):
+            return self._identity_map.loader(ManagerGroup, self._batch_load_groups).lazy_many(groups_ids.value)
         lazy = LazyWrapper(
             method=self._build_lazy_many,
             params={}
@@ -80,9 +156,10 @@ class ActorBuilder(ABSEntityFromRepoBuilder):
             group_repo: ABSRepository,
             manager_repo: ABSRepository,
             manager_builder_class: Type[ABSEntityFromRepoBuilder] = ManagerBuilder,
-            manager_groups_builder_class: Type['ManagerGroupsBuilder'] = ManagerGroupsBuilder
+            manager_groups_builder_class: Type['ManagerGroupsBuilder'] = ManagerGroupsBuilder,
+            identity_map: Optional[IdentityMap] = None
         ):
-        super().__init__()
+        super().__init__(identity_map=identity_map)
         self._actor_repo = actor_repo
         self._actor_qo = actor_qo
         self._group_repo = group_repo
@@ -91,18 +168,26 @@ class ActorBuilder(ABSEntityFromRepoBuilder):
         self._manager_repo = manager_repo
     
     def _build_lazy_one(self, *args, **kwargs) -> Actor:
+        actor = self._identity_map.get_by_id_query(Actor, self._actor_qo, 'actor_id')
+        if actor is not None:
+            return actor
         actor_dto: ActorDalDto = self._actor_repo.fetch_one(filter_params=self._actor_qo)
+        return self._identity_map.get_or_build(Actor, actor_dto.actor_id, lambda: self._build_actor(actor_dto))
+
+    def _build_actor(self, actor_dto: ActorDalDto) -> Actor:
         group_qo = SiteGroupQO(group_id=IN(actor_dto.groups_ids))
         manager_groups = self._manager_groups_builder_class(
             group_repo=self._group_repo,
             group_qo=group_qo,
             manager_builder_class=self._manager_builder_class,
-            manager_repo=self._manager_repo
+            manager_repo=self._manager_repo,
+            identity_map=self._identity_map
         ).build_lazy_many()
         managers_qo = ManagerQO(user_id=IN(actor_dto.manager_ids))
         managers = self._manager_builder_class(
             manager_repo=self._manager_repo,
-            manager_qo=managers_qo
+            manager_qo=managers_qo,
+            identity_map=self._identity_map
         ).build_lazy_many()
         return Actor(
             actor_id=actor_dto.actor_id,
@@ -111,13 +196,51 @@ class ActorBuilder(ABSEntityFromRepoBuilder):
             groups=manager_groups
         )
     
+    def _batch_load_actors(self, actors_ids: list[ActorID]) -> Iterable[tuple[ActorID, Actor]]:
+        for actor_dto in self._actor_repo.fetch_many(
+            filter_params=ActorQO(actor_id=IN(actors_ids)), cache_size=FORWARD_ONLY
+        ):
+            yield actor_dto.actor_id, self._build_actor(actor_dto)
+
     def build_lazy(self) -> LazyWrapper[Actor]:
+        """
+        Актор, заданный только id, извлекается через загрузчик карты идентичности:
+        первое обращение к любому из подготовленных акторов извлекает их все одним запросом
+        """
+        actor_id = self._actor_qo.actor_id
+        if not isinstance(actor_id, (QueryParamComparison, Empty)) and self._actor_qo == ActorQO(actor_id=actor_id):
+            return self._identity_map.loader(Actor, self._batch_load_actors).lazy(actor_id)
         lazy = LazyWrapper(
             method=self._build_lazy_one,
             params={}
         )
         return lazy
 
+    def build_many(self) -> list[Actor]:
+        """
+        Собрать акторов сразу с менеджерами и группами менеджеров, без ленивых полей.
+        Количество запросов не зависит от количества акторов: акторы, группы и менеджеры выбираются через IN
+        """
+        actors_dtos: list[ActorDalDto] = list(
+            self._actor_repo.fetch_many(filter_params=self._actor_qo, cache_size=FORWARD_ONLY)
+        )
+        groups_ids = {group_id for i in actors_dtos for group_id in i.groups_ids}
+        groups_dtos = []
+        if groups_ids:
+            groups_dtos = list(self._group_repo.fetch_many(
+                filter_params=SiteGroupQO(group_id=IN(list(groups_ids))), cache_size=FORWARD_ONLY
+            ))
+        managers_ids = {manager_id for i in actors_dtos for manager_id in i.manager_ids}
+        managers_ids.update(user_id for i in groups_dtos for user_id in i.users_ids_in_group)
+        managers: dict[UserID, Manager] = {}
+        if managers_ids:
+            managers = {
+                i.user_id: i for i in self._manager_repo.fetch_many(
+                    filter_params=ManagerQO(user_id=IN(list(managers_ids))), cache_size=FORWARD_ONLY
+                )
+            }
+        return _assemble_actors(self._identity_map, actors_dtos, groups_dtos, managers)
+
 class ChainLinkBuilder(ABSEntityFromRepoBuilder):
     
     def __init__(
@@ -130,9 +253,10 @@ class ChainLinkBuilder(ABSEntityFromRepoBuilder):
             actor_builder_class: Type['ActorBuilder'] = ActorBuilder,
             manager_builder_class: Type['ManagerBuilder'] = ManagerBuilder,
             manager_groups_builder_class: Type['ManagerGroupsBuilder'] = ManagerGroupsBuilder,
-            chain_link_oo: ChainLinkOO = None
+            chain_link_oo: ChainLinkOO = None,
+            identity_map: Optional[IdentityMap] = None
         ):
-        super().__init__()
+        super().__init__(identity_map=identity_map)
         self._chain_link_qo = chain_link_qo
         self._chain_link_oo = chain_link_oo
         self._actor_builder_class = actor_builder_class
@@ -143,26 +267,47 @@ class ChainLinkBuilder(ABSEntityFromRepoBuilder):
         self._manager_builder_class = manager_builder_class
         self._manager_groups_builder_class = manager_groups_builder_class
     
+    def build_one_from_dto(self, chain_link_dto: ChainLinkDalDto) -> ChainLink:
+        """
+        Собрать звено из уже извлеченного DTO. Актор берется из карты идентичности,
+        если его там нет - подготавливается ленивое извлечение
+        """
+        return self._build_chain_link(chain_link_dto)
+
     def _build_chain_link(self, chain_link_dto: ChainLinkDalDto) -> ChainLink:
-        actor_qo = ActorQO(actor_id=chain_link_dto.actor_id)
-        actor = self._actor_builder_class(
-            actor_repo=self._actor_repo,
-            actor_qo=actor_qo,
-            manager_groups_builder_class=self._manager_groups_builder_class,
-            group_repo=self._group_repo,
-            manager_builder_class=self._manager_builder_class,
-            manager_repo=self._manager_repo
-        ).build_lazy()
+        return self._identity_map.get_or_build(
+            ChainLink,
+            chain_link_dto.chain_link_id,
+            lambda: self._create_chain_link(chain_link_dto)
+        )
+
+    def _create_chain_link(self, chain_link_dto: ChainLinkDalDto) -> ChainLink:
+        actor = self._identity_map.get(Actor, chain_link_dto.actor_id)
+        if actor is None and chain_link_dto.actor_id is not None:
+            actor_qo = ActorQO(actor_id=chain_link_dto.actor_id)
+            actor = self._actor_builder_class(
+                actor_repo=self._actor_repo,
+                actor_qo=actor_qo,
+                manager_groups_builder_class=self._manager_groups_builder_class,
+                group_repo=self._group_repo,
+                manager_builder_class=self._manager_builder_class,
+                manager_repo=self._manager_repo,
+                identity_map=self._identity_map
+            ).build_lazy()
         return ChainLink(
                 chain_link_id=chain_link_dto.chain_link_id,
                 actor=actor,
                 name=chain_link_dto.name,
                 number_of_related_ideas=chain_link_dto.number_of_related_ideas,
                 is_technical=chain_link_dto.is_technical,
-                _meta_is_deleted=chain_link_dto.is_deleted
+                _meta_is_deleted=chain_link_dto.is_deleted,
+                _meta_version=chain_link_dto.version
             )
     
     def _build_lazy_one(self) -> ChainLink:
+        chain_link = self._identity_map.get_by_id_query(ChainLink, self._chain_link_qo, 'chain_link_id')
+        if chain_link is not None:
+            return chain_link
         chain_link_dto: ChainLinkDalDto = self._chain_link_repo.fetch_one(filter_params=self._chain_link_qo)
         return self._build_chain_link(chain_link_dto)
     
@@ -177,8 +322,11 @@ class ChainLinkBuilder(ABSEntityFromRepoBuilder):
         params = {'filter_params': self._chain_link_qo}
         if self._chain_link_oo is not None:
             params['order_params'] = self._chain_link_oo
-        chain_links_dtos: Iterable[ChainLinkDalDto] = self._chain_link_repo.fetch_many(**params)
-        return DBResultGenerator((self._build_chain_link(i) for i in chain_links_dtos))
+        chain_links_dtos: Iterable[ChainLinkDalDto] = self._chain_link_repo.fetch_many(
+            **params, cache_size=FORWARD_ONLY
+        )
+        # Звенья собираются сразу, чтобы акторы всех звеньев попали в загрузчик до первого обращения к любому из них
+        return DBResultGenerator(iter([self._build_chain_link(i) for i in chain_links_dtos]))
     
     def build_lazy_many(self) -> LazyWrapper[Iterable[ChainLink]]:
         lazy = LazyWrapper(
@@ -187,6 +335,35 @@ class ChainLinkBuilder(ABSEntityFromRepoBuilder):
         )
         return lazy
 
+    def build_many_from_dtos(self, chain_links_dtos: list[ChainLinkDalDto]) -> list[ChainLink]:
+        """
+        Собрать звенья из уже извлеченных DTO вместе с акторами, без ленивых полей.
+        Акторы всех звеньев извлекаются одной пачкой
+        :param chain_links_dtos: DTO звеньев
+        :return: Звенья в том же порядке, что и DTO
+        """
+        actors_ids = list({
+            i.actor_id for i in chain_links_dtos
+            if i.actor_id is not None and (Actor, i.actor_id) not in self._identity_map
+        })
+        if actors_ids:
+            self._actor_builder_class(
+                actor_repo=self._actor_repo,
+                actor_qo=ActorQO(actor_id=IN(actors_ids)),
+                manager_groups_builder_class=self._manager_groups_builder_class,
+                group_repo=self._group_repo,
+                manager_builder_class=self._manager_builder_class,
+                manager_repo=self._manager_repo,
+                identity_map=self._identity_map
+            ).build_many()
+        return [self._build_chain_link(i) for i in chain_links_dtos]
+
+    def build_many(self) -> list[ChainLink]:
+        params = {'filter_params': self._chain_link_qo}
+        if self._chain_link_oo is not None:
+            params['order_params'] = self._chain_link_oo
+        return self.build_many_from_dtos(list(self._chain_link_repo.fetch_many(**params, cache_size=FORWARD_ONLY)))
+
 
 class ChainBuilder(ABSEntityFromRepoBuilder):
 
@@ -203,8 +380,16 @@ class ChainBuilder(ABSEntityFromRepoBuilder):
             actor_builder_class: Type['ActorBuilder'] = ActorBuilder,
             manager_builder_class: Type['ManagerBuilder'] = ManagerBuilder,
             manager_groups_builder_class: Type['ManagerGroupsBuilder'] = ManagerGroupsBuilder,
+            identity_map: Optional[IdentityMap] = None,
+            graph_fetch: bool = False
     ):
-        super().__init__()
+        """
+        :param graph_fetch: Собирать агрегат целиком фиксированным числом запросов, без ленивых полей.
+            Звенья, акторы, группы, менеджеры и авторы выбираются пачками через IN,
+            сколько бы звеньев ни было в цепочке
+        """
+        super().__init__(identity_map=identity_map)
+        self._graph_fetch = graph_fetch
         self._chain_repo = chain_repo
         self._chain_qo = chain_qo
         self._chain_link_builder_class = chain_link_builder_class
@@ -217,23 +402,52 @@ class ChainBuilder(ABSEntityFromRepoBuilder):
         self._manager_builder_class = manager_builder_class
         self._manager_groups_builder_class = manager_groups_builder_class
 
-    def _fetch_one_chain_link(self, chain_link_id: ChainLinkID):
-        chain_link_qo = ChainLinkQO(
-            chain_link_id=chain_link_id,
-            is_deleted=False
-        )
+    def _chain_link_builder(
+            self,
+            chain_link_qo: ChainLinkQO,
+            chain_link_oo: Optional[ChainLinkOO] = None
+    ) -> 'ChainLinkBuilder':
         return self._chain_link_builder_class(
             actor_repo=self._actor_repo,
             group_repo=self._group_repo,
             manager_repo=self._manager_repo,
             chain_link_repo=self._chain_link_repo,
             chain_link_qo=chain_link_qo,
+            chain_link_oo=chain_link_oo,
             actor_builder_class=self._actor_builder_class,
             manager_builder_class=self._manager_builder_class,
-            manager_groups_builder_class=self._manager_groups_builder_class
-        ).build_lazy_one()
+            manager_groups_builder_class=self._manager_groups_builder_class,
+            identity_map=self._identity_map
+        )
+
+    def _fetch_one_chain_link(self, chain_link_id: ChainLinkID) -> Union[ChainLink, LazyWrapper[ChainLink]]:
+        """
+        Техническое звено цепочки извлекается по id без фильтра is_deleted:
+        цепочка ссылается на него, даже если звено помечено удаленным
+        """
+        chain_link = self._identity_map.get(ChainLink, chain_link_id)
+        if chain_link is not None:
+            return chain_link
+        chain_link_qo = ChainLinkQO(
+            chain_link_id=chain_link_id
+        )
+        return self._chain_link_builder(chain_link_qo).build_lazy_one()
+
+    def _fetch_author(self, author_id: UserID) -> User:
+        return self._identity_map.get_or_build(
+            User,
+            author_id,
+            lambda: self._user_repo.fetch_one(filter_params=UserQO(user_id=author_id))
+        )
 
     def _build_chain(self, chain_dal_dto: ChainDalDto) -> Chain:
+        return self._identity_map.get_or_build(
+            Chain,
+            chain_dal_dto.chain_id,
+            lambda: self._create_chain(chain_dal_dto)
+        )
+
+    def _create_chain(self, chain_dal_dto: ChainDalDto) -> Chain:
         chain_links_qo = ChainLinkQO(
             chain_id=chain_dal_dto.chain_id,
             is_deleted=False,
@@ -242,30 +456,70 @@ class ChainBuilder(ABSEntityFromRepoBuilder):
         chain_link_oo = ChainLinkOO(
             order=ASC()
         )
-        chain_links = self._chain_link_builder_class(
-            chain_link_repo=self._chain_link_repo,
-            chain_link_qo=chain_links_qo,
-            actor_repo=self._actor_repo,
-            group_repo=self._group_repo,
-            manager_repo=self._manager_repo,
-            chain_link_oo=chain_link_oo
-        )
+        chain_links = self._chain_link_builder(chain_links_qo, chain_link_oo)
         accept_chain_link = self._fetch_one_chain_link(chain_link_id=chain_dal_dto.accept_chain_link_id)
         reject_chain_link = self._fetch_one_chain_link(chain_link_id=chain_dal_dto.reject_chain_link_id)
-        user_qo = UserQO(user_id=chain_dal_dto.author_id)
-        user_author = self._user_repo.fetch_one(filter_params=user_qo)
+        user_author = self._fetch_author(chain_dal_dto.author_id)
         return Chain(
             chain_id=chain_dal_dto.chain_id,
             chain_links=chain_links.build_lazy_many(),
             author=ChainEditor.from_user(user_author),
             reject_chain_link=reject_chain_link,
             accept_chain_link=accept_chain_link,
-            _meta_is_deleted=chain_dal_dto.is_deleted
+            _meta_is_deleted=chain_dal_dto.is_deleted,
+            _meta_version=chain_dal_dto.version
         )
 
+    def _build_chains_graph(self, chains_dtos: list[ChainDalDto]) -> list[Chain]:
+        """
+        Собрать цепочки целиком фиксированным числом запросов: звенья всех цепочек, технические звенья,
+        их акторы с менеджерами и группами, авторы - каждая сущность выбирается одной пачкой через IN
+        :param chains_dtos: DTO цепочек
+        :return: Полностью собранные цепочки в том же порядке, что и DTO
+        """
+        new_chains_dtos = [i for i in chains_dtos if (Chain, i.chain_id) not in self._identity_map]
+        if new_chains_dtos:
+            chain_links_dtos: list[ChainLinkDalDto] = list(self._chain_link_repo.fetch_many(
+                filter_params=ChainLinkQO(
+                    chain_id=IN([i.chain_id for i in new_chains_dtos]),
+                    is_deleted=False,
+                    is_technical=False
+                ),
+                order_params=ChainLinkOO(order=ASC()),
+                cache_size=FORWARD_ONLY
+            ))
+            technical_chain_links_ids = list({
+                chain_link_id
+                for i in new_chains_dtos
+                for chain_link_id in (i.accept_chain_link_id, i.reject_chain_link_id)
+                if (ChainLink, chain_link_id) not in self._identity_map
+            })
+            technical_chain_links_dtos: list[ChainLinkDalDto] = []
+            if technical_chain_links_ids:
+                technical_chain_links_dtos = list(self._chain_link_repo.fetch_many(
+                    filter_params=ChainLinkQO(chain_link_id=IN(technical_chain_links_ids)),
+                    cache_size=FORWARD_ONLY
+                ))
+            chain_links = self._chain_link_builder(
+                ChainLinkQO(chain_id=IN([i.chain_id for i in new_chains_dtos]))
+            ).build_many_from_dtos(chain_links_dtos + technical_chain_links_dtos)
+            chain_links_by_chain: dict[ChainID, list[ChainLink]] = {i.chain_id: [] for i in new_chains_dtos}
+            for chain_link_dto, chain_link in zip(chain_links_dtos, chain_links):
+                chain_links_by_chain[chain_link_dto.chain_id].append(chain_link)
+            authors_ids = list({
+                i.author_id for i in new_chains_dtos if (User, i.author_id) not in self._identity_map
+            })
+            if authors_ids:
+                for user in self._user_repo.fetch_many(
+                    filter_params=UserQO(user_id=IN(authors_ids)), cache_size=FORWARD_ONLY
+                ):
+                    self._identity_map.add(User, user.user_id, user)
+            for chain_dto in new_chains_dtos:
+                _assemble_chain(self._identity_map, chain_dto, chain_links_by_chain[chain_dto.chain_id])
+        return [self._identity_map.get(Chain, i.chain_id) for i in chains_dtos]
+
     def _build_lazy_one(self) -> Chain:
-        chain_dto: ChainDalDto = self._chain_repo.fetch_one(filter_params=self._chain_qo)
-        return self._build_chain(chain_dto)
+        return self.build_one()
 
     def build_lazy_one(self) -> LazyWrapper[Chain]:
         lazy = LazyWrapper(
@@ -275,10 +529,20 @@ class ChainBuilder(ABSEntityFromRepoBuilder):
         return lazy
 
     def build_one(self) -> Chain:
-        return self._build_chain(self._chain_repo.fetch_one(filter_params=self._chain_qo))
+        chain = self._identity_map.get_by_id_query(Chain, self._chain_qo, 'chain_id')
+        if chain is not None:
+            return chain
+        chain_dto: ChainDalDto = self._chain_repo.fetch_one(filter_params=self._chain_qo)
+        if self._graph_fetch:
+            return self._build_chains_graph([chain_dto])[0]
+        return self._build_chain(chain_dto)
 
     def _build_lazy_many(self) -> Iterable[Chain]:
-        chains_dtos: Iterable[ChainDalDto] = self._chain_repo.fetch_many(filter_params=self._chain_qo)
+        chains_dtos: Iterable[ChainDalDto] = self._chain_repo.fetch_many(
+            filter_params=self._chain_qo, cache_size=FORWARD_ONLY
+        )
+        if self._graph_fetch:
+            return DBResultGenerator(iter(self._build_chains_graph(list(chains_dtos))))
         return DBResultGenerator((self._build_chain(i) for i in chains_dtos))
 
     def build_lazy_many(self) -> LazyWrapper[Iterable[Chain]]:
@@ -289,4 +553,154 @@ class ChainBuilder(ABSEntityFromRepoBuilder):
         return lazy
 
     def build_many(self) -> Iterable[Chain]:
-        yield from self._build_lazy_many()
\ No newline at end of file
+        yield from self._build_lazy_many()
+
+
+class AsyncActorBuilder(AsyncABSEntityFromRepoBuilder):
+
+    def __init__(
+            self,
+            actor_repo: AsyncABSRepository,
+            actor_qo: ActorQO,
+            group_repo: AsyncABSRepository,
+            manager_repo: AsyncABSRepository,
+            identity_map: Optional[IdentityMap] = None
+    ):
+        super().__init__(identity_map=identity_map)
+        self._actor_repo = actor_repo
+        self._actor_qo = actor_qo
+        self._group_repo = group_repo
+        self._manager_repo = manager_repo
+
+    async def build_many(self) -> list[Actor]:
+        """
+        Асинхронный вариант ActorBuilder.build_many: акторы, группы и менеджеры выбираются через IN
+        """
+        actors_dtos: list[ActorDalDto] = [i async for i in self._actor_repo.fetch_many(filter_params=self._actor_qo)]
+        groups_ids = {group_id for i in actors_dtos for group_id in i.groups_ids}
+        groups_dtos = []
+        if groups_ids:
+            groups_dtos = [
+                i async for i in self._group_repo.fetch_many(filter_params=SiteGroupQO(group_id=IN(list(groups_ids))))
+            ]
+        managers_ids = {manager_id for i in actors_dtos for manager_id in i.manager_ids}
+        managers_ids.update(user_id for i in groups_dtos for user_id in i.users_ids_in_group)
+        managers: dict[UserID, Manager] = {}
+        if managers_ids:
+            managers = {
+                i.user_id: i
+                async for i in self._manager_repo.fetch_many(filter_params=ManagerQO(user_id=IN(list(managers_ids))))
+            }
+        return _assemble_actors(self._identity_map, actors_dtos, groups_dtos, managers)
+
+
+class AsyncChainBuilder(AsyncABSEntityFromRepoBuilder):
+    """
+    Асинхронная сборка цепочек целиком, как ChainBuilder с graph_fetch: звенья, технические звенья
+    и авторы извлекаются конкурентно, затем акторы звеньев с группами и менеджерами - пачками через IN
+    """
+
+    def __init__(
+            self,
+            chain_repo: AsyncABSRepository,
+            chain_qo: ChainQO,
+            user_repo: AsyncABSRepository,
+            actor_repo: AsyncABSRepository,
+            group_repo: AsyncABSRepository,
+            manager_repo: AsyncABSRepository,
+            chain_link_repo: AsyncABSRepository,
+            identity_map: Optional[IdentityMap] = None
+    ):
+        super().__init__(identity_map=identity_map)
+        self._chain_repo = chain_repo
+        self._chain_qo = chain_qo
+        self._user_repo = user_repo
+        self._actor_repo = actor_repo
+        self._group_repo = group_repo
+        self._manager_repo = manager_repo
+        self._chain_link_repo = chain_link_repo
+
+    async def _fetch_chain_links_dtos(self, chains_dtos: list[ChainDalDto]) -> list[ChainLinkDalDto]:
+        return [i async for i in self._chain_link_repo.fetch_many(
+            filter_params=ChainLinkQO(
+                chain_id=IN([i.chain_id for i in chains_dtos]),
+                is_deleted=False,
+                is_technical=False
+            ),
+            order_params=ChainLinkOO(order=ASC())
+        )]
+
+    async def _fetch_technical_chain_links_dtos(self, chains_dtos: list[ChainDalDto]) -> list[ChainLinkDalDto]:
+        """
+        Технические звенья извлекаются по id без фильтра is_deleted, как и в ChainBuilder
+        """
+        chain_links_ids = list({
+            chain_link_id
+            for i in chains_dtos
+            for chain_link_id in (i.accept_chain_link_id, i.reject_chain_link_id)
+            if (ChainLink, chain_link_id) not in self._identity_map
+        })
+        if not chain_links_ids:
+            return []
+        return [i async for i in self._chain_link_repo.fetch_many(
+            filter_params=ChainLinkQO(chain_link_id=IN(chain_links_ids))
+        )]
+
+    async def _fetch_authors(self, chains_dtos: list[ChainDalDto]) -> None:
+        authors_ids = list({i.author_id for i in chains_dtos if (User, i.author_id) not in self._identity_map})
+        if not authors_ids:
+            return
+        async for user in self._user_repo.fetch_many(filter_params=UserQO(user_id=IN(authors_ids))):
+            self._identity_map.add(User, user.user_id, user)
+
+    async def _build_chains(self, chains_dtos: list[ChainDalDto]) -> list[Chain]:
+        new_chains_dtos = [i for i in chains_dtos if (Chain, i.chain_id) not in self._identity_map]
+        if new_chains_dtos:
+            chain_links_dtos, technical_chain_links_dtos, _ = await asyncio.gather(
+                self._fetch_chain_links_dtos(new_chains_dtos),
+                self._fetch_technical_chain_links_dtos(new_chains_dtos),
+                self._fetch_authors(new_chains_dtos)
+            )
+            all_chain_links_dtos = chain_links_dtos + technical_chain_links_dtos
+            actors_ids = list({
+                i.actor_id for i in all_chain_links_dtos
+                if i.actor_id is not None and (Actor, i.actor_id) not in self._identity_map
+            })
+            if actors_ids:
+                await AsyncActorBuilder(
+                    actor_repo=self._actor_repo,
+                    actor_qo=ActorQO(actor_id=IN(actors_ids)),
+                    group_repo=self._group_repo,
+                    manager_repo=self._manager_repo,
+                    identity_map=self._identity_map
+                ).build_many()
+            # Акторы уже в карте идентичности, звенья собираются без обращений к хранилищу
+            chain_link_builder = ChainLinkBuilder(
+                actor_repo=None,
+                group_repo=None,
+                manager_repo=None,
+                chain_link_repo=None,
+                chain_link_qo=ChainLinkQO(),
+                identity_map=self._identity_map
+            )
+            chain_links_by_chain: dict[ChainID, list[ChainLink]] = {i.chain_id: [] for i in new_chains_dtos}
+            for chain_link_dto in chain_links_dtos:
+                chain_links_by_chain[chain_link_dto.chain_id].append(
+                    chain_link_builder.build_one_from_dto(chain_link_dto)
+                )
+            for chain_link_dto in technical_chain_links_dtos:
+                chain_link_builder.build_one_from_dto(chain_link_dto)
+            for chain_dto in new_chains_dtos:
+                _assemble_chain(self._identity_map, chain_dto, chain_links_by_chain[chain_dto.chain_id])
+        return [self._identity_map.get(Chain, i.chain_id) for i in chains_dtos]
+
+    async def build_one(self) -> Chain:
+        chain = self._identity_map.get_by_id_query(Chain, self._chain_qo, 'chain_id')
+        if chain is not None:
+            return chain
+        chain_dto: ChainDalDto = await self._chain_repo.fetch_one(filter_params=self._chain_qo)
+        return (await self._build_chains([chain_dto]))[0]
+
+    async def build_many(self) -> list[Chain]:
+        chains_dtos = [i async for i in self._chain_repo.fetch_many(filter_params=self._chain_qo)]
+        return await self._build_chains(chains_dtos)
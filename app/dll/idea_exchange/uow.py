@@ -2,21 +2,35 @@ from typing import Optional, Iterable, Type
 
 from app.cases.idea_exchange.dto import ChainLinkUiDto, ActorUiDto, IdeaUoDto, IdeaChanLinkUoDto
 from app.dal.auth.qo import UserQO, SiteGroupQO
-from app.dal.idea_exchange.dto import IdeaDalDto
+from app.dal.idea_exchange.dto import IdeaDalDto, ChainIdDalDto
 from app.dal.idea_exchange.oo import IdeaOO
 from app.dal.idea_exchange.qo import IdeaQO, ChainQO, AuthorQO, ChainEditorQO
-from app.dll.idea_exchange.builders import ChainLinkBuilder, ChainBuilder
+from app.dll.idea_exchange.builders import ChainLinkBuilder, ChainBuilder, AsyncChainBuilder
 from app.domain.auth.core import User, Group
 from app.domain.auth.core import UserID
 from app.domain.idea_exchange.main import IdeaAuthor, Chain, Idea, \
     ChainEditor, ChainLink, Actor
 from app.domain.idea_exchange.types import ChainID
-from app.framework.data_access_layer.repository import ABSRepository
+from app.framework.data_access_layer.cache import ABSCache
+from app.framework.data_access_layer.db_result_generator import FORWARD_ONLY
+from app.framework.data_access_layer.pagination import Page
+from app.framework.data_access_layer.repository import ABSRepository, AsyncABSRepository
+from app.framework.data_logic_layer.transaction import ABSTransaction
 from app.framework.data_logic_layer.uow import BaseUnitOfWork
 from app.framework.injector.main import inject
 
+CHAIN_CHOICES_CACHE_KEY = 'idea_exchange:chain_choices'
+# Кеш сбрасывается при записи цепочек, время жизни только страхует от изменений в обход UOW
+CHAIN_CHOICES_CACHE_TTL = 60 * 10
+
 
 class IdeaUOW(BaseUnitOfWork):
+    """
+    Записывает только идеи. Цепочки и звенья читаются, но не записываются: у ChainRepository
+    и ChainLinkDjangoRepository нет _dto_to_orm, поэтому их нет в _flush_order, и регистрация
+    Chain или ChainLink падает с ValueError. Когда маппинги появятся, порядок записи будет
+    ChainLink, Chain, Idea
+    """
 
     def __init__(
             self,
@@ -26,8 +40,16 @@ class IdeaUOW(BaseUnitOfWork):
             user_repo_cls: Type[ABSRepository] = inject('UserRepository'),
             group_repo_cls: Type[ABSRepository] = inject('SiteGroupRepository'),
             chain_link_repository_cls: Type[ABSRepository] = inject('ChainLinkRepository'),
-            manager_repository: Type[ABSRepository] = inject('ManagerRepository')
+            manager_repository: Type[ABSRepository] = inject('ManagerRepository'),
+            chain_graph_fetch: bool = True,
+            transaction_cls: Type[ABSTransaction] = inject('Transaction')
     ):
+        """
+        :param chain_graph_fetch: Собирать цепочки целиком фиксированным числом запросов,
+            подробности в ChainBuilder
+        """
+        super().__init__(transaction_cls=transaction_cls)
+        self._chain_graph_fetch = chain_graph_fetch
         self._idea_repo = idea_repo_cls(None)
         self._chain_repo = chain_repo_cls(None)
         self._actor_repo = actor_repo_cls(None)
@@ -35,26 +57,39 @@ class IdeaUOW(BaseUnitOfWork):
         self._group_repo = group_repo_cls(None)
         self._chain_link_repository = chain_link_repository_cls(None)
         self._manager_repository = manager_repository(None)
-        self._domain_object_for_save = []
-
-    def commit(self):
-        ideas_for_save = [i for i in self._domain_object_for_save if isinstance(i, Idea)]
-        self._idea_repo.add_many(ideas_for_save)
-        self._domain_object_for_save = []
 
+    @property
+    def _flush_order(self) -> list[tuple[type, ABSRepository]]:
+        return [
+            (Idea, self._idea_repo),
+        ]
 
     def add_idea_for_save(self, idea: Idea) -> None:
+        """
+        Изменения в сущности помечают сами доменные методы, в update уйдут только измененные поля
+        """
         idea.set_updated_at_as_now()
-        idea.mark_changed()
-        self._domain_object_for_save.append(idea)
+        if idea.is_new():
+            self.register_new(idea)
+        else:
+            self.register_dirty(idea)
+
 
+    def _fetch_user(self, user_id: UserID) -> User:
+        return self.identity_map.get_or_build(
+            User,
+            user_id,
+            lambda: self._user_repo.fetch_one(filter_params=UserQO(user_id=user_id))
+        )
 
     def fetch_author(self, author_id: UserID) -> IdeaAuthor:
-        user_qo = UserQO(user_id=author_id)
-        user = self._user_repo.fetch_one(filter_params=user_qo)
+        user = self._fetch_user(author_id)
         return IdeaAuthor.from_user(user)
 
     def fetch_chain(self, chain_id: ChainID) -> Chain:
+        chain = self.identity_map.get(Chain, chain_id)
+        if chain is not None:
+            return chain
         chain_qo = ChainQO(chain_id=chain_id)
         chain_builder = ChainBuilder(
             chain_repo=self._chain_repo,
@@ -64,14 +99,22 @@ class IdeaUOW(BaseUnitOfWork):
             actor_repo=self._actor_repo,
             group_repo=self._group_repo,
             manager_repo=self._manager_repository,
-            user_repo=self._user_repo
+            user_repo=self._user_repo,
+            identity_map=self.identity_map,
+            graph_fetch=self._chain_graph_fetch
         )
         return chain_builder.build_one()
 
     def build_idea(self, idea_dal_dto: IdeaDalDto) -> Idea:
+        return self.identity_map.get_or_build(
+            Idea,
+            idea_dal_dto.idea_id,
+            lambda: self._create_idea(idea_dal_dto)
+        )
+
+    def _create_idea(self, idea_dal_dto: IdeaDalDto) -> Idea:
         chain = self.fetch_chain(idea_dal_dto.chain_id)
-        user_qo = UserQO(user_id=idea_dal_dto.author_id)
-        user_author = self._user_repo.fetch_one(filter_params=user_qo)
+        user_author = self._fetch_user(idea_dal_dto.author_id)
         current_chain_link = chain.chain_link_by_id(idea_dal_dto.current_chain_link_id)
         return Idea(
             idea_storage_id=idea_dal_dto.idea_id,
@@ -82,10 +125,13 @@ class IdeaUOW(BaseUnitOfWork):
             idea_uid=idea_dal_dto.idea_uid,
             current_chain_link=current_chain_link,
             _meta_is_deleted=idea_dal_dto.is_deleted,
+            _meta_version=idea_dal_dto.version,
         )
 
-    def fetch_idea(self, query_object: IdeaQO) -> Idea:
-        idea_dal_dto: IdeaDalDto = self._idea_repo.fetch_one(filter_params=query_object)
+    def fetch_idea(self, query_object: IdeaQO) -> Optional[Idea]:
+        idea_dal_dto: Optional[IdeaDalDto] = self._idea_repo.fetch_one(filter_params=query_object)
+        if idea_dal_dto is None:
+            return None
         return self.build_idea(idea_dal_dto=idea_dal_dto)
 
     def fetch_ideas(
@@ -99,7 +145,8 @@ class IdeaUOW(BaseUnitOfWork):
             filter_params=query_object,
             order_params=order_object,
             offset=offset,
-            limit=limit
+            limit=limit,
+            cache_size=FORWARD_ONLY
         )
         result = []
         for idea_dal_dto in idea_dal_dtos:
@@ -108,6 +155,24 @@ class IdeaUOW(BaseUnitOfWork):
             )
         return result
 
+    def fetch_ideas_page(
+            self,
+            query_object: IdeaQO,
+            order_object: Optional[IdeaOO] = None,
+            after: Optional[str] = None,
+            limit: int = 20
+    ) -> Page[Idea]:
+        page: Page[IdeaDalDto] = self._idea_repo.fetch_page(
+            filter_params=query_object,
+            order_params=order_object,
+            after=after,
+            limit=limit
+        )
+        return Page(
+            items=[self.build_idea(idea_dal_dto=i) for i in page.items],
+            next_cursor=page.next_cursor
+        )
+
     def convert_chain_link_to_uo(self, chain_link: ChainLink, idea: Idea) -> IdeaChanLinkUoDto:
         return IdeaChanLinkUoDto(
             chain_link_id=int(chain_link.chain_link_id),
@@ -128,6 +193,9 @@ class IdeaUOW(BaseUnitOfWork):
 
 
 class ChainUOW(BaseUnitOfWork):
+    """
+    Пока только выборки: цепочки и звенья не записываются по той же причине, что и в IdeaUOW
+    """
 
     def __init__(
             self,
@@ -136,8 +204,19 @@ class ChainUOW(BaseUnitOfWork):
             user_repo_cls: Type[ABSRepository] = inject('UserRepository'),
             group_repo_cls: Type[ABSRepository] = inject('SiteGroupRepository'),
             chain_link_repository_cls: Type[ABSRepository] = inject('ChainLinkRepository'),
-            manager_repository: Type[ABSRepository] = inject('ManagerRepository')
+            manager_repository: Type[ABSRepository] = inject('ManagerRepository'),
+            chain_graph_fetch: bool = True,
+            transaction_cls: Type[ABSTransaction] = inject('Transaction'),
+            cache_cls: Type[ABSCache] = inject('Cache'),
+            async_repository_cls: Type[AsyncABSRepository] = inject('AsyncRepository')
     ):
+        """
+        :param async_repository_cls: Асинхронный репозиторий поверх синхронного, для afetch_chain/afetch_chains
+        """
+        super().__init__(transaction_cls=transaction_cls)
+        self._chain_graph_fetch = chain_graph_fetch
+        self._cache = cache_cls()
+        self._async_repository_cls = async_repository_cls
         self._chain_repo = chain_repo_cls(None)
         self._actor_repo = actor_repo_cls(None)
         self._user_repo = user_repo_cls(None)
@@ -145,6 +224,18 @@ class ChainUOW(BaseUnitOfWork):
         self._chain_link_repository = chain_link_repository_cls(None)
         self._manager_repository = manager_repository(None)
 
+    def fetch_chain_choices(self) -> list[tuple[ChainID, str]]:
+        """
+        Пары (id, подпись) не удаленных цепочек для списков выбора, без сборки агрегатов.
+        Результат кешируется, кеш сбрасывается после фиксации записи цепочек
+        :return:
+        """
+        return self._cache.get_or_set(
+            CHAIN_CHOICES_CACHE_KEY,
+            lambda: [(i, f'Chain: {i}') for i in self.fetch_chain_ids(ChainQO(is_deleted=False))],
+            CHAIN_CHOICES_CACHE_TTL
+        )
+
     def fetch_chain_editor(self, query_object: ChainEditorQO) -> ChainEditor:
         pass
 
@@ -206,7 +297,39 @@ class ChainUOW(BaseUnitOfWork):
             actor_repo=self._actor_repo,
             group_repo=self._group_repo,
             manager_repo=self._manager_repository,
-            user_repo=self._user_repo
+            user_repo=self._user_repo,
+            identity_map=self.identity_map,
+            graph_fetch=self._chain_graph_fetch
         )
         return list(chain_builder.build_many())
 
+    def _async_chain_builder(self, query_object: ChainQO) -> AsyncChainBuilder:
+        return AsyncChainBuilder(
+            chain_repo=self._async_repository_cls(None, repository=self._chain_repo),
+            chain_qo=query_object,
+            chain_link_repo=self._async_repository_cls(None, repository=self._chain_link_repository),
+            actor_repo=self._async_repository_cls(None, repository=self._actor_repo),
+            group_repo=self._async_repository_cls(None, repository=self._group_repo),
+            manager_repo=self._async_repository_cls(None, repository=self._manager_repository),
+            user_repo=self._async_repository_cls(None, repository=self._user_repo),
+            identity_map=self.identity_map
+        )
+
+    async def afetch_chain(self, chain_id: ChainID) -> Chain:
+        """
+        Асинхронная сборка цепочки целиком, подробности в AsyncChainBuilder
+        """
+        return await self._async_chain_builder(ChainQO(chain_id=chain_id)).build_one()
+
+    async def afetch_chains(self, query_object: ChainQO) -> list[Chain]:
+        return await self._async_chain_builder(query_object).build_many()
+
+    def fetch_chain_ids(self, query_object: ChainQO) -> list[ChainID]:
+        """
+        Только id цепочек, без сборки агрегатов и без чтения лишних колонок
+        :param query_object:
+        :return:
+        """
+        return [i.chain_id for i in self._chain_repo.fetch_many(
+            filter_params=query_object, projection=ChainIdDalDto, cache_size=FORWARD_ONLY
+        )]
@@ -1,16 +1,22 @@
 from dataclasses import dataclass
 from typing import NewType
 
+from app.framework.data_logic_layer.entity import EntityIdentity
+
 UserID = NewType('UserID', int)
 GroupID = NewType('GroupID', int)
 
 
-@dataclass
-class User:
+@dataclass(eq=False)
+class User(EntityIdentity):
+    _identity_field = 'user_id'
+
     user_id: UserID
 
 
-class Group:
+class Group(EntityIdentity):
+    _identity_field = 'group_id'
+
     group_id: GroupID
     name: str
     
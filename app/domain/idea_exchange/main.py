@@ -1,16 +1,17 @@
 from dataclasses import dataclass
-from typing import Optional, Iterable, Union
+from typing import Optional, Sequence, Union
 from uuid import uuid4
 
 from app.domain.auth.core import User, Group
 from app.domain.idea_exchange.types import ChainID, IdeaID, ChainLinkID, ActorID
 from app.exceptions.idea_exchange import ChainLinkCantBeDeleted
 from app.exceptions.idea_exchange import ChainLinkNotInChain, NoChainLinksInChain, IncorrectChainLink
-from app.framework.data_access_layer.lazy import LazyLoaderInEntity, LazyWrapper
+from app.framework.data_access_layer.lazy import LazyLoaderInEntity, LazyWrapper, lazy_slots
+from app.framework.data_logic_layer.entity import EntityIdentity
 from app.framework.data_logic_layer.meta import BaseMeta, MetaManipulation
 
 
-@dataclass
+@dataclass(eq=False)
 class IdeaAuthor(User):
 
     def can_delete_idea(self, idea: 'Idea'):
@@ -25,10 +26,8 @@ class IdeaAuthor(User):
             user_id=user.user_id
         )
 
-@dataclass
+@dataclass(eq=False)
 class Manager(User):
-    def __eq__(self, other: 'Manager'):
-        return self.user_id == other.user_id
 
     @classmethod
     def from_user(cls, user: User):
@@ -57,7 +56,7 @@ class ManagerGroup(Group):
     def __repr__(self) -> str:
         return self.__str__()
 
-@dataclass
+@dataclass(eq=False)
 class ChainEditor(User):
 
     @classmethod
@@ -68,7 +67,9 @@ class ChainEditor(User):
 
 
 
-class Actor(MetaManipulation):
+class Actor(MetaManipulation, EntityIdentity):
+    _identity_field = 'actor_id'
+
     actor_id: ActorID
     managers: LazyLoaderInEntity[list[Manager]] = LazyLoaderInEntity()
     groups: LazyLoaderInEntity[list[ManagerGroup]] = LazyLoaderInEntity()
@@ -99,7 +100,7 @@ class Actor(MetaManipulation):
                 self.is_manager_in_admissible_managers(manager)
 
 
-class ChainLink(MetaManipulation):
+class ChainLink(MetaManipulation, EntityIdentity):
 
     ACCEPT = "Одобрено"
     REJECT = "Отклонено"
@@ -107,9 +108,11 @@ class ChainLink(MetaManipulation):
     __slots__ = (
         'chain_link_id',
         '_meta', '_name', '_is_technical',
-        '_number_of_related_ideas'
-    )
+        'number_of_related_ideas'
+    ) + lazy_slots('_actor')
     
+    _identity_field = 'chain_link_id'
+
     _actor: LazyLoaderInEntity[Actor] = LazyLoaderInEntity()
 
     @dataclass
@@ -125,6 +128,7 @@ class ChainLink(MetaManipulation):
             is_technical: bool = False,
             _meta_is_deleted: bool = False,
             _meta_is_changed: bool = False,
+            _meta_version: Optional[int] = None
     ):
         self.chain_link_id = chain_link_id
         self._actor = actor
@@ -134,13 +138,19 @@ class ChainLink(MetaManipulation):
         self.number_of_related_ideas = number_of_related_ideas
         self._meta: ChainLink.Meta = ChainLink.Meta(
             is_changed=_meta_is_changed,
-            is_deleted=_meta_is_deleted
+            is_deleted=_meta_is_deleted,
+            version=_meta_version
         )
 
-    def __eq__(self, other: 'ChainLink'):
+    def has_same_values(self, other: 'ChainLink') -> bool:
+        """
+        Сравнить значения полей, а не тождество, извлекает ленивых акторов обоих звеньев
+        :param other:
+        :return:
+        """
         return (
             self.chain_link_id == other.chain_link_id and
-            self._actor == other.actor and
+            self.actor == other.actor and
             self._name == other.name and
             self.number_of_related_ideas == other.number_of_related_ideas
         )
@@ -166,21 +176,21 @@ class ChainLink(MetaManipulation):
         if self.number_of_related_ideas > 0:
             raise ChainLinkCantBeDeleted()
         self._meta.is_deleted = True
-        self._meta.is_changed = True
+        self.mark_changed('is_deleted')
 
     def replace_id_from_meta(self):
         self.chain_link_id = self._meta.id_from_storage
 
     def set_name(self, name: str) -> None:
         self._name = name
-        self.set_for_change()
+        self.mark_changed('name')
 
     def get_name(self) -> str:
         return self._name
 
     def set_actor(self, actor: Actor) -> None:
         self._actor = actor
-        self.set_for_change()
+        self.mark_changed('actor')
 
     def get_actor(self) -> Actor:
         return self._actor
@@ -193,15 +203,18 @@ class ChainLink(MetaManipulation):
     is_technical: bool = property(fget=get_is_technical)
 
 
-class Chain(MetaManipulation):
+class Chain(MetaManipulation, EntityIdentity):
 
     __slots__ = (
         'chain_id',
         '_meta',
-        'dropped_chain_links'
-    )
+        'dropped_chain_links',
+        '_ordered_chain_links', '_chain_link_positions'
+    ) + lazy_slots('chain_links', 'reject_chain_link', 'accept_chain_link', 'author')
 
-    chain_links: LazyLoaderInEntity[Iterable[ChainLink]] = LazyLoaderInEntity()
+    _identity_field = 'chain_id'
+
+    chain_links: LazyLoaderInEntity[Sequence[ChainLink]] = LazyLoaderInEntity()
     reject_chain_link: LazyLoaderInEntity[ChainLink] = LazyLoaderInEntity()
     accept_chain_link: LazyLoaderInEntity[ChainLink] = LazyLoaderInEntity()
     author: LazyLoaderInEntity[IdeaAuthor] = LazyLoaderInEntity()
@@ -209,22 +222,27 @@ class Chain(MetaManipulation):
     def __init__(
             self,
             chain_id: Optional[ChainID],
-            chain_links: Union[Iterable[ChainLink], LazyWrapper[Iterable[ChainLink]]],
+            chain_links: Union[Sequence[ChainLink], LazyWrapper[Sequence[ChainLink]]],
             author: ChainEditor,
             reject_chain_link: Union[LazyWrapper[ChainLink], ChainLink],
             accept_chain_link: Union[LazyWrapper[ChainLink], ChainLink],
             _meta_is_deleted: bool = False,
-            _meta_is_changed: bool = False
+            _meta_is_changed: bool = False,
+            _meta_version: Optional[int] = None
     ):
         self.chain_id = chain_id
         self.chain_links = chain_links
         self.dropped_chain_links: list[ChainLink] = []
+        # Звенья по порядку и позиции звеньев по id, строятся при первом обращении, сбрасываются в replace_chain_links
+        self._ordered_chain_links: Optional[tuple[ChainLink, ...]] = None
+        self._chain_link_positions: dict[ChainLinkID, int] = {}
         self.author = author
         self.reject_chain_link = reject_chain_link
         self.accept_chain_link = accept_chain_link
         self._meta = BaseMeta(
             is_deleted=_meta_is_deleted,
-            is_changed=_meta_is_changed
+            is_changed=_meta_is_changed,
+            version=_meta_version
         )
 
     @classmethod
@@ -243,76 +261,103 @@ class Chain(MetaManipulation):
             reject_chain_link=reject_chain_link or ChainLink.initialize_technical(ChainLink.REJECT)
         )
 
+    def _get_ordered_chain_links(self) -> tuple[ChainLink, ...]:
+        if self._ordered_chain_links is None:
+            self._ordered_chain_links = tuple(self.chain_links)
+            self._chain_link_positions = {
+                i.chain_link_id: n for n, i in enumerate(self._ordered_chain_links) if i.chain_link_id is not None
+            }
+        return self._ordered_chain_links
+
+    def _position_by_id(self, chain_link_id: ChainLinkID) -> Optional[int]:
+        ordered_chain_links = self._get_ordered_chain_links()
+        idx = self._chain_link_positions.get(chain_link_id)
+        if idx is None and chain_link_id is not None:
+            # Новые звенья получают id при сохранении, уже после построения индекса
+            idx = next((n for n, i in enumerate(ordered_chain_links) if i.chain_link_id == chain_link_id), None)
+            if idx is not None:
+                self._chain_link_positions[chain_link_id] = idx
+        return idx
+
+    def _chain_link_index(self, chain_link: ChainLink) -> Optional[int]:
+        """
+        Индекс звена в цепочке: по id, новые звенья без id ищутся по самому объекту
+        :param chain_link:
+        :return: None, если звена нет в цепочке
+        """
+        if chain_link.chain_link_id is not None:
+            return self._position_by_id(chain_link.chain_link_id)
+        return next((n for n, i in enumerate(self._get_ordered_chain_links()) if i is chain_link), None)
+
     def element_position(self, chain_link: ChainLink) -> int:
-        for n, i in enumerate(self.chain_links, start=1):
-            if i.chain_link_id == chain_link.chain_link_id:
-                return n
-        raise ChainLinkNotInChain()
+        idx = self._chain_link_index(chain_link)
+        if idx is None:
+            raise ChainLinkNotInChain()
+        return idx + 1
 
     def first_chain_link(self) -> ChainLink:
-        chain_links = list(self.chain_links)
-        if len(chain_links) < 1:
+        ordered_chain_links = self._get_ordered_chain_links()
+        if not ordered_chain_links:
             raise NoChainLinksInChain()
-        return chain_links[0]
+        return ordered_chain_links[0]
 
     def replace_id_from_meta(self):
         self.chain_id = self._meta.id_from_storage
 
     def validate_chain_links(self, chain_links: list[ChainLink]) -> None:
-        chain_links_ids_in_chain = set(
-            i.chain_link_id for i in self.chain_links if i.chain_link_id is not None
-        )
         for chain_link in chain_links:
             if chain_link.chain_link_id is not None and \
-                    chain_link.chain_link_id not in chain_links_ids_in_chain:
+                    self._position_by_id(chain_link.chain_link_id) is None:
                 raise IncorrectChainLink(
                     f"Звено {chain_link.chain_link_id}:{chain_link.name} не принадлежит этой цепочке"
                 )
 
     def replace_chain_links(self, chain_links: list[ChainLink]) -> None:
-        old_chain_links = list(self.chain_links)
+        old_chain_links = self._get_ordered_chain_links()
         used_chain_links: set[ChainLinkID] = set()
         for chain_link in chain_links:
             chain_link.set_for_change()
             if chain_link.chain_link_id:
                 used_chain_links.add(chain_link.chain_link_id)
         self.chain_links = chain_links
+        self._ordered_chain_links = None
         for old_chain_link in old_chain_links:
             if old_chain_link.chain_link_id not in used_chain_links:
                 old_chain_link.set_as_deleted()
                 self.dropped_chain_links.append(old_chain_link)
 
     def calc_next_chain_link(self, chain_link: ChainLink):
-        chain_links = list(self.chain_links)
-        try:
-            idx = chain_links.index(chain_link)
-        except ValueError:
+        idx = self._chain_link_index(chain_link)
+        if idx is None:
             raise IncorrectChainLink(
                 f"Звено {chain_link.chain_link_id}:{chain_link.name} не принадлежит этой цепочке"
             )
-        if idx == len(chain_links) - 1:
+        ordered_chain_links = self._get_ordered_chain_links()
+        if idx == len(ordered_chain_links) - 1:
             return self.accept_chain_link
-        return chain_links[idx + 1]
+        return ordered_chain_links[idx + 1]
 
     def chain_link_by_id(self, chain_link_id: ChainLinkID) -> Optional[ChainLink]:
         if self.accept_chain_link.chain_link_id == chain_link_id:
             return self.accept_chain_link
         if self.reject_chain_link.chain_link_id == chain_link_id:
             return self.reject_chain_link
-        for i in self.chain_links:
-            if i.chain_link_id == chain_link_id:
-                return i
+        idx = self._position_by_id(chain_link_id)
+        if idx is not None:
+            return self._ordered_chain_links[idx]
 
 
-class Idea(MetaManipulation):
+class Idea(MetaManipulation, EntityIdentity):
 
     __slots__ = (
         'author', 'body', 'idea_id', 'idea_uid', 'name',
         'current_chain_link', '_meta'
-    )
+    ) + lazy_slots('chain')
 
     FIRST_POSITION = 1
 
+    _identity_field = 'idea_id'
+
     chain: LazyLoaderInEntity[Chain] = LazyLoaderInEntity()
 
     def __init__(
@@ -325,7 +370,8 @@ class Idea(MetaManipulation):
             idea_uid: str,
             idea_storage_id: Optional[IdeaID] = None,
             _meta_is_deleted: bool = False,
-            _meta_is_changed: bool = False
+            _meta_is_changed: bool = False,
+            _meta_version: Optional[int] = None
     ):
         self.author = author
         self.body = body
@@ -337,7 +383,8 @@ class Idea(MetaManipulation):
         self._meta = BaseMeta(
             is_deleted=_meta_is_deleted,
             is_changed=_meta_is_changed,
-            id_from_storage=idea_storage_id
+            id_from_storage=idea_storage_id,
+            version=_meta_version
         )
 
     @classmethod
@@ -356,7 +403,12 @@ class Idea(MetaManipulation):
         idea._meta.is_deleted = False
         return idea
 
-    def __eq__(self, other):
+    def has_same_values(self, other: 'Idea') -> bool:
+        """
+        Сравнить значения полей, а не тождество. Цепочка, автор и текущее звено сравниваются по тождеству
+        :param other:
+        :return:
+        """
         return (
             self.author == other.author and
             self.body == other.body and
@@ -371,7 +423,7 @@ class Idea(MetaManipulation):
 
     def mark_deleted(self):
         self._meta.is_deleted = True
-        self._meta.is_changed = True
+        self.mark_changed('is_deleted')
 
     def is_editable(self):
         return self.chain.element_position(self.current_chain_link) == Idea.FIRST_POSITION
@@ -379,7 +431,7 @@ class Idea(MetaManipulation):
     def update(self, body: str):
         if self.body != body:
             self.body = body
-            self._meta.is_changed = True
+            self.mark_changed('body')
 
     def replace_id_from_meta(self):
         self.idea_id = self._meta.id_from_storage
@@ -391,10 +443,11 @@ class Idea(MetaManipulation):
         self.current_chain_link = self.chain.calc_next_chain_link(
             self.current_chain_link
         )
-        self._meta.is_changed = True
+        self.mark_changed('current_chain_link')
 
     def reject_idea(self):
         self.current_chain_link = self.chain.reject_chain_link
+        self.mark_changed('current_chain_link')
 
     def is_chain_link_current(self, chain_link: ChainLink):
         return self.current_chain_link.chain_link_id == chain_link.chain_link_id
@@ -1,2 +1,23 @@
 class NotFoundException(Exception):
     pass
+
+
+class InvalidCursorException(Exception):
+    pass
+
+
+class VersionConflictException(Exception):
+    """
+    Запись изменили параллельно: версия в хранилище не совпала с версией извлеченной сущности
+    """
+
+    def __init__(self, model_name: str, ids: list):
+        self.model_name = model_name
+        self.ids = ids
+        super().__init__(f'{model_name} {ids} were changed concurrently')
+
+
+class ResultRewindException(Exception):
+    """
+    Повторный проход по результату, который не хранит пройденные элементы (DBResultGenerator с FORWARD_ONLY)
+    """
@@ -0,0 +1,139 @@
+import abc
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+_MISSING = object()
+
+
+class ABSCache(abc.ABC):
+    """
+    Кеш для read-моделей и репозиториев, данные которых дорого собирать и которые редко меняются.
+    Кто пишет данные, тот и сбрасывает ключи, которые от них зависят
+    """
+
+    # Отдает ли get тот же объект, что был передан в set. Такие значения нельзя изменять после получения,
+    # CachingRepository отдает их копии
+    shares_values: bool = False
+
+    @abc.abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Получить значение
+        :param key: Ключ
+        :param default: Что вернуть, если ключа нет или он истек
+        :return:
+        """
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        Сохранить значение
+        :param key: Ключ
+        :param value: Значение
+        :param ttl: Время жизни в секундах, None - время жизни по умолчанию для хранилища
+        :return:
+        """
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Сбросить значение
+        :param key: Ключ
+        :return:
+        """
+
+    def get_or_set(self, key: str, factory: Callable[[], T], ttl: Optional[int] = None) -> T:
+        """
+        Получить значение, а если его нет - посчитать и сохранить
+        :param key: Ключ
+        :param factory: Функция без аргументов, которая считает значение
+        :param ttl: Время жизни в секундах
+        :return:
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+
+class NoCache(ABSCache):
+    """
+    Ничего не хранит, для тестов и окружений без кеша
+    """
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+
+class InMemoryCache(ABSCache):
+    """
+    Кеш в памяти процесса: LRU на max_size ключей, у каждого ключа свое время жизни.
+    Значения не копируются, поэтому изменять полученные из кеша объекты нельзя (shares_values).
+    Сброс ключей виден только текущему процессу, для нескольких процессов нужен общий бекенд
+
+    Examples:
+        >>> cache = InMemoryCache(max_size=2)
+        >>> cache.set('a', 1)
+        >>> cache.set('b', 2)
+        >>> cache.get('a')
+        1
+        >>> cache.set('c', 3)  # вытесняется 'b', к нему обращались давнее всего
+        >>> cache.get('b') is None
+        True
+    """
+
+    shares_values = True
+
+    def __init__(self, max_size: int = 1024, default_ttl: Optional[int] = None):
+        """
+        :param max_size: Максимальное количество ключей
+        :param default_ttl: Время жизни в секундах, если при set оно не передано, None - бессрочно
+        """
+        self._max_size = max_size
+        self._default_ttl = default_ttl
+        # Ключ -> (момент истечения по time.monotonic или None, значение)
+        self._data: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = self._default_ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,208 @@
+import copy
+import hashlib
+from typing import Any, Callable, Iterable, Optional, Type
+from uuid import uuid4
+
+from app.framework.data_access_layer.basic import EntityTypeVar
+from app.framework.data_access_layer.cache import ABSCache, NoCache
+from app.framework.data_access_layer.canonical import to_bytes
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator, FULL_REPLAY
+from app.framework.data_access_layer.order_object.base import ABSOrderObject
+from app.framework.data_access_layer.pagination import Page
+from app.framework.data_access_layer.query_object.base import ABSQueryObject
+from app.framework.data_access_layer.repository import ABSRepository
+
+
+class CachingRepository(ABSRepository[EntityTypeVar]):
+    """
+    Декоратор над любым ABSRepository: чтения отдаются из кеша, записи уходят в декорируемый репозиторий
+    и сбрасывают кеш. Ключ строится из имени метода и канонической формы его аргументов
+    (объект фильтрации, объект сортировки и тд), подробности в canonical.to_bytes
+
+    Сброс через поколение: в ключ каждой выборки входит текущее поколение репозитория,
+    запись выставляет новое, и все старые ключи становятся недостижимыми, пока не истекут.
+    Поколение хранится в том же бекенде, поэтому с бекендом, общим для процессов, сброс виден всем процессам.
+
+    Запись сбрасывает кеш только после фиксации транзакции (_on_commit), иначе параллельный запрос
+    закешировал бы старые строки под новым поколением. До фиксации чтения этого репозитория идут мимо кеша,
+    чтобы не закешировать незафиксированные строки, которые переживут откат
+
+    Выборки fetch_many целиком оседают в кеше, поэтому декоратор предназначен для небольших
+    и часто читаемых таблиц: пользователи, группы, акторы. Каждое чтение - два обращения к бекенду
+    (поколение и значение), поэтому декоратор имеет смысл с бекендом в памяти процесса или сетевым,
+    замеры против запроса по первичному ключу в benchmarks/caching_repository.py.
+    Если бекенд отдает сами сохраненные объекты (ABSCache.shares_values), каждый вызов получает их копию,
+    иначе изменение сущности одним вызывающим увидели бы все остальные
+
+    Examples:
+        >>> class CachedUserRepository(CachingRepository):
+        >>>     repository_cls = UserRepository
+        >>>     cache_factory = inject('Cache')
+        >>>     ttl = 60
+        >>>
+        >>> # В cfg.yaml под именем UserRepository указывается CachedUserRepository,
+        >>> # UOW при этом ничего не знает о кеше
+        >>> repo = CachedUserRepository(None)
+        >>> repo.fetch_one(UserQO(user_id=UserID(1)))  # запрос в базу
+        >>> repo.fetch_one(UserQO(user_id=UserID(1)))  # из кеша
+    """
+
+    # Декорируемый репозиторий, создается с той же сессией
+    repository_cls: Type[ABSRepository] = None
+    # Функция без аргументов, возвращающая бекенд кеша. Для InMemoryCache нужно отдавать один и тот же экземпляр
+    cache_factory: Callable[[], ABSCache] = NoCache
+    # Время жизни ключей в секундах, None - время жизни по умолчанию для бекенда
+    ttl: Optional[int] = None
+    # Префикс ключей, по умолчанию путь до класса декорируемого репозитория
+    namespace: Optional[str] = None
+
+    def __init__(self, session, repository: Optional[ABSRepository] = None, cache: Optional[ABSCache] = None):
+        """
+        :param session: Передается в декорируемый репозиторий
+        :param repository: Готовый декорируемый репозиторий вместо repository_cls
+        :param cache: Готовый бекенд кеша вместо cache_factory
+        """
+        super().__init__(session)
+        if repository is None:
+            if self.repository_cls is None:
+                raise TypeError(f'{type(self).__name__}.repository_cls is not set')
+            repository = self.repository_cls(session)
+        self._repository = repository
+        self._cache = cache if cache is not None else self.cache_factory()
+        self._has_uncommitted_writes = False
+        repository_type = type(repository)
+        self._namespace = self.namespace or f'{repository_type.__module__}.{repository_type.__qualname__}'
+
+    @property
+    def _generation_key(self) -> str:
+        return f'{self._namespace}:generation'
+
+    def _generation(self) -> str:
+        generation = self._cache.get(self._generation_key)
+        if generation is None:
+            generation = uuid4().hex
+            self._cache.set(self._generation_key, generation)
+        return generation
+
+    def _make_key(self, method: str, *args: Any) -> str:
+        """
+        :param method: Имя метода репозитория
+        :param args: Аргументы выборки
+        :return: Ключ кеша
+        """
+        digest = hashlib.sha1(to_bytes(args)).hexdigest()
+        return f'{self._namespace}:{self._generation()}:{method}:{digest}'
+
+    def _cached(self, method: str, args: tuple, fetch: Callable[[], Any]) -> Any:
+        if self._has_uncommitted_writes:
+            return fetch()
+        value = self._cache.get_or_set(self._make_key(method, *args), fetch, self.ttl)
+        return copy.deepcopy(value) if self._cache.shares_values else value
+
+    def _on_commit(self, func: Callable[[], None]) -> None:
+        """
+        Выполнить функцию после фиксации текущей транзакции хранилища.
+        По умолчанию хранилище без транзакций и функция вызывается сразу
+        :param func: Функция без аргументов
+        :return:
+        """
+        func()
+
+    def _written(self) -> None:
+        """
+        Отметить запись через этот репозиторий: до фиксации транзакции кеш не используется,
+        после фиксации сбрасывается. Если транзакцию откатили, репозиторий так и читает мимо кеша
+        :return:
+        """
+        self._has_uncommitted_writes = True
+
+        def committed():
+            self._has_uncommitted_writes = False
+            self.invalidate()
+
+        self._on_commit(committed)
+
+    def invalidate(self) -> None:
+        """
+        Сбросить все закешированные выборки репозитория
+        :return:
+        """
+        self._cache.set(self._generation_key, uuid4().hex)
+
+    def exists(self, filter_params: Optional[ABSQueryObject] = None) -> bool:
+        return self._cached('exists', (filter_params, ), lambda: self._repository.exists(filter_params))
+
+    def count(self, filter_params: Optional[ABSQueryObject] = None, estimate: bool = False) -> int:
+        return self._cached(
+            'count',
+            (filter_params, estimate),
+            lambda: self._repository.count(filter_params, estimate=estimate)
+        )
+
+    def fetch_one(
+            self,
+            filter_params: Optional[ABSQueryObject] = None,
+            order_params: Optional[ABSOrderObject] = None,
+            raise_if_empty: bool = True
+    ) -> Optional[EntityTypeVar]:
+        return self._cached(
+            'fetch_one',
+            (filter_params, order_params, raise_if_empty),
+            lambda: self._repository.fetch_one(filter_params, order_params, raise_if_empty=raise_if_empty)
+        )
+
+    def fetch_many(
+            self,
+            filter_params: Optional[ABSQueryObject] = None,
+            order_params: Optional[ABSOrderObject] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            chunk_size: int = 1000,
+            projection: Optional[type] = None,
+            cache_size: Optional[int] = FULL_REPLAY
+    ) -> DBResultGenerator[EntityTypeVar]:
+        """
+        chunk_size и cache_size не влияют на результат и не входят в ключ
+        """
+        rows = self._cached(
+            'fetch_many',
+            (filter_params, order_params, offset, limit, projection),
+            lambda: tuple(self._repository.fetch_many(
+                filter_params,
+                order_params,
+                offset=offset,
+                limit=limit,
+                chunk_size=chunk_size,
+                projection=projection
+            ))
+        )
+        return DBResultGenerator(iter(rows), cache_size=cache_size)
+
+    def fetch_page(
+            self,
+            filter_params: Optional[ABSQueryObject] = None,
+            order_params: Optional[ABSOrderObject] = None,
+            after: Optional[str] = None,
+            limit: int = 20
+    ) -> Page[EntityTypeVar]:
+        return self._cached(
+            'fetch_page',
+            (filter_params, order_params, after, limit),
+            lambda: self._repository.fetch_page(filter_params, order_params, after=after, limit=limit)
+        )
+
+    def add(self, domain_model: EntityTypeVar) -> None:
+        self._repository.add(domain_model)
+        self._written()
+
+    def add_many(self, domain_model_sequence: Iterable[EntityTypeVar]) -> None:
+        self._repository.add_many(domain_model_sequence)
+        self._written()
+
+    def update_one(self, domain_model: EntityTypeVar) -> None:
+        self._repository.update_one(domain_model)
+        self._written()
+
+    def update_many(self, domain_model: Iterable[EntityTypeVar]) -> None:
+        self._repository.update_many(domain_model)
+        self._written()
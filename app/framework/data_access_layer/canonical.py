@@ -0,0 +1,54 @@
+import datetime
+import json
+from dataclasses import is_dataclass, fields
+from decimal import Decimal
+from typing import Any
+
+from app.framework.data_access_layer.values import Empty
+
+_EMPTY = Empty()
+
+
+def canonical(value: Any) -> Any:
+    """
+    Каноническая форма аргумента выборки: вложенные кортежи из примитивов, одинаковая для равных запросов.
+    Не заполненные поля объектов фильтрации и сортировки отбрасываются,
+    объекты со своим представлением (сравнения, комбинации) отдают его через метод canonical()
+
+    Examples:
+        >>> canonical(IdeaQO(author_id=UserID(1), chain_id=IN([3, 1, 3])))
+        ('IdeaQO', (('chain_id', ('IN', (1, 3))), ('author_id', 1)))
+    """
+    if value is _EMPTY:
+        return None
+    if isinstance(value, type):
+        return f'{value.__module__}.{value.__qualname__}'
+    if hasattr(value, 'canonical'):
+        return value.canonical()
+    if is_dataclass(value):
+        return type(value).__qualname__, tuple(
+            (i.name, canonical(getattr(value, i.name))) for i in fields(value) if getattr(value, i.name) is not _EMPTY
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(canonical(i) for i in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((canonical(i) for i in value), key=repr))
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} can not be serialized')
+
+
+def to_bytes(value: Any) -> bytes:
+    """
+    Компактная сериализация канонической формы, одинаковая во всех процессах, подходит для ключей
+    общего кеша и дедупликации запросов
+    :param value: Объект фильтрации, сортировки или кортеж аргументов выборки
+    :return:
+    """
+    return json.dumps(canonical(value), separators=(',', ':'), ensure_ascii=False, default=_json_default).encode()
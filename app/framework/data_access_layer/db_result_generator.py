@@ -1,8 +1,15 @@
-from itertools import chain
-from typing import Generator, Generic, TypeVar
+from collections import deque
+from typing import Generator, Generic, Iterator, Optional, TypeVar, Union, overload
+
+from app.exceptions.orm import ResultRewindException
 
 T = TypeVar('T')
 
+# Значения cache_size: не кешировать ничего, результат можно пройти только один раз
+FORWARD_ONLY = 0
+# Кешировать все элементы, результат можно проходить сколько угодно раз
+FULL_REPLAY = None
+
 
 class DBResultGenerator(Generic[T]):
     """
@@ -12,6 +19,16 @@ class DBResultGenerator(Generic[T]):
     чем закончился генератор переданный в DBResultGenerator, то по исчерпанию значений в кеше,
     значения снова будут браться из переданного генератора, до тех пор, пока он не исчерпает себя.
 
+    Прочитанные элементы лежат в одном буфере, а позиция - это индекс в нем,
+    поэтому сброс позиции ничего не копирует и не оборачивает.
+    По индексу и срезу элементы из исходного генератора дочитываются ровно столько, сколько нужно,
+    len() доступен, когда исходный генератор исчерпан.
+
+    Сколько элементов держать в памяти, задает cache_size:
+    FULL_REPLAY (None) - все, повторный проход начинается с первого элемента;
+    FORWARD_ONLY (0) - ничего, для выгрузок, которые проходят результат один раз;
+    n - кольцевой буфер из последних n элементов, повторный проход начинается с самого старого из них
+
     Example:
         >>>
         >>> def some_generator_method():
@@ -23,43 +40,150 @@ class DBResultGenerator(Generic[T]):
         >>>         yield i
         >>>
         >>> generator = DBResultGenerator(more_complex_generator())
+        >>> generator[0], generator[:10]  # из исходного генератора прочитано 10 элементов
+        >>> # Выгрузка 100к строк без накопления в памяти
+        >>> export = DBResultGenerator(more_complex_generator(), cache_size=FORWARD_ONLY)
     """
 
-    def __init__(self, db_generator: Generator):
+    def __init__(self, db_generator: Union[Generator, Iterator], cache_size: Optional[int] = FULL_REPLAY):
+        """
+        :param db_generator: Исходный генератор
+        :param cache_size: Сколько последних элементов хранить для повторного прохода, None - все
+        """
+        if cache_size is not None and cache_size < 0:
+            raise ValueError('cache_size must be >= 0')
         self._db_generator = db_generator
-        self._cache: list[T] = []
-        self._position = 1
+        self._cache_size = cache_size
+        self._cache: Union[list[T], deque[T]] = [] if cache_size is None else deque(maxlen=cache_size)
+        # Сколько элементов прочитано из исходного генератора
+        self._read_count = 0
+        # Индекс следующего элемента, который отдаст __next__
+        self._position = 0
         self._is_finished = False
 
+    @property
+    def cache_size(self) -> Optional[int]:
+        return self._cache_size
+
+    @property
+    def _first_cached(self) -> int:
+        """
+        Индекс самого старого элемента, который еще лежит в буфере
+        """
+        return self._read_count - len(self._cache)
+
     def drop_position(self) -> None:
         """
         Сбрасывает позицию в DBResultGenerator, если исходный генератор не исчерпан,
         сперва кеш, а потом исходный генератор
+        :raise ResultRewindException: Результат в режиме FORWARD_ONLY уже начали проходить
+        """
+        if self._cache_size == FORWARD_ONLY and self._position:
+            raise ResultRewindException('Forward-only result can not be iterated twice')
+        self._position = self._first_cached
+
+    def close(self) -> None:
+        """
+        Закрыть исходный генератор, например чтобы освободить курсор, если результат дочитывать не будут
+        """
+        close = getattr(self._db_generator, 'close', None)
+        if close is not None:
+            close()
+        self._is_finished = True
+
+    def _read(self) -> bool:
+        """
+        Прочитать следующий элемент из исходного генератора в буфер
+        :return: False, если исходный генератор исчерпан
         """
-        self._position = 1
         if self._is_finished:
-            self._db_generator = iter(self._cache)
-        else:
-            self._db_generator = chain(self._cache, self._db_generator)
+            return False
+        try:
+            value = next(self._db_generator)
+        except StopIteration:
+            self._is_finished = True
+            return False
+        self._cache.append(value)
+        self._read_count += 1
+        return True
 
-    def _add_value_to_cache(self, value):
+    def _read_until(self, count: Optional[int]) -> None:
         """
-        Добавляет значение в кеш, по этому элементу исходного генератора еще не проходились
-        :param value:
-        :return:
+        Дочитать исходный генератор, пока не будет прочитано count элементов, None - до конца
         """
-        if self._position > len(self._cache) and not self._is_finished:
-            self._cache.append(value)
-        self._position += 1
+        while (count is None or self._read_count < count) and self._read():
+            pass
+
+    def _cached(self, index: int) -> T:
+        if index < self._first_cached:
+            raise ResultRewindException(f'Item {index} is no longer cached, cache_size={self._cache_size}')
+        return self._cache[index - self._first_cached]
 
     def __iter__(self):
         return self
 
     def __next__(self) -> T:
-        try:
-            result = next(self._db_generator)
-        except StopIteration as e:
-            self._is_finished = True
-            raise e
-        self._add_value_to_cache(result)
-        return result
\ No newline at end of file
+        if self._cache_size == FORWARD_ONLY:
+            if self._is_finished:
+                raise StopIteration
+            try:
+                value = next(self._db_generator)
+            except StopIteration as e:
+                self._is_finished = True
+                raise e
+            self._read_count += 1
+            self._position += 1
+            return value
+        if self._position >= self._read_count and not self._read():
+            raise StopIteration
+        value = self._cached(self._position)
+        self._position += 1
+        return value
+
+    def __len__(self) -> int:
+        if not self._is_finished:
+            raise TypeError('len() of DBResultGenerator is known only after the source is exhausted')
+        return self._read_count
+
+    def __bool__(self) -> bool:
+        """
+        Не опирается на __len__, чтобы проверка на пустоту не требовала прочитать все.
+        В режиме FORWARD_ONLY заглянуть вперед нельзя, пока результат не исчерпан он считается непустым
+        """
+        if self._read_count:
+            return True
+        if self._cache_size == FORWARD_ONLY:
+            return not self._is_finished
+        return self._read()
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]:
+        ...
+
+    def __getitem__(self, index):
+        """
+        Позиция __next__ не меняется
+        :param index: Индекс или срез, для отрицательных значений исходный генератор дочитывается до конца
+        :return: Элемент или список элементов среза
+        """
+        if self._cache_size == FORWARD_ONLY:
+            raise ResultRewindException('Forward-only result does not support indexing')
+        if isinstance(index, slice):
+            bounds = (index.start, index.stop)
+            if (index.step or 1) > 0 and all(i is None or i >= 0 for i in bounds) and index.stop is not None:
+                self._read_until(index.stop)
+            else:
+                self._read_until(None)
+            return [self._cached(i) for i in range(*index.indices(self._read_count))]
+        if index < 0:
+            self._read_until(None)
+            index += self._read_count
+        else:
+            self._read_until(index + 1)
+        if not 0 <= index < self._read_count:
+            raise IndexError('DBResultGenerator index out of range')
+        return self._cached(index)
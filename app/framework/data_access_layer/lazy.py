@@ -1,9 +1,33 @@
-from typing import Callable, TypeVar, Generic, Union, Generator, Any
+import asyncio
+from typing import Callable, TypeVar, Generic, Union, Generator, Any, Iterable, Optional, Protocol
 
-from app.framework.data_access_layer.db_result_generator import DBResultGenerator
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator, FORWARD_ONLY
 
 T = TypeVar('T')
 
+# Значение слота кеша LazyLoaderInEntity, пока LazyWrapper поля не вычислен
+_NOT_RESOLVED = object()
+
+
+def _replayable(value: Any) -> Any:
+    """
+    Поле сущности читают повторно, а результат FORWARD_ONLY второй раз не пройти, поэтому перед
+    сохранением в кеш дескриптора он оборачивается в кеширующий DBResultGenerator.
+    Строки все так же дочитываются по мере обхода
+    """
+    if isinstance(value, DBResultGenerator) and value.cache_size == FORWARD_ONLY:
+        return DBResultGenerator(value)
+    return value
+
+
+class BatchDispatcher(Protocol):
+    """
+    Загрузчик, который накапливает ленивые поля и умеет разрешить их все разом
+    """
+
+    def dispatch(self) -> None:
+        ...
+
 
 class LazyWrapper(Generic[T]):
     """
@@ -15,7 +39,7 @@ class LazyWrapper(Generic[T]):
         >>> from dataclasses import dataclass
         >>>
         >>>
-        >>> @dataclass
+        >>> @dataclass(frozen=True, slots=True)
         >>> class DomainEntityQO(ABSQueryObject):
         >>>     id: int
         >>>
@@ -30,11 +54,22 @@ class LazyWrapper(Generic[T]):
         >>>             params={'domain_entity_qo': domain_entity_qo}
         >>>         )
         >>>
+        >>>     def build_export_rows(self, domain_entity_qo: DomainEntityQO) -> Any:
+        >>>         # Результат проходится один раз, кешировать строки в DBResultGenerator не нужно
+        >>>         return LazyWrapper(
+        >>>             method=self._repo.fetch_many,
+        >>>             params={'filter_params': domain_entity_qo, 'cache_size': FORWARD_ONLY}
+        >>>         )
+        >>>
     """
     
-    def __init__(self, method: Callable, params: dict) -> None:
+    def __init__(self, method: Callable, params: dict, loader: Optional[BatchDispatcher] = None) -> None:
+        """
+        :param loader: Загрузчик, через который обертка может быть разрешена пачкой вместе с другими, см. prefetch
+        """
         self._method = method
         self._params = params
+        self.loader = loader
     
     def fetch(self) -> Any:
         """
@@ -44,6 +79,33 @@ class LazyWrapper(Generic[T]):
         return self._method(**self._params)
 
 
+class AsyncLazyWrapper(Generic[T]):
+    """
+    Асинхронный вариант LazyWrapper, method - корутинная функция. Обертку можно просто дождаться,
+    а поле сущности с такой оберткой разрешается через aprefetch, синхронное чтение поля до этого бросает исключение
+
+    Example:
+        >>> chain_link = await AsyncLazyWrapper(method=builder.build_one, params={})
+        >>> chain = Chain(..., accept_chain_link=AsyncLazyWrapper(method=builder.build_one, params={}))
+        >>> await aprefetch([chain], 'accept_chain_link')
+        >>> chain.accept_chain_link
+    """
+
+    def __init__(self, method: Callable, params: dict) -> None:
+        self._method = method
+        self._params = params
+
+    async def fetch(self) -> Any:
+        """
+        Выполнить метод и извлечь данные из хранилища или выполнить сборку с помощью билдера
+        :return: Доменную сущность/агрегат/объект-значение
+        """
+        return await self._method(**self._params)
+
+    def __await__(self):
+        return self.fetch().__await__()
+
+
 class LazyLoaderInEntity(Generic[T]):
     """
     Дескриптор для поля сущности, которое может лениво вычисляться.
@@ -63,49 +125,210 @@ class LazyLoaderInEntity(Generic[T]):
         >>>     def __init__(self, field: Union[SomeDomainEntity, LazyWrapper[SomeDomainEntity]]):
         >>>         self.field = field
         >>>
+        >>>
+        >>> class SlottedDomainAggregate:
+        >>>     __slots__ = ('id',) + lazy_slots('field')
+        >>>
+        >>>     field: LazyLoaderInEntity[SomeDomainEntity] = LazyLoaderInEntity()
     """
-    
+
+    PRIVATE_PREFIX = '_lazy_wrapper_'
+    CACHED_PREFIX = '_lazy_wrapper_cache_'
+
     def __set_name__(self, owner, name: str):
         self.public_name = name
-        self.private_name = '_lazy_wrapper_' + name
-        self.cached_name = '_lazy_wrapper_cache_' + name
+        self.private_name = self.PRIVATE_PREFIX + name
+        self.cached_name = self.CACHED_PREFIX + name
+        if owner.__dictoffset__ == 0 and not all(
+                any(i in j.__dict__ for j in owner.__mro__) for i in (self.private_name, self.cached_name)
+        ):
+            raise TypeError(f"{owner.__name__}.__slots__ has no slots for '{name}', add lazy_slots('{name}')")
+
+    def is_resolved(self, obj) -> bool:
+        """
+        Проверить, вычислен ли LazyWrapper поля
+        :param obj: доменный объект, у которого прописано поле как LazyLoaderInEntity
+        :return:
+        """
+        return getattr(obj, self.cached_name, _NOT_RESOLVED) is not _NOT_RESOLVED
 
     def _process_lasy_wrapper(self, obj, value: LazyWrapper[T]) -> T:
         """
-        Метод обработки, если поле в сущности передано как LazyWrapper.
+        Метод обработки, если поле в сущности передано как LazyWrapper и еще не вычислено.
         Так же кеширует результат из LazyWrapper.
         Так же генератор не может быть валидным результатом из LazyWrapper,
         потому что при повторном обращении к нему, генератор будет уже пустым,
-        по этому, для последовательностей нужно использовать DBResultGenerator
+        по этому, для последовательностей нужно использовать DBResultGenerator.
+        DBResultGenerator в режиме FORWARD_ONLY кешируется в поле уже кеширующим, см. _replayable
 
         :param obj: доменный объект, у которого прописано поле как LazyLoaderInEntity
         :param value: LazyWrapper внутри поля
-        :return: Либо вычисление LazyWrapper, либо результат кеширования от предыдущего вычисления LazyWrapper
+        :return: Вычисление LazyWrapper
         """
-        if not hasattr(obj, self.cached_name):
-            new_value = value.fetch()
-            if isinstance(new_value, Generator):
-                raise Exception('Generators are not allowed, use DBResultGenerator')
-            setattr(obj, self.cached_name, new_value)
-        else:
-            new_value = getattr(obj, self.cached_name)
-            if isinstance(new_value, DBResultGenerator):
-                new_value.drop_position()
+        if isinstance(value, AsyncLazyWrapper):
+            raise Exception(f"Field '{self.public_name}' in {obj} is not resolved, use await aprefetch() first")
+        new_value = value.fetch()
+        if isinstance(new_value, Generator):
+            raise Exception('Generators are not allowed, use DBResultGenerator')
+        new_value = _replayable(new_value)
+        setattr(obj, self.cached_name, new_value)
         return new_value
 
     def __get__(self, obj, type=None) -> T:
         """
-        При попытке получить значение поля, если это LazyWrapper, произойдет его вычисление
+        При попытке получить значение поля, если это LazyWrapper, произойдет его вычисление.
+        Сначала проверяется кеш, так что повторное чтение вычисленного поля - одно чтение слота
         """
-        if not hasattr(obj, self.private_name):
+        if obj is None:
+            return self
+        try:
+            cached = getattr(obj, self.cached_name)
+            if cached is _NOT_RESOLVED:
+                value = getattr(obj, self.private_name)
+        except AttributeError:
             raise Exception(
                 f"Field '{self.public_name}' not exists in {obj}, also check '{self.private_name}' in object in runtime"
             )
-        value = getattr(obj, self.private_name)
-        if isinstance(value, LazyWrapper):
+        if cached is not _NOT_RESOLVED:
+            if isinstance(cached, DBResultGenerator):
+                cached.drop_position()
+            return cached
+        if isinstance(value, (LazyWrapper, AsyncLazyWrapper)):
             return self._process_lasy_wrapper(obj, value)
         return value
 
     def __set__(self, obj: Union[LazyWrapper[T]|T|None], value) -> None:
+        """
+        Новое значение поля сбрасывает кеш, вычисленный по предыдущему LazyWrapper
+        """
         setattr(obj, self.private_name, value)
+        setattr(obj, self.cached_name, _NOT_RESOLVED)
+
+
+def lazy_slots(*names: str) -> tuple[str, ...]:
+    """
+    Имена слотов, в которых LazyLoaderInEntity хранит значение и кеш поля, для __slots__ сущности.
+    Без них у сущности со __slots__ поле объявить нельзя
+
+    Example:
+        >>> class Chain(MetaManipulation):
+        >>>     __slots__ = ('chain_id', '_meta') + lazy_slots('chain_links')
+        >>>
+        >>>     chain_links: LazyLoaderInEntity[list[ChainLink]] = LazyLoaderInEntity()
+
+    :param names: Имена полей
+    :return:
+    """
+    return tuple(
+        j for i in names for j in (LazyLoaderInEntity.PRIVATE_PREFIX + i, LazyLoaderInEntity.CACHED_PREFIX + i)
+    )
+
+
+def _iter_values(value: Any) -> Iterable[Any]:
+    if value is None:
+        return ()
+    if isinstance(value, DBResultGenerator):
+        # Результат FORWARD_ONLY, лежащий не в поле LazyLoaderInEntity, перемотать нельзя,
+        # из него берется то, что еще не прочитано
+        if value.cache_size == FORWARD_ONLY:
+            return list(value)
+        value.drop_position()
+        values = list(value)
+        value.drop_position()
+        return values
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return value
+    return value,
+
+
+def _unresolved_wrappers(objects: list[Any], name: str) -> Iterable[tuple[Any, LazyLoaderInEntity, Any]]:
+    for obj in objects:
+        descriptor = next((i.__dict__[name] for i in type(obj).__mro__ if name in i.__dict__), None)
+        if not isinstance(descriptor, LazyLoaderInEntity) or descriptor.is_resolved(obj):
+            continue
+        value = getattr(obj, descriptor.private_name, None)
+        if isinstance(value, (LazyWrapper, AsyncLazyWrapper)):
+            yield obj, descriptor, value
+
+
+def _field_values(objects: list[Any], name: str) -> list[Any]:
+    """
+    :return: Значения поля всех объектов без повторов, последовательности разворачиваются
+    """
+    result = {}
+    for obj in objects:
+        for value in _iter_values(getattr(obj, name)):
+            result.setdefault(id(value), value)
+    return list(result.values())
+
 
+def _prefetch_field(objects: Iterable[Any], name: str) -> list[Any]:
+    """
+    Разрешить поле name у всех объектов: сначала пачкой отрабатывают загрузчики
+    неразрешенных LazyWrapper, затем каждое поле читается уже без запросов и оседает в кеше дескриптора
+    """
+    objects = list(objects)
+    loaders = {}
+    for _, _, wrapper in _unresolved_wrappers(objects, name):
+        if isinstance(wrapper, LazyWrapper) and wrapper.loader is not None:
+            loaders[id(wrapper.loader)] = wrapper.loader
+    for loader in loaders.values():
+        loader.dispatch()
+    return _field_values(objects, name)
+
+
+async def _aprefetch_field(objects: Iterable[Any], name: str) -> list[Any]:
+    """
+    Разрешить поле name у всех объектов: AsyncLazyWrapper'ы дожидаются конкурентно,
+    одна и та же обертка у нескольких объектов выполняется один раз
+    """
+    objects = list(objects)
+    pending = [i for i in _unresolved_wrappers(objects, name) if isinstance(i[2], AsyncLazyWrapper)]
+    wrappers = {id(wrapper): wrapper for _, _, wrapper in pending}
+    results = dict(zip(wrappers, map(_replayable, await asyncio.gather(*(i.fetch() for i in wrappers.values())))))
+    for obj, descriptor, wrapper in pending:
+        setattr(obj, descriptor.cached_name, results[id(wrapper)])
+    return _field_values(objects, name)
+
+
+def prefetch(entities: Iterable[Any], *paths: str) -> None:
+    """
+    Разрешить ленивые поля по путям сразу для всей коллекции сущностей.
+    На каждом шаге пути LazyWrapper'ы, созданные через загрузчик, разрешаются одной выборкой на загрузчик,
+    результат попадает в кеш LazyLoaderInEntity, так что последующие обращения к полям не ходят в хранилище.
+    Последовательности на пути разворачиваются, поля без загрузчика разрешаются по одному
+
+    Example:
+        >>> ideas = idea_uow.fetch_ideas(idea_qo)
+        >>> prefetch(ideas, 'current_chain_link.actor.managers', 'current_chain_link.actor.groups.managers')
+        >>> [i.is_manager_valid_actor(manager) for i in ideas]  # без запросов
+
+    :param entities: Сущности, с которых начинаются пути
+    :param paths: Пути через точку по именам полей
+    :return:
+    """
+    entities = list(entities)
+    for path in paths:
+        objects = entities
+        for name in path.split('.'):
+            objects = _prefetch_field(objects, name)
+
+
+async def aprefetch(entities: Iterable[Any], *paths: str) -> None:
+    """
+    Асинхронный вариант prefetch: на каждом шаге пути AsyncLazyWrapper'ы всех объектов дожидаются конкурентно,
+    результат попадает в кеш LazyLoaderInEntity, после чего поля читаются синхронно
+
+    Example:
+        >>> chain = await chain_uow.afetch_chain(chain_id)
+        >>> await aprefetch([chain], 'chain_links.actor')
+
+    :param entities: Сущности, с которых начинаются пути
+    :param paths: Пути через точку по именам полей
+    :return:
+    """
+    entities = list(entities)
+    for path in paths:
+        objects = entities
+        for name in path.split('.'):
+            objects = await _aprefetch_field(objects, name)
@@ -1,8 +1,18 @@
 from dataclasses import dataclass
 
+from app.framework.data_access_layer.canonical import to_bytes
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class ABSOrderObject:
     """
-    Базовый класс для объекта сортировки используемый для работы с ABSRepository
+    Базовый класс для объекта сортировки используемый для работы с ABSRepository.
+    Наследники тоже объявляются как @dataclass(frozen=True, slots=True), тогда объект хешируемый
+    и его можно использовать как ключ словаря
     """
+
+    def to_bytes(self) -> bytes:
+        """
+        Компактная каноническая сериализация, подробности в canonical.to_bytes
+        """
+        return to_bytes(self)
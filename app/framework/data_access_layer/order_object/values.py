@@ -2,17 +2,36 @@ from abc import ABC
 
 class OrderParamComparison(ABC):
     """
-    Базовый класс для управления параметрами сортировки, используется только с ABSOrderObject
+    Базовый класс для управления параметрами сортировки, используется только с ABSOrderObject.
+    Состояния нет, поэтому экземпляры одного типа равны между собой
     """
 
+    __slots__ = ()
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other)
+
+    def __hash__(self) -> int:
+        return hash(type(self))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}()'
+
+    def canonical(self) -> str:
+        return type(self).__qualname__
+
 
 class ASC(OrderParamComparison):
     """
     Прямой порядок сортировки (по возрастанию), от меньшего к большему
     """
 
+    __slots__ = ()
+
 
 class DESC(OrderParamComparison):
     """
     Обратный порядок сортировки (по убыванию), от большего к меньшему
     """
+
+    __slots__ = ()
@@ -0,0 +1,56 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Generic, Optional, Any, Type
+
+from app.exceptions.orm import InvalidCursorException
+from app.framework.data_access_layer.basic import EntityTypeVar
+
+
+@dataclass
+class Page(Generic[EntityTypeVar]):
+    """
+    Страница выборки при постраничном чтении через курсор (keyset пагинация)
+
+    Example:
+        >>> page = repo.fetch_page(filter_params=qo, order_params=oo, limit=20)
+        >>> while page.has_next:
+        >>>     page = repo.fetch_page(filter_params=qo, order_params=oo, after=page.next_cursor, limit=20)
+    """
+    items: list[EntityTypeVar] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(order_fields: list[str], values: list[Any], json_encoder: Type[json.JSONEncoder] = json.JSONEncoder) -> str:
+    """
+    Упаковать позицию последнего элемента страницы в непрозрачную для вызывающего кода строку
+    :param order_fields: Поля сортировки, по которым построена страница
+    :param values: Значения этих полей у последнего элемента страницы
+    :param json_encoder: Энкодер для значений, которые json не умеет сериализовать сам (даты и тд)
+    :return: Курсор, безопасный для передачи в url
+    """
+    raw = json.dumps({'fields': order_fields, 'values': values}, cls=json_encoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, order_fields: list[str]) -> list[Any]:
+    """
+    Распаковать курсор, полученный из encode_cursor
+    :param cursor: Курсор
+    :param order_fields: Поля сортировки текущего запроса, должны совпадать с полями, по которым строился курсор
+    :return: Значения полей сортировки в сериализованном json виде
+    :raise InvalidCursorException: Курсор поврежден или построен для другой сортировки
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        cursor_fields, values = data['fields'], data['values']
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorException('Cursor is malformed') from e
+    if cursor_fields != order_fields or len(values) != len(order_fields):
+        raise InvalidCursorException('Cursor was built for another ordering')
+    return values
@@ -1,8 +1,118 @@
 from dataclasses import dataclass
+from typing import Iterable
 
+from app.framework.data_access_layer.canonical import canonical, to_bytes
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class ABSQueryObject:
     """
     Базовый класс для объекта фильтрации используемый для работы с ABSRepository
+    Поля одного объекта объединяются через И, сами объекты можно комбинировать: qo1 & qo2, qo1 | qo2, ~qo
+    Наследники тоже объявляются как @dataclass(frozen=True, slots=True), тогда объект хешируемый
+    и его можно использовать как ключ словаря, а to_bytes() дает каноническое представление для общего кеша
+
+    Examples:
+        >>> # Идеи на этапах менеджера или идеи самого менеджера - одним запросом
+        >>> IdeaQO(current_chain_link_id=IN(chain_link_ids)) | IdeaQO(author_id=manager_id)
+    """
+
+    def __and__(self, other: 'ABSQueryObject') -> 'QOAnd':
+        return QOAnd(self, other)
+
+    def __or__(self, other: 'ABSQueryObject') -> 'QOOr':
+        return QOOr(self, other)
+
+    def __invert__(self) -> 'QONot':
+        return QONot(self)
+
+    def to_bytes(self) -> bytes:
+        """
+        Компактная каноническая сериализация, подробности в canonical.to_bytes
+        """
+        return to_bytes(self)
+
+
+class CompositeQueryObject(ABSQueryObject):
+    """
+    Логическая комбинация объектов фильтрации, репозиторий переводит ее в одно условие запроса
+    """
+
+    __slots__ = ('operands', )
+
+    def __init__(self, *operands: ABSQueryObject):
+        object.__setattr__(self, 'operands', tuple(operands))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.operands == other.operands
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.operands))
+
+    def canonical(self) -> tuple:
+        return type(self).__qualname__, tuple(canonical(i) for i in self.operands)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}{self.operands!r}'
+
+
+class _ConnectedQueryObject(CompositeQueryObject):
     """
+    Комбинация через связку, вложенные комбинации с той же связкой разворачиваются: (a | b) | c -> QOOr(a, b, c)
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *operands: ABSQueryObject):
+        if not operands:
+            raise ValueError(f'{type(self).__name__} needs at least one operand')
+        super().__init__(*self._flatten(operands))
+
+    @classmethod
+    def _flatten(cls, operands: Iterable[ABSQueryObject]) -> Iterable[ABSQueryObject]:
+        for operand in operands:
+            if type(operand) is cls:
+                yield from operand.operands
+            else:
+                yield operand
+
+    def canonical(self) -> tuple:
+        # От перестановки операндов результат не меняется: a | b и b | a дают одну форму
+        return type(self).__qualname__, tuple(sorted((canonical(i) for i in self.operands), key=repr))
+
+
+class QOAnd(_ConnectedQueryObject):
+    """
+    Все условия выполняются
+    """
+
+    __slots__ = ()
+
+
+class QOOr(_ConnectedQueryObject):
+    """
+    Выполняется хотя бы одно условие
+    """
+
+    __slots__ = ()
+
+
+class QONot(CompositeQueryObject):
+    """
+    Отрицание условия
+    """
+
+    __slots__ = ()
+
+    def __init__(self, operand: ABSQueryObject):
+        super().__init__(operand)
+
+    @property
+    def operand(self) -> ABSQueryObject:
+        return self.operands[0]
+
+    def __invert__(self) -> ABSQueryObject:
+        return self.operand
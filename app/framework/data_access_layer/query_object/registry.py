@@ -0,0 +1,69 @@
+from typing import Callable, Any, Optional, TypeVar
+
+from app.framework.data_access_layer.query_object.values import QueryParamComparison
+
+Handler = TypeVar('Handler', bound=Callable[..., Any])
+
+
+class ComparisonRegistry:
+    """
+    Таблица обработчиков QueryParamComparison для конкретного хранилища: тип сравнения -> функция,
+    переводящая его в нативный оператор хранилища. Наследники зарегистрированных типов
+    находятся по MRO, найденный обработчик запоминается
+
+    Examples:
+        >>> django_registry = ComparisonRegistry()
+        >>>
+        >>> @django_registry.register(GTE)
+        >>> def gte_lookup(orm_field_name: str, modifier, val: GTE) -> tuple[str, Any]:
+        >>>     return f'{orm_field_name}__gte', modifier(val.value)
+        >>>
+        >>> # Свои операторы для конкретного репозитория, не трогая общую таблицу
+        >>> custom_registry = django_registry.copy()
+        >>> custom_registry.register(MyComparison)(my_lookup)
+    """
+
+    __slots__ = ('_handlers', '_resolved')
+
+    def __init__(self, handlers: Optional[dict[type, Callable[..., Any]]] = None):
+        self._handlers: dict[type, Callable[..., Any]] = dict(handlers or {})
+        self._resolved: dict[type, Callable[..., Any]] = {}
+
+    def register(self, comparison_type: type) -> Callable[[Handler], Handler]:
+        """
+        Зарегистрировать обработчик, используется как декоратор
+        :param comparison_type: Наследник QueryParamComparison
+        :return:
+        """
+        def decorator(handler: Handler) -> Handler:
+            self._handlers[comparison_type] = handler
+            self._resolved.clear()
+            return handler
+        return decorator
+
+    def resolve(self, comparison_type: type) -> Callable[..., Any]:
+        """
+        Найти обработчик для типа сравнения
+        :param comparison_type: Тип значения из объекта фильтрации
+        :return: Обработчик
+        :raise TypeError: Для типа нет обработчика
+        """
+        handler = self._resolved.get(comparison_type)
+        if handler is not None:
+            return handler
+        if issubclass(comparison_type, QueryParamComparison):
+            handler = next((self._handlers[i] for i in comparison_type.__mro__ if i in self._handlers), None)
+        if handler is None:
+            raise TypeError(f'{comparison_type.__name__} is not supported')
+        self._resolved[comparison_type] = handler
+        return handler
+
+    def copy(self) -> 'ComparisonRegistry':
+        return ComparisonRegistry(self._handlers)
+
+    def __contains__(self, comparison_type: type) -> bool:
+        try:
+            self.resolve(comparison_type)
+        except TypeError:
+            return False
+        return True
@@ -1,5 +1,7 @@
 from abc import ABC
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Iterable
+
+from app.framework.data_access_layer.canonical import canonical
 
 T = TypeVar('T')
 
@@ -8,19 +10,143 @@ T = TypeVar('T')
 
 class QueryParamComparison(ABC, Generic[T]):
     """
-    Базовый класс для управления параметрами фильтрации, используется только с ABSOrderObject
+    Базовый класс для управления параметрами фильтрации, используется только с ABSQueryObject.
+    Каждое хранилище переводит сравнения в свои операторы через ComparisonRegistry.
+    Значение задается один раз при создании, сравнения хешируемые и сравниваются по типу и значению
     """
+
+    __slots__ = ('_value', )
+
     def __init__(self, value: T):
-        self.value = value
+        object.__setattr__(self, '_value', value)
+
+    @property
+    def value(self) -> T:
+        return self._value
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self._value == other._value
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._value))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._value!r})'
+
+    def canonical(self) -> tuple:
+        return type(self).__qualname__, canonical(self._value)
+
+
+def _canonical_sequence(values: Iterable) -> tuple:
+    """
+    Значения списка без повторов, по возможности отсортированные, чтобы IN([2, 1, 2]) == IN([1, 2])
+    """
+    unique = tuple(dict.fromkeys(values))
+    try:
+        return tuple(sorted(unique))
+    except TypeError:
+        return unique
+
+
+class GT(QueryParamComparison[T]):
+    """
+    Эквивалент >
+    """
+
+    __slots__ = ()
 
 
 class GTE(QueryParamComparison[T]):
+    """
+    Эквивалент >=
+    """
+
+    __slots__ = ()
+
+
+class LT(QueryParamComparison[T]):
+    """
+    Эквивалент <
+    """
+
+    __slots__ = ()
+
+
+class LTE(QueryParamComparison[T]):
     """
     Эквивалент <=
     """
 
+    __slots__ = ()
+
 
 class IN(QueryParamComparison[T]):
     """
-    Для проверки элементов в списке
+    Для проверки элементов в списке, значения хранятся без повторов и отсортированными
     """
+
+    __slots__ = ()
+
+    def __init__(self, value: Iterable):
+        super().__init__(_canonical_sequence(value))
+
+
+class NOT_IN(QueryParamComparison[T]):
+    """
+    Для проверки отсутствия элемента в списке, значения хранятся без повторов и отсортированными
+    """
+
+    __slots__ = ()
+
+    def __init__(self, value: Iterable):
+        super().__init__(_canonical_sequence(value))
+
+
+class IS_NULL(QueryParamComparison[bool]):
+    """
+    Проверка на пустое значение. None в объекте фильтрации означает "не фильтровать",
+    поэтому фильтр по пустому значению задается только так
+    """
+
+    __slots__ = ()
+
+    def __init__(self, value: bool = True):
+        super().__init__(value)
+
+
+class BETWEEN(QueryParamComparison[tuple[T, T]]):
+    """
+    Значение в диапазоне, границы включаются
+    """
+
+    __slots__ = ()
+
+    def __init__(self, lower: T, upper: T):
+        super().__init__((lower, upper))
+
+    @property
+    def lower(self) -> T:
+        return self.value[0]
+
+    @property
+    def upper(self) -> T:
+        return self.value[1]
+
+
+class STARTSWITH(QueryParamComparison[str]):
+    """
+    Строка начинается с подстроки, с учетом регистра
+    """
+
+    __slots__ = ()
+
+
+class CONTAINS(QueryParamComparison[str]):
+    """
+    Строка содержит подстроку, с учетом регистра
+    """
+
+    __slots__ = ()
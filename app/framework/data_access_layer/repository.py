@@ -1,9 +1,10 @@
 import abc
-from typing import Optional, TypeVar, Union, Iterable, Generic, Any
+from typing import Optional, TypeVar, Union, Iterable, Generic, Any, AsyncIterator
 
 from app.framework.data_access_layer.basic import EntityTypeVar
-from app.framework.data_access_layer.db_result_generator import DBResultGenerator
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator, FULL_REPLAY
 from app.framework.data_access_layer.order_object.base import ABSOrderObject
+from app.framework.data_access_layer.pagination import Page
 from app.framework.data_access_layer.query_object.base import ABSQueryObject
 from app.framework.domain.abs import IDTO, IEntity
 
@@ -64,7 +65,7 @@ class ABSRepository(abc.ABC, Generic[EntityTypeVar]):
         self.session = session
 
     @abc.abstractmethod
-    def exists(self, filter_params: Optional[ABSQueryObject]) -> bool:
+    def exists(self, filter_params: Optional[ABSQueryObject] = None) -> bool:
         """
         Проверка на существование записей в хранилище
         :param filter_params: Настроенные параметры фильтрации
@@ -73,10 +74,11 @@ class ABSRepository(abc.ABC, Generic[EntityTypeVar]):
         pass
 
     @abc.abstractmethod
-    def count(self, filter_params: Optional[ABSQueryObject] = None) -> int:
+    def count(self, filter_params: Optional[ABSQueryObject] = None, estimate: bool = False) -> int:
         """
         Подсчет количества объектов в хранилище
         :param filter_params: Настроенные параметры фильтрации
+        :param estimate: Допускается приблизительное значение, если хранилище умеет дать его дешевле точного
         :return: Количество объектов в хранилище
         """
 
@@ -103,7 +105,9 @@ class ABSRepository(abc.ABC, Generic[EntityTypeVar]):
             order_params: Optional[ABSOrderObject] = None,
             offset: int = 0,
             limit: Optional[int] = None,
-            chunk_size: int = 1000) -> DBResultGenerator[EntityTypeVar]:
+            chunk_size: int = 1000,
+            projection: Optional[type] = None,
+            cache_size: Optional[int] = FULL_REPLAY) -> DBResultGenerator[EntityTypeVar]:
         """
         Получить несколько элементов из хранилища
         :param filter_params: Параметры фильтрации для выборки
@@ -111,9 +115,32 @@ class ABSRepository(abc.ABC, Generic[EntityTypeVar]):
         :param offset: Смещение относительно начала элементов
         :param limit: Количество элементов в выборке
         :param chunk_size: Какое количество элементов за раз выбирать из хранилища
+        :param projection: Dataclass с подмножеством полей DTO, если передан - из хранилища
+            выбираются только эти поля и отдаются экземпляры projection вместо полных DTO
+        :param cache_size: Сколько пройденных элементов результат держит для повторного прохода,
+            FORWARD_ONLY - для выгрузок, которые проходят результат один раз, подробности в DBResultGenerator
         :return: Генератор отдающий по одному значению
         """
 
+    @abc.abstractmethod
+    def fetch_page(
+            self,
+            filter_params: Optional[ABSQueryObject] = None,
+            order_params: Optional[ABSOrderObject] = None,
+            after: Optional[str] = None,
+            limit: int = 20
+    ) -> Page[EntityTypeVar]:
+        """
+        Получить страницу элементов, следующих за курсором (keyset пагинация).
+        В отличие от offset стоимость запроса не зависит от номера страницы
+        :param filter_params: Параметры фильтрации для выборки
+        :param order_params: Параметры сортировки, по ним же строится курсор
+        :param after: Курсор из Page.next_cursor предыдущей страницы, None - первая страница
+        :param limit: Количество элементов на странице
+        :return: Страница с элементами и курсором на следующую страницу
+        :raise InvalidCursorException: Курсор поврежден или построен для другой сортировки
+        """
+
     @abc.abstractmethod
     def add(self, domain_model: EntityTypeVar) -> None:
         """
@@ -144,3 +171,99 @@ class ABSRepository(abc.ABC, Generic[EntityTypeVar]):
         :param domain_model:
         :return: Ничего не возвращает, потому что не все хранилища поддерживают RETURNING
         """
+
+
+class AsyncABSRepository(abc.ABC, Generic[EntityTypeVar]):
+    """
+    Асинхронный вариант ABSRepository для ASGI: те же выборки и записи, но методы - корутины,
+    а fetch_many отдает асинхронный итератор
+
+    Example:
+        >>> async for idea in repo.fetch_many(filter_params=IdeaQO(author_id=author_id)):
+        >>>     ...
+        >>> chain, author = await asyncio.gather(
+        >>>     chain_repo.fetch_one(filter_params=ChainQO(chain_id=chain_id)),
+        >>>     user_repo.fetch_one(filter_params=UserQO(user_id=author_id))
+        >>> )
+    """
+
+    __slots__ = ('session', )
+
+    def __init__(self, session: ISessionTypeVar):
+        """
+        :param session: Актуально для некоторых типов хранилищ или ORM
+        """
+        self.session = session
+
+    @abc.abstractmethod
+    async def exists(self, filter_params: Optional[ABSQueryObject] = None) -> bool:
+        """
+        Аналог ABSRepository.exists
+        """
+
+    @abc.abstractmethod
+    async def count(self, filter_params: Optional[ABSQueryObject] = None, estimate: bool = False) -> int:
+        """
+        Аналог ABSRepository.count
+        """
+
+    @abc.abstractmethod
+    async def fetch_one(
+            self,
+            filter_params: Optional[ABSQueryObject] = None,
+            order_params: Optional[ABSOrderObject] = None,
+            raise_if_empty: bool = True
+    ) -> Optional[EntityTypeVar]:
+        """
+        Аналог ABSRepository.fetch_one
+        """
+
+    @abc.abstractmethod
+    def fetch_many(
+            self,
+            filter_params: Optional[ABSQueryObject] = None,
+            order_params: Optional[ABSOrderObject] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            chunk_size: int = 1000,
+            projection: Optional[type] = None) -> AsyncIterator[EntityTypeVar]:
+        """
+        Аналог ABSRepository.fetch_many
+        :return: Асинхронный итератор, элементы читаются из хранилища пачками по chunk_size по мере обхода
+        """
+
+    @abc.abstractmethod
+    async def fetch_page(
+            self,
+            filter_params: Optional[ABSQueryObject] = None,
+            order_params: Optional[ABSOrderObject] = None,
+            after: Optional[str] = None,
+            limit: int = 20
+    ) -> Page[EntityTypeVar]:
+        """
+        Аналог ABSRepository.fetch_page
+        """
+
+    @abc.abstractmethod
+    async def add(self, domain_model: EntityTypeVar) -> None:
+        """
+        Аналог ABSRepository.add
+        """
+
+    @abc.abstractmethod
+    async def add_many(self, domain_model_sequence: Iterable[EntityTypeVar]) -> None:
+        """
+        Аналог ABSRepository.add_many
+        """
+
+    @abc.abstractmethod
+    async def update_one(self, domain_model: EntityTypeVar) -> None:
+        """
+        Аналог ABSRepository.update_one
+        """
+
+    @abc.abstractmethod
+    async def update_many(self, domain_model: Iterable[EntityTypeVar]) -> None:
+        """
+        Аналог ABSRepository.update_many
+        """
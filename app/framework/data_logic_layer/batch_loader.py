@@ -0,0 +1,122 @@
+from typing import TYPE_CHECKING, Any, Callable, Generic, Iterable, Optional, TypeVar
+
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator
+from app.framework.data_access_layer.lazy import LazyWrapper
+
+if TYPE_CHECKING:
+    from app.framework.data_logic_layer.identity_map import IdentityMap
+
+T = TypeVar('T')
+
+
+class BatchLoader(Generic[T]):
+    """
+    Пакетная загрузка сущностей одного типа по id в рамках карты идентичности.
+    Билдеры регистрируют id, когда готовят ленивое поле, а первое обращение к любому из них
+    извлекает все накопленные id одной выборкой через IN. Собранные сущности попадают в карту идентичности,
+    остальные LazyWrapper'ы забирают свои сущности уже оттуда, без запросов
+
+    Example:
+        >>> def load_actors(actors_ids: list[ActorID]) -> Iterable[tuple[ActorID, Actor]]:
+        >>>     for actor_dto in actor_repo.fetch_many(filter_params=ActorQO(actor_id=IN(actors_ids))):
+        >>>         yield actor_dto.actor_id, build_actor(actor_dto)
+        >>>
+        >>> loader = identity_map.loader(Actor, load_actors)
+        >>> first, second = loader.lazy(ActorID(1)), loader.lazy(ActorID(2))
+        >>> first.fetch()  # один запрос за обоими акторами
+        >>> second.fetch()  # из карты идентичности
+    """
+
+    __slots__ = ('_identity_map', '_entity_type', '_batch_load', '_pending', '_missing')
+
+    def __init__(
+            self,
+            identity_map: 'IdentityMap',
+            entity_type: type,
+            batch_load: Callable[[list[Any]], Iterable[tuple[Any, T]]]
+    ):
+        """
+        :param identity_map: Карта идентичности, в которую складываются загруженные сущности
+        :param entity_type: Тип сущности, ключ в карте идентичности
+        :param batch_load: Функция, которая по списку id извлекает сущности одним запросом и отдает пары (id, сущность)
+        """
+        self._identity_map = identity_map
+        self._entity_type = entity_type
+        self._batch_load = batch_load
+        # dict вместо set, чтобы id уходили в запрос в порядке регистрации
+        self._pending: dict[Any, None] = {}
+        self._missing: set = set()
+
+    def _is_resolved(self, storage_id: Any) -> bool:
+        return (self._entity_type, storage_id) in self._identity_map or storage_id in self._missing
+
+    def prime(self, storage_id: Any) -> None:
+        """
+        Зарегистрировать id, сущность будет извлечена вместе с остальными при первом обращении
+        :param storage_id: id сущности в хранилище
+        :return:
+        """
+        if storage_id is not None and not self._is_resolved(storage_id):
+            self._pending[storage_id] = None
+
+    def dispatch(self) -> None:
+        """
+        Извлечь все зарегистрированные id одной выборкой
+        :return:
+        """
+        if not self._pending:
+            return
+        storage_ids = list(self._pending)
+        self._pending.clear()
+        for storage_id, entity in self._batch_load(storage_ids):
+            if (self._entity_type, storage_id) not in self._identity_map:
+                self._identity_map.add(self._entity_type, storage_id, entity)
+        self._missing.update(i for i in storage_ids if (self._entity_type, i) not in self._identity_map)
+
+    def load(self, storage_id: Any) -> Optional[T]:
+        """
+        Получить сущность, вместе с ней извлекаются все зарегистрированные id
+        :param storage_id: id сущности в хранилище
+        :return: Сущность или None, если ее нет в хранилище
+        """
+        self.prime(storage_id)
+        if storage_id in self._pending:
+            self.dispatch()
+        return self._identity_map.get(self._entity_type, storage_id)
+
+    def load_many(self, storage_ids: Iterable[Any]) -> DBResultGenerator[T]:
+        """
+        Получить сущности, вместе с ними извлекаются все зарегистрированные id
+        :param storage_ids: id сущностей в хранилище
+        :return: Найденные сущности в порядке id
+        """
+        storage_ids = list(storage_ids)
+        for storage_id in storage_ids:
+            self.prime(storage_id)
+        if any(i in self._pending for i in storage_ids):
+            self.dispatch()
+        entities = [self._identity_map.get(self._entity_type, i) for i in storage_ids]
+        return DBResultGenerator(iter([i for i in entities if i is not None]))
+
+    def lazy(self, storage_id: Any) -> LazyWrapper[Optional[T]]:
+        """
+        Зарегистрировать id и подготовить ленивое извлечение сущности
+        :param storage_id: id сущности в хранилище
+        :return: настроенный LazyWrapper
+        """
+        self.prime(storage_id)
+        return LazyWrapper(method=self.load, params={'storage_id': storage_id}, loader=self)
+
+    def lazy_many(self, storage_ids: Iterable[Any]) -> LazyWrapper[DBResultGenerator[T]]:
+        """
+        Зарегистрировать id и подготовить ленивое извлечение последовательности сущностей
+        :param storage_ids: id сущностей в хранилище
+        :return: настроенный LazyWrapper
+        """
+        storage_ids = tuple(storage_ids)
+        for storage_id in storage_ids:
+            self.prime(storage_id)
+        return LazyWrapper(method=self.load_many, params={'storage_ids': storage_ids}, loader=self)
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -1,16 +1,20 @@
-from typing import TypeVar, Generic, Iterable
+from typing import TypeVar, Generic, Iterable, Optional
 
-from app.framework.data_access_layer.lazy import LazyWrapper
+from app.framework.data_access_layer.lazy import LazyWrapper, AsyncLazyWrapper
+from app.framework.data_logic_layer.identity_map import IdentityMap
 
 T = TypeVar('T')
 
 class ABSEntityFromRepoBuilder(Generic[T]):
     """
-    Билдер собирать сущности и агрегаты извлекаемые из хранилища
+    Билдер собирать сущности и агрегаты извлекаемые из хранилища.
+    Если передана карта идентичности UOW, уже собранные сущности берутся из нее
     """
     
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, identity_map: Optional[IdentityMap] = None, **kwargs):
         super().__init__()
+        self._identity_map = identity_map if identity_map is not None else IdentityMap()
+
     def build_lazy_one(self) -> LazyWrapper[T]:
         """
         Подготовить ленивое извлечение одной сущности
@@ -38,3 +42,35 @@ class ABSEntityFromRepoBuilder(Generic[T]):
         :return:
         """
         raise NotImplementedError
+
+
+class AsyncABSEntityFromRepoBuilder(Generic[T]):
+    """
+    Асинхронный вариант ABSEntityFromRepoBuilder, работает с AsyncABSRepository.
+    Независимые выборки внутри сборки могут выполняться конкурентно через asyncio.gather
+    """
+
+    def __init__(self, *args, identity_map: Optional[IdentityMap] = None, **kwargs):
+        super().__init__()
+        self._identity_map = identity_map if identity_map is not None else IdentityMap()
+
+    def build_lazy_one(self) -> AsyncLazyWrapper[T]:
+        """
+        Подготовить ленивое извлечение одной сущности
+        :return: настроенный AsyncLazyWrapper
+        """
+        return AsyncLazyWrapper(method=self.build_one, params={})
+
+    async def build_one(self) -> T:
+        """
+        Собрать и вернуть сущность
+        :return:
+        """
+        raise NotImplementedError
+
+    async def build_many(self) -> list[T]:
+        """
+        Собрать и вернуть
+        :return:
+        """
+        raise NotImplementedError
@@ -0,0 +1,59 @@
+from typing import Any, Hashable, Optional
+
+
+class EntityIdentity:
+    """
+    Равенство и хеш сущности по тождеству: тип сущности и id из хранилища.
+    Тип - класс, в котором объявлен _identity_field, так что роли одной сущности
+    (например IdeaAuthor и Manager одного User) равны между собой.
+    Новая сущность, у которой еще нет id, равна только самой себе.
+    Хеш новой сущности меняется, когда хранилище выдает ей id,
+    поэтому новые сущности не стоит держать в множествах и ключах словарей через сохранение.
+    Поля при сравнении не читаются, ленивые поля не извлекаются, сравнение значений - отдельными методами сущностей
+
+    Example:
+        >>> class Chain(EntityIdentity):
+        >>>     _identity_field = 'chain_id'
+        >>>
+        >>>     def __init__(self, chain_id: Optional[ChainID]):
+        >>>         self.chain_id = chain_id
+        >>>
+        >>> Chain(ChainID(1)) == Chain(ChainID(1))
+        True
+        >>> Chain(None) == Chain(None)
+        False
+    """
+
+    __slots__ = ()
+
+    # Имя поля с id сущности в хранилище
+    _identity_field: str
+    # Класс, который объявил _identity_field, проставляется автоматически
+    _identity_type: type
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '_identity_field' in cls.__dict__:
+            cls._identity_type = cls
+
+    def identity(self) -> Optional[tuple[type, Hashable]]:
+        """
+        Тождество сущности
+        :return: (тип, id из хранилища) или None для новой сущности
+        """
+        storage_id = getattr(self, self._identity_field)
+        if storage_id is None:
+            return None
+        return self._identity_type, storage_id
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, EntityIdentity):
+            return NotImplemented
+        identity = self.identity()
+        return identity is not None and identity == other.identity()
+
+    def __hash__(self) -> int:
+        identity = self.identity()
+        return hash(identity) if identity is not None else id(self)
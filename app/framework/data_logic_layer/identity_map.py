@@ -0,0 +1,111 @@
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+from app.framework.data_access_layer.query_object.values import QueryParamComparison
+from app.framework.data_access_layer.values import Empty
+from app.framework.data_logic_layer.batch_loader import BatchLoader
+
+T = TypeVar('T')
+
+
+class IdentityMap:
+    """
+    Карта идентичности в рамках одного UOW. Хранит уже собранные сущности/агрегаты,
+    ключом служит тип сущности и id из хранилища, чтобы одна и та же запись
+    не извлекалась и не собиралась повторно
+
+    Example:
+        >>> identity_map = IdentityMap()
+        >>> chain = identity_map.get_or_build(Chain, chain_id, lambda: chain_builder.build_one())
+        >>> chain is identity_map.get(Chain, chain_id)
+        True
+    """
+
+    __slots__ = ('_entities', '_loaders')
+
+    def __init__(self):
+        self._entities: dict[tuple[type, Any], Any] = {}
+        self._loaders: dict[type, BatchLoader] = {}
+
+    def get(self, entity_type: type, storage_id: Any, default: Optional[T] = None) -> Optional[T]:
+        """
+        Получить уже собранную сущность
+        :param entity_type: Тип сущности
+        :param storage_id: id сущности в хранилище
+        :param default: Что вернуть, если сущности еще нет в карте
+        :return: Сущность или default
+        """
+        return self._entities.get((entity_type, storage_id), default)
+
+    def get_by_id_query(self, entity_type: type, query_object: Any, id_field: str) -> Optional[T]:
+        """
+        Получить уже собранную сущность для выборки по одному id.
+        Подходит ли сущность под остальные фильтры, карта не знает, поэтому объект фильтрации
+        с чем-то кроме id (например is_deleted=False) карту не использует и всегда идет в хранилище
+        :param entity_type: Тип сущности
+        :param query_object: Объект фильтрации выборки
+        :param id_field: Поле объекта фильтрации с id сущности
+        :return: Сущность или None
+
+        Example:
+            >>> identity_map.get_by_id_query(Chain, ChainQO(chain_id=chain_id), 'chain_id')  # из карты
+            >>> identity_map.get_by_id_query(Chain, ChainQO(chain_id=chain_id, is_deleted=False), 'chain_id')
+            None
+        """
+        storage_id = getattr(query_object, id_field, None)
+        if storage_id is None or isinstance(storage_id, (Empty, QueryParamComparison)):
+            return None
+        if query_object != type(query_object)(**{id_field: storage_id}):
+            return None
+        return self.get(entity_type, storage_id)
+
+    def add(self, entity_type: type, storage_id: Any, entity: T) -> T:
+        """
+        Положить сущность в карту. Новые сущности, у которых еще нет id из хранилища, не запоминаются
+        :param entity_type: Тип сущности
+        :param storage_id: id сущности в хранилище
+        :param entity: Собранная сущность
+        :return: Переданная сущность
+        """
+        if storage_id is not None:
+            self._entities[(entity_type, storage_id)] = entity
+        return entity
+
+    def get_or_build(self, entity_type: type, storage_id: Any, build: Callable[[], T]) -> T:
+        """
+        Получить сущность из карты, а если ее там нет - собрать и запомнить
+        :param entity_type: Тип сущности
+        :param storage_id: id сущности в хранилище
+        :param build: Функция без аргументов, которая извлекает и собирает сущность
+        :return: Сущность
+        """
+        key = (entity_type, storage_id)
+        if key in self._entities:
+            return self._entities[key]
+        return self.add(entity_type, storage_id, build())
+
+    def loader(self, entity_type: type, batch_load: Callable[[list[Any]], Iterable[tuple[Any, T]]]) -> BatchLoader[T]:
+        """
+        Пакетный загрузчик сущностей типа, один на карту. Создается при первом обращении,
+        последующие обращения получают тот же загрузчик и его batch_load
+        :param entity_type: Тип сущности
+        :param batch_load: Функция, которая по списку id извлекает сущности одним запросом и отдает пары (id, сущность)
+        :return: Загрузчик
+        """
+        loader = self._loaders.get(entity_type)
+        if loader is None:
+            loader = self._loaders[entity_type] = BatchLoader(self, entity_type, batch_load)
+        return loader
+
+    def clear(self) -> None:
+        """
+        Забыть все сущности и зарегистрированные в загрузчиках id
+        :return:
+        """
+        self._entities.clear()
+        self._loaders.clear()
+
+    def __contains__(self, key: tuple[type, Any]) -> bool:
+        return key in self._entities
+
+    def __len__(self) -> int:
+        return len(self._entities)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Any
 
@@ -14,13 +14,18 @@ class BaseMeta:
     version: Optional[int] = None
     is_deleted: bool = False
     is_changed: bool = False
+    # Имена полей сущности, измененных с момента извлечения из хранилища
+    changed_fields: set[str] = field(default_factory=set)
 
 
 class MetaManipulation:
     """
-    Класс отвечающий за работу с доп информацией из хранилища, находящейся в сущности/агрегате
+    Класс отвечающий за работу с доп информацией из хранилища, находящейся в сущности/агрегате.
+    Сам слотов не добавляет, _meta объявляется в __slots__ наследника
     """
 
+    __slots__ = ()
+
     _meta: BaseMeta
 
     def update_meta(self, new_meta: BaseMeta):
@@ -34,6 +39,15 @@ class MetaManipulation:
     def replace_id_from_meta(self):
         raise NotImplementedError()
 
+    def set_id_from_storage(self, id_from_storage: Any):
+        """
+        Проставить id, выданный хранилищем при добавлении новой сущности
+        :param id_from_storage:
+        :return:
+        """
+        self._meta.id_from_storage = id_from_storage
+        self.replace_id_from_meta()
+
     def mark_deleted(self):
         """
         Пометить сущность как удаленную
@@ -41,12 +55,29 @@ class MetaManipulation:
         """
         self._meta.is_deleted = True
 
-    def mark_changed(self):
+    def mark_changed(self, *fields: str):
         """
         Пометить сущность как измененную
+        :param fields: Имена измененных полей сущности, если не переданы - сущность сохраняется целиком
         :return:
         """
         self._meta.is_changed = True
+        self._meta.changed_fields.update(fields)
+
+    def get_changed_fields(self) -> set[str]:
+        """
+        Получить имена измененных полей сущности
+        :return: Пустое множество, если сущность не изменена или изменена целиком
+        """
+        return self._meta.changed_fields
+
+    def mark_saved(self):
+        """
+        Сбросить пометки об изменениях после записи в хранилище
+        :return:
+        """
+        self._meta.is_changed = False
+        self._meta.changed_fields.clear()
 
     def is_deleted(self) -> bool:
         """
@@ -69,6 +100,21 @@ class MetaManipulation:
         """
         return self._meta.id_from_storage is None
 
+    def get_version(self) -> Optional[int]:
+        """
+        Получить версию записи в хранилище, по ней проверяется, что запись не изменили параллельно
+        :return: None, если сущность извлечена без версии
+        """
+        return self._meta.version
+
+    def set_version(self, version: Optional[int]):
+        """
+        Установить версию записи в хранилище
+        :param version:
+        :return:
+        """
+        self._meta.version = version
+
     def get_created_at(self) -> Optional[datetime]:
         """
         Получить дату создания
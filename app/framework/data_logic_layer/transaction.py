@@ -0,0 +1,88 @@
+import abc
+from typing import Any, Callable
+
+
+class ABSTransaction(abc.ABC):
+    """
+    Транзакция хранилища, которой управляет UOW. Повторные commit/rollback без begin ничего не делают,
+    поэтому UOW может безопасно откатывать транзакцию при выходе, даже если она уже зафиксирована
+    """
+
+    def __init__(self):
+        self.is_active = False
+
+    def begin(self) -> None:
+        """
+        Начать транзакцию
+        :return:
+        """
+        if self.is_active:
+            return
+        self._begin()
+        self.is_active = True
+
+    def commit(self) -> None:
+        """
+        Зафиксировать изменения
+        :return:
+        """
+        if not self.is_active:
+            return
+        self.is_active = False
+        self._commit()
+
+    def rollback(self) -> None:
+        """
+        Откатить изменения
+        :return:
+        """
+        if not self.is_active:
+            return
+        self.is_active = False
+        self._rollback()
+
+    def on_commit(self, func: Callable[[], Any]) -> None:
+        """
+        Выполнить функцию, когда изменения станут видны остальным соединениям.
+        По умолчанию функция вызывается сразу, транзакция к этому моменту уже зафиксирована
+        :param func: Функция без аргументов, например сброс кеша
+        :return:
+        """
+        func()
+
+    async def run_sync(self, func: Callable, *args) -> Any:
+        """
+        Выполнить синхронную работу с хранилищем из асинхронного кода так,
+        чтобы она попала в эту транзакцию. По умолчанию функция вызывается напрямую
+        :param func: Синхронная функция
+        :param args: Аргументы функции
+        :return: Результат функции
+        """
+        return func(*args)
+
+    @abc.abstractmethod
+    def _begin(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _commit(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _rollback(self) -> None:
+        pass
+
+
+class NoTransaction(ABSTransaction):
+    """
+    Для хранилищ без транзакций и для тестов
+    """
+
+    def _begin(self) -> None:
+        pass
+
+    def _commit(self) -> None:
+        pass
+
+    def _rollback(self) -> None:
+        pass
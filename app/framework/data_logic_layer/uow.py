@@ -1,26 +1,206 @@
+from itertools import chain
+from typing import Any, Optional, Type
+
+from app.framework.data_access_layer.repository import ABSRepository
+from app.framework.data_logic_layer.identity_map import IdentityMap
+from app.framework.data_logic_layer.transaction import ABSTransaction, NoTransaction
+
+
 class BaseUnitOfWork:
     """
     Базовый UOW, работает по принципу дескриптора, при выходе из которого откатывается все, что не закоммичено
     Содержит в себе знания о способе конвертации (либо ссылки на BaseEntityFromRepoBuilder либо функция фнутри UOW)
     Содержит в себе специфичные выборки под конкретный кейс. Может быть более одного UOW принадлежащего разным агрегатам
+    Содержит карту идентичности, каждый вход в UOW начинается с пустой карты
+
+    Транзакция открывается лениво: выборки внутри UOW идут без нее, commit открывает транзакцию,
+    записывает зарегистрированные сущности и фиксирует ее. Выход откатывает все, что не было закоммичено.
+    Выборки и запись не находятся в одной транзакции: согласованность дает оптимистичная блокировка,
+    update_many проверяет версию каждой записи и при параллельном изменении откатывает весь commit
+    (VersionConflictException). Поэтому записывать через UOW можно только версионируемые сущности.
+    Сущности регистрируются через register_new/register_dirty/register_deleted и записываются
+    в порядке _flush_order, по одному пакетному запросу на тип. Сущность, тип которой не описан
+    в _flush_order, не регистрируется
 
+    Для ASGI тот же UOW работает через async with и acommit: запись вместе с транзакцией выполняется
+    через ABSTransaction.run_sync, в том же потоке, что и асинхронный ORM
+
+    Example:
+        >>> class SomeUOW(BaseUnitOfWork):
+        >>>
+        >>>     @property
+        >>>     def _flush_order(self) -> list[tuple[type, ABSRepository]]:
+        >>>         # Сначала то, на что ссылаются остальные
+        >>>         return [(Author, self._author_repo), (Idea, self._idea_repo)]
+        >>>
+        >>> with uow:
+        >>>     uow.register_new(idea)
+        >>>     uow.register_dirty(author)
+        >>>     uow.commit()
+        >>>
+        >>> async with uow:
+        >>>     uow.register_dirty(idea)
+        >>>     await uow.acommit()
     """
+
+    transaction_cls: Type[ABSTransaction] = NoTransaction
+    _transaction: Optional[ABSTransaction] = None
+
+    def __init__(self, transaction_cls: Optional[Type[ABSTransaction]] = None):
+        """
+        :param transaction_cls: Класс транзакции хранилища, по умолчанию транзакций нет
+        """
+        if transaction_cls is not None:
+            self.transaction_cls = transaction_cls
+        self.identity_map = IdentityMap()
+        self._clear_registered()
+
     def __enter__(self):
-        pass
+        self._start(self.transaction_cls())
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.rollback()
 
+    async def __aenter__(self):
+        self._start(self.transaction_cls())
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.arollback()
+
+    def _start(self, transaction: ABSTransaction) -> None:
+        """
+        Начать работу UOW, сама транзакция начнется в commit
+        """
+        self.identity_map = IdentityMap()
+        self._clear_registered()
+        self._transaction = transaction
+
+    @property
+    def _flush_order(self) -> list[tuple[type, ABSRepository]]:
+        """
+        Типы сущностей и репозитории, в которые они записываются, в порядке записи
+        :return:
+        """
+        return []
+
+    def _clear_registered(self) -> None:
+        self._new: dict[int, Any] = {}
+        self._dirty: dict[int, Any] = {}
+        self._deleted: dict[int, Any] = {}
+
+    def _check_registered_type(self, entity) -> None:
+        """
+        :raise ValueError: Тип сущности не описан в _flush_order, записать ее некуда
+        """
+        if not any(isinstance(entity, entity_type) for entity_type, _ in self._flush_order):
+            raise ValueError(f'{type(entity).__name__} is not described in {type(self).__name__}._flush_order')
+
+    def register_new(self, entity) -> None:
+        """
+        Зарегистрировать новую сущность, при коммите она будет добавлена в хранилище
+        :param entity:
+        :return:
+        """
+        self._check_registered_type(entity)
+        self._new[id(entity)] = entity
+
+    def register_dirty(self, entity) -> None:
+        """
+        Зарегистрировать измененную сущность, при коммите в хранилище уйдут только измененные поля
+        :param entity:
+        :return:
+        """
+        self._check_registered_type(entity)
+        if id(entity) not in self._new:
+            self._dirty[id(entity)] = entity
+
+    def register_deleted(self, entity) -> None:
+        """
+        Зарегистрировать удаленную сущность. Удаление мягкое: сущность помечается удаленной
+        и при коммите записывается вместе с измененными
+        :param entity:
+        :return:
+        """
+        self._check_registered_type(entity)
+        entity.mark_deleted()
+        entity.mark_changed('is_deleted')
+        self._new.pop(id(entity), None)
+        self._dirty.pop(id(entity), None)
+        self._deleted[id(entity)] = entity
+
+    def _flush(self) -> list:
+        """
+        Записать зарегистрированные сущности: для каждого типа один add_many и один update_many
+        :return: Записанные сущности
+        """
+        new = list(self._new.values())
+        changed = list(chain(self._dirty.values(), self._deleted.values()))
+        for entity_type, repository in self._flush_order:
+            new_of_type = [i for i in new if isinstance(i, entity_type)]
+            changed_of_type = [i for i in changed if isinstance(i, entity_type) and i.is_changed()]
+            if new_of_type:
+                repository.add_many(new_of_type)
+            if changed_of_type:
+                repository.update_many(changed_of_type)
+        flushed = list(chain(new, changed))
+        for entity in flushed:
+            entity.mark_saved()
+        self._clear_registered()
+        return flushed
+
+    def _after_commit(self, entities: list) -> None:
+        """
+        Вызывается после фиксации транзакции (через ABSTransaction.on_commit),
+        например чтобы сбросить кеш, зависящий от записанных сущностей
+        :param entities: Записанные сущности
+        :return:
+        """
+
     def rollback(self):
         """
         Откатить все изменения
         :return:
         """
-        pass
+        self._clear_registered()
+        if self._transaction is not None:
+            self._transaction.rollback()
 
     def commit(self):
         """
-        Закоммитить все изменения в хранилища
+        Закоммитить все изменения в хранилища. Если ничего не зарегистрировано, транзакция не открывается
+        :return:
+        """
+        if not (self._new or self._dirty or self._deleted):
+            return
+        if self._transaction is not None:
+            self._transaction.begin()
+        try:
+            flushed = self._flush()
+        except Exception:
+            self.rollback()
+            raise
+        if self._transaction is None:
+            self._after_commit(flushed)
+            return
+        self._transaction.commit()
+        self._transaction.on_commit(lambda: self._after_commit(flushed))
+
+    async def arollback(self):
+        """
+        Асинхронный вариант rollback
+        :return:
+        """
+        if self._transaction is None:
+            self.rollback()
+            return
+        await self._transaction.run_sync(self.rollback)
+
+    async def acommit(self):
+        """
+        Асинхронный вариант commit
         :return:
         """
-        pass
+        if self._transaction is None:
+            self.commit()
+            return
+        await self._transaction.run_sync(self.commit)
@@ -16,3 +16,6 @@ class IDTO:
     (модель взаимодействия с внешним миром, модель воспроизведения состояния, модель бизнеса)
     """
 
+    # Наследники могут быть слотовыми, например проекции для выборки подмножества полей
+    __slots__ = ()
+
@@ -1,4 +1,5 @@
 import os
+from itertools import chain
 from importlib import import_module
 from warnings import warn
 
@@ -44,6 +45,9 @@ class InjectorStorage:
           path: app.dal.idea_exchange.repo.IdeaRepository
         - name: ChainRepository
           path: app.dal.idea_exchange.repo.ChainRepository
+      transaction:
+        - name: Transaction
+          path: app.framework.data_logic_layer.vendor.django.transaction.DjangoTransaction
 
     Как инжектить, можно посмотреть в функции inject
     """
@@ -64,7 +68,7 @@ class InjectorStorage:
             return
         with open(config_path) as f:
             cfg = yaml.safe_load(f)
-        for i in cfg['injections']['repo']:
+        for i in chain.from_iterable(cfg['injections'].values()):
             name = i['name']
             path = i['path']
             if name in self.map:
@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+from app.framework.data_logic_layer.identity_map import IdentityMap
+
+
+class Entity:
+
+    def __init__(self, entity_id: int):
+        self.entity_id = entity_id
+
+
+class TestBatchLoader(TestCase):
+
+    def setUp(self) -> None:
+        self.batches = []
+        self.identity_map = IdentityMap()
+        self.loader = self.identity_map.loader(Entity, self.batch_load)
+
+    def batch_load(self, entities_ids: list[int]):
+        self.batches.append(entities_ids)
+        for i in entities_ids:
+            if i > 0:
+                yield i, Entity(i)
+
+    def test_primed_ids_are_loaded_in_one_batch(self):
+        first, second = self.loader.lazy(1), self.loader.lazy(2)
+        many = self.loader.lazy_many([3, 1])
+        self.assertEqual(self.batches, [])
+        self.assertEqual(second.fetch().entity_id, 2)
+        self.assertEqual(first.fetch().entity_id, 1)
+        self.assertEqual([i.entity_id for i in many.fetch()], [3, 1])
+        self.assertEqual(self.batches, [[1, 2, 3]])
+
+    def test_loaded_entities_are_in_identity_map(self):
+        entity = self.loader.load(1)
+        self.assertIs(self.identity_map.get(Entity, 1), entity)
+        self.assertIs(self.loader.load(1), entity)
+        self.assertEqual(self.batches, [[1]])
+
+    def test_entities_from_identity_map_are_not_loaded(self):
+        entity = self.identity_map.add(Entity, 1, Entity(1))
+        self.assertIs(self.loader.lazy(1).fetch(), entity)
+        self.assertEqual(self.batches, [])
+
+    def test_missing_ids_are_not_loaded_again(self):
+        self.assertIsNone(self.loader.load(-1))
+        self.assertIsNone(self.loader.load(-1))
+        self.assertEqual(list(self.loader.load_many([-1, 1])), [self.identity_map.get(Entity, 1)])
+        self.assertEqual(self.batches, [[-1], [1]])
+
+    def test_one_loader_per_entity_type(self):
+        self.assertIs(self.identity_map.loader(Entity, lambda ids: []), self.loader)
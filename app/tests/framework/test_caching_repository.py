@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from unittest import TestCase
+from unittest.mock import patch
+
+from app.framework.data_access_layer.cache import InMemoryCache
+from app.framework.data_access_layer.caching_repository import CachingRepository
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator
+from app.framework.data_access_layer.query_object.base import ABSQueryObject
+from app.framework.data_access_layer.query_object.values import IN
+from app.framework.data_access_layer.values import Empty
+
+
+@dataclass(frozen=True, slots=True)
+class SomeQO(ABSQueryObject):
+    some_id: int = Empty()
+    name: str = Empty()
+
+
+class FakeRepository:
+
+    def __init__(self, session):
+        self.calls = []
+
+    def fetch_one(self, filter_params=None, order_params=None, raise_if_empty=True):
+        self.calls.append('fetch_one')
+        return {'id': filter_params.some_id}
+
+    def fetch_many(self, filter_params=None, order_params=None, offset=0, limit=None, chunk_size=1000,
+                   projection=None):
+        self.calls.append('fetch_many')
+        return DBResultGenerator(iter([1, 2, 3]))
+
+    def update_many(self, domain_model):
+        self.calls.append('update_many')
+
+
+class CachedFakeRepository(CachingRepository):
+    repository_cls = FakeRepository
+
+
+class TestCachingRepository(TestCase):
+
+    def setUp(self) -> None:
+        self.cache = InMemoryCache()
+        self.repo = CachedFakeRepository(None, cache=self.cache)
+        self.inner = self.repo._repository
+
+    def test_reads_are_cached_by_query_object(self):
+        self.assertEqual(self.repo.fetch_one(SomeQO(some_id=1)), {'id': 1})
+        self.assertEqual(self.repo.fetch_one(SomeQO(some_id=1)), {'id': 1})
+        self.assertEqual(self.repo.fetch_one(SomeQO(some_id=2)), {'id': 2})
+        self.assertEqual(self.inner.calls, ['fetch_one', 'fetch_one'])
+
+    def test_comparison_values_are_part_of_key(self):
+        self.repo.fetch_many(SomeQO(some_id=IN([1, 2])))
+        self.repo.fetch_many(SomeQO(some_id=IN([1, 2])))
+        self.repo.fetch_many(SomeQO(some_id=IN([1, 3])))
+        self.repo.fetch_many(SomeQO(some_id=IN([1, 2])), limit=1)
+        self.assertEqual(self.inner.calls, ['fetch_many'] * 3)
+
+    def test_cached_fetch_many_is_iterable_again(self):
+        self.assertEqual(list(self.repo.fetch_many()), [1, 2, 3])
+        self.assertEqual(list(self.repo.fetch_many()), [1, 2, 3])
+
+    def test_shared_values_are_copied(self):
+        entity = self.repo.fetch_one(SomeQO(some_id=1))
+        entity['id'] = 2
+        self.assertEqual(self.repo.fetch_one(SomeQO(some_id=1)), {'id': 1})
+        self.assertEqual(self.inner.calls, ['fetch_one'])
+
+    def test_write_invalidates(self):
+        self.repo.fetch_one(SomeQO(some_id=1))
+        self.repo.update_many([])
+        self.repo.fetch_one(SomeQO(some_id=1))
+        self.assertEqual(self.inner.calls, ['fetch_one', 'update_many', 'fetch_one'])
+
+    def test_invalidation_is_shared_through_backend(self):
+        self.repo.fetch_one(SomeQO(some_id=1))
+        CachedFakeRepository(None, cache=self.cache).invalidate()
+        self.repo.fetch_one(SomeQO(some_id=1))
+        self.assertEqual(self.inner.calls, ['fetch_one', 'fetch_one'])
+
+
+class DeferredCachedFakeRepository(CachedFakeRepository):
+
+    def __init__(self, session, cache=None):
+        super().__init__(session, cache=cache)
+        self.on_commit_callbacks = []
+
+    def _on_commit(self, func) -> None:
+        self.on_commit_callbacks.append(func)
+
+
+class TestCachingRepositoryInTransaction(TestCase):
+
+    def setUp(self) -> None:
+        self.cache = InMemoryCache()
+        self.repo = DeferredCachedFakeRepository(None, cache=self.cache)
+        self.inner = self.repo._repository
+
+    def test_invalidation_waits_for_commit(self):
+        self.repo.fetch_one(SomeQO(some_id=1))
+        self.repo.update_many([])
+        other_repo = CachedFakeRepository(None, cache=self.cache)
+        other_repo.fetch_one(SomeQO(some_id=1))
+        self.assertEqual(other_repo._repository.calls, [])
+        for callback in self.repo.on_commit_callbacks:
+            callback()
+        other_repo.fetch_one(SomeQO(some_id=1))
+        self.assertEqual(other_repo._repository.calls, ['fetch_one'])
+
+    def test_uncommitted_reads_are_not_cached(self):
+        self.repo.update_many([])
+        self.repo.fetch_one(SomeQO(some_id=1))
+        self.repo.fetch_one(SomeQO(some_id=1))
+        self.assertEqual(self.inner.calls, ['update_many', 'fetch_one', 'fetch_one'])
+        self.assertEqual(CachedFakeRepository(None, cache=self.cache).fetch_one(SomeQO(some_id=2)), {'id': 2})
+        self.assertEqual(len(self.cache), 2)
+
+
+class TestInMemoryCache(TestCase):
+
+    def test_lru_eviction(self):
+        cache = InMemoryCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+    def test_ttl(self):
+        cache = InMemoryCache(default_ttl=10)
+        with patch('app.framework.data_access_layer.cache.time.monotonic', return_value=100):
+            cache.set('a', 1)
+            cache.set('b', 2, ttl=30)
+        with patch('app.framework.data_access_layer.cache.time.monotonic', return_value=115):
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(len(cache), 1)
@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+from app.exceptions.orm import ResultRewindException
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator, FORWARD_ONLY
+
+
+class TestDBResultGenerator(TestCase):
+
+    def test_full_replay(self):
+        result = DBResultGenerator(iter(range(5)))
+        self.assertEqual(list(result), [0, 1, 2, 3, 4])
+        result.drop_position()
+        self.assertEqual(list(result), [0, 1, 2, 3, 4])
+
+    def test_rewind_before_source_is_exhausted(self):
+        result = DBResultGenerator(iter(range(5)))
+        self.assertEqual([next(result), next(result)], [0, 1])
+        result.drop_position()
+        self.assertEqual(list(result), [0, 1, 2, 3, 4])
+        result.drop_position()
+        result.drop_position()
+        self.assertEqual(list(result), [0, 1, 2, 3, 4])
+
+    def test_forward_only(self):
+        result = DBResultGenerator(iter(range(3)), cache_size=FORWARD_ONLY)
+        result.drop_position()
+        self.assertEqual(list(result), [0, 1, 2])
+        self.assertEqual(len(result._cache), 0)
+        with self.assertRaises(ResultRewindException):
+            result.drop_position()
+
+    def test_ring_buffer_replays_last_items(self):
+        result = DBResultGenerator(iter(range(10)), cache_size=3)
+        self.assertEqual(list(result), list(range(10)))
+        result.drop_position()
+        self.assertEqual(list(result), [7, 8, 9])
+
+    def test_negative_cache_size(self):
+        with self.assertRaises(ValueError):
+            DBResultGenerator(iter([]), cache_size=-1)
+
+    def test_indexing_reads_source_only_as_far_as_needed(self):
+        source = iter(range(10))
+        result = DBResultGenerator(source)
+        self.assertEqual(result[2], 2)
+        self.assertEqual(result[1:4], [1, 2, 3])
+        self.assertEqual(next(source), 4)
+        self.assertEqual(next(result), 0)
+        self.assertEqual(result[-1], 9)
+        with self.assertRaises(IndexError):
+            result[10]
+
+    def test_len_and_bool(self):
+        result = DBResultGenerator(iter(range(3)))
+        self.assertTrue(result)
+        with self.assertRaises(TypeError):
+            len(result)
+        self.assertEqual(list(result), [0, 1, 2])
+        self.assertEqual(len(result), 3)
+        self.assertFalse(DBResultGenerator(iter([])))
+
+    def test_ring_buffer_indexing(self):
+        result = DBResultGenerator(iter(range(10)), cache_size=3)
+        self.assertEqual(result[5], 5)
+        self.assertEqual(result[3:6], [3, 4, 5])
+        with self.assertRaises(ResultRewindException):
+            result[2]
+        with self.assertRaises(ResultRewindException):
+            DBResultGenerator(iter(range(3)), cache_size=FORWARD_ONLY)[0]
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Optional
+from unittest import TestCase
+
+from app.framework.data_logic_layer.entity import EntityIdentity
+
+
+@dataclass(eq=False)
+class Person(EntityIdentity):
+    _identity_field = 'person_id'
+
+    person_id: Optional[int]
+
+
+@dataclass(eq=False)
+class Author(Person):
+    pass
+
+
+class Book(EntityIdentity):
+    __slots__ = ('book_id',)
+
+    _identity_field = 'book_id'
+
+    def __init__(self, book_id: Optional[int]):
+        self.book_id = book_id
+
+
+class TestEntityIdentity(TestCase):
+
+    def test_equal_by_type_and_storage_id(self):
+        self.assertEqual(Person(1), Person(1))
+        self.assertNotEqual(Person(1), Person(2))
+        self.assertNotEqual(Person(1), Book(1))
+        self.assertNotEqual(Person(1), 1)
+
+    def test_roles_of_one_entity_are_equal(self):
+        self.assertEqual(Author(1), Person(1))
+        self.assertEqual(len({Author(1), Person(1)}), 1)
+
+    def test_new_entities_are_equal_only_to_themselves(self):
+        book = Book(None)
+        self.assertEqual(book, book)
+        self.assertNotEqual(book, Book(None))
+        self.assertEqual(len({book, Book(None)}), 2)
+        self.assertIsNone(book.identity())
+        self.assertEqual(Book(1).identity(), (Book, 1))
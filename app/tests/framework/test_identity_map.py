@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+from unittest import TestCase
+
+from app.framework.data_access_layer.query_object.base import ABSQueryObject
+from app.framework.data_access_layer.query_object.values import IN
+from app.framework.data_access_layer.values import Empty
+from app.framework.data_logic_layer.identity_map import IdentityMap
+
+
+class Entity:
+
+    def __init__(self, entity_id: int):
+        self.entity_id = entity_id
+
+
+@dataclass(frozen=True, slots=True)
+class EntityQO(ABSQueryObject):
+    entity_id: Optional[Union[int, Empty, IN]] = Empty()
+    is_deleted: Optional[Union[bool, Empty]] = Empty()
+
+
+class TestIdentityMapByIdQuery(TestCase):
+
+    def setUp(self) -> None:
+        self.identity_map = IdentityMap()
+        self.entity = self.identity_map.add(Entity, 1, Entity(1))
+
+    def test_id_query(self):
+        self.assertIs(self.identity_map.get_by_id_query(Entity, EntityQO(entity_id=1), 'entity_id'), self.entity)
+        self.assertIsNone(self.identity_map.get_by_id_query(Entity, EntityQO(entity_id=2), 'entity_id'))
+
+    def test_filtered_query_is_not_answered_from_map(self):
+        # Сущность в карте могла не пройти is_deleted=False, это решает только хранилище
+        query_object = EntityQO(entity_id=1, is_deleted=False)
+        self.assertIsNone(self.identity_map.get_by_id_query(Entity, query_object, 'entity_id'))
+
+    def test_query_without_single_id(self):
+        self.assertIsNone(self.identity_map.get_by_id_query(Entity, EntityQO(), 'entity_id'))
+        self.assertIsNone(self.identity_map.get_by_id_query(Entity, EntityQO(entity_id=IN([1])), 'entity_id'))
+        self.assertIsNone(self.identity_map.get_by_id_query(Entity, EntityQO(entity_id=1) | EntityQO(), 'entity_id'))
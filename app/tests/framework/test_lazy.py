@@ -0,0 +1,116 @@
+from unittest import TestCase
+
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator, FORWARD_ONLY
+from app.framework.data_access_layer.lazy import LazyLoaderInEntity, LazyWrapper, lazy_slots, prefetch
+from app.framework.data_logic_layer.identity_map import IdentityMap
+
+
+class Leaf:
+
+    def __init__(self, leaf_id: int):
+        self.leaf_id = leaf_id
+
+
+class Node:
+    leaves: LazyLoaderInEntity[list[Leaf]] = LazyLoaderInEntity()
+
+    def __init__(self, node_id: int, leaves):
+        self.node_id = node_id
+        self.leaves = leaves
+
+
+class Root:
+    node: LazyLoaderInEntity[Node] = LazyLoaderInEntity()
+
+    def __init__(self, node):
+        self.node = node
+
+
+class TestPrefetch(TestCase):
+
+    def setUp(self) -> None:
+        self.batches = []
+        self.identity_map = IdentityMap()
+        self.node_loader = self.identity_map.loader(Node, self.load_nodes)
+        self.leaf_loader = self.identity_map.loader(Leaf, self.load_leaves)
+
+    def load_nodes(self, nodes_ids: list[int]):
+        self.batches.append(('nodes', nodes_ids))
+        for i in nodes_ids:
+            yield i, Node(i, self.leaf_loader.lazy_many([i * 10, i * 10 + 1]))
+
+    def load_leaves(self, leaves_ids: list[int]):
+        self.batches.append(('leaves', leaves_ids))
+        for i in leaves_ids:
+            yield i, Leaf(i)
+
+    def test_one_batch_per_path_step(self):
+        roots = [Root(self.node_loader.lazy(i)) for i in (1, 2, 1)]
+        self.batches.clear()
+        prefetch(roots, 'node.leaves')
+        self.assertEqual(self.batches, [('nodes', [1, 2]), ('leaves', [10, 11, 20, 21])])
+        self.batches.clear()
+        self.assertEqual([i.leaf_id for root in roots for i in root.node.leaves], [10, 11, 20, 21, 10, 11])
+        self.assertEqual(self.batches, [])
+
+    def test_descriptor_cache_is_filled(self):
+        root = Root(self.node_loader.lazy(1))
+        prefetch([root], 'node')
+        self.assertIs(root._lazy_wrapper_cache_node, self.identity_map.get(Node, 1))
+
+    def test_wrappers_without_loader_and_plain_values(self):
+        calls = []
+        roots = [
+            Root(LazyWrapper(method=lambda: calls.append(1) or Node(1, []), params={})),
+            Root(Node(2, [Leaf(20)])),
+            Root(None)
+        ]
+        prefetch(roots, 'node.leaves')
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.batches, [])
+
+    def test_forward_only_result_in_field(self):
+        nodes = [
+            Node(i, LazyWrapper(
+                method=lambda i=i: DBResultGenerator(iter([Leaf(i * 10), Leaf(i * 10 + 1)]), cache_size=FORWARD_ONLY),
+                params={}
+            )) for i in (1, 2)
+        ]
+        prefetch([Root(i) for i in nodes], 'node.leaves')
+        for _ in range(2):
+            self.assertEqual([i.leaf_id for node in nodes for i in node.leaves], [10, 11, 20, 21])
+
+
+class SlottedNode:
+    __slots__ = ('node_id',) + lazy_slots('leaves')
+
+    leaves: LazyLoaderInEntity[list[Leaf]] = LazyLoaderInEntity()
+
+    def __init__(self, node_id: int, leaves):
+        self.node_id = node_id
+        self.leaves = leaves
+
+
+class TestSlottedLazyLoader(TestCase):
+
+    def test_lazy_state_is_kept_in_slots(self):
+        calls = []
+        node = SlottedNode(1, LazyWrapper(method=lambda: calls.append(1) or [Leaf(10)], params={}))
+        self.assertFalse(hasattr(node, '__dict__'))
+        self.assertFalse(SlottedNode.leaves.is_resolved(node))
+        self.assertIs(node.leaves, node.leaves)
+        self.assertEqual(calls, [1])
+        self.assertTrue(SlottedNode.leaves.is_resolved(node))
+
+    def test_new_value_drops_cache(self):
+        node = SlottedNode(1, LazyWrapper(method=lambda: [Leaf(10)], params={}))
+        self.assertEqual([i.leaf_id for i in node.leaves], [10])
+        node.leaves = LazyWrapper(method=lambda: [Leaf(20)], params={})
+        self.assertEqual([i.leaf_id for i in node.leaves], [20])
+
+    def test_slots_are_required(self):
+        with self.assertRaises((TypeError, RuntimeError)):
+            class BrokenNode:
+                __slots__ = ('node_id',)
+
+                leaves: LazyLoaderInEntity[list[Leaf]] = LazyLoaderInEntity()
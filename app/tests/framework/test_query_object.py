@@ -0,0 +1,83 @@
+from dataclasses import dataclass, FrozenInstanceError
+from datetime import datetime
+from unittest import TestCase
+
+from app.framework.data_access_layer.order_object.base import ABSOrderObject
+from app.framework.data_access_layer.order_object.values import ASC, DESC
+from app.framework.data_access_layer.query_object.base import ABSQueryObject, QOAnd, QOOr, QONot
+from app.framework.data_access_layer.query_object.values import IN, NOT_IN, GTE, BETWEEN
+from app.framework.data_access_layer.values import Empty
+
+
+@dataclass(frozen=True, slots=True)
+class SomeQO(ABSQueryObject):
+    some_id: int = Empty()
+    created_at: datetime = Empty()
+
+
+@dataclass(frozen=True, slots=True)
+class SomeOO(ABSOrderObject):
+    created_at: ASC = Empty()
+
+
+class TestCompositeQueryObject(TestCase):
+
+    def test_operators(self):
+        a, b = SomeQO(some_id=1), SomeQO(some_id=2)
+        self.assertEqual(a | b, QOOr(a, b))
+        self.assertEqual(a & b, QOAnd(a, b))
+        self.assertEqual(~a, QONot(a))
+        self.assertNotEqual(a | b, a & b)
+
+    def test_same_connector_is_flattened(self):
+        a, b, c = SomeQO(some_id=1), SomeQO(some_id=2), SomeQO(some_id=3)
+        self.assertEqual(((a | b) | c).operands, (a, b, c))
+        self.assertEqual((a & (b | c)).operands, (a, QOOr(b, c)))
+
+    def test_double_negation(self):
+        a = SomeQO(some_id=1)
+        self.assertIs(~~a, a)
+
+    def test_empty_connector(self):
+        with self.assertRaises(ValueError):
+            QOOr()
+
+
+class TestCanonicalQueryObject(TestCase):
+
+    def test_hashable_and_canonical(self):
+        self.assertEqual(SomeQO(some_id=IN([3, 1, 3])), SomeQO(some_id=IN((1, 3))))
+        self.assertEqual(len({SomeQO(some_id=IN([3, 1])), SomeQO(some_id=IN([1, 3])), SomeQO(some_id=GTE(1))}), 2)
+        self.assertEqual(NOT_IN([2, 1, 2]).value, (1, 2))
+        self.assertEqual(hash(SomeOO(created_at=ASC())), hash(SomeOO(created_at=ASC())))
+        self.assertNotEqual(SomeOO(created_at=ASC()), SomeOO(created_at=DESC()))
+
+    def test_unsortable_values_keep_order(self):
+        self.assertEqual(IN(['1', 2, '1']).value, ('1', 2))
+
+    def test_immutable_and_slotted(self):
+        qo = SomeQO(some_id=1)
+        with self.assertRaises(FrozenInstanceError):
+            qo.some_id = 2
+        with self.assertRaises(AttributeError):
+            IN([1]).value = [2]
+        with self.assertRaises(AttributeError):
+            (qo | qo).operands = ()
+        self.assertFalse(hasattr(qo, '__dict__'))
+        self.assertFalse(hasattr(IN([1]), '__dict__'))
+
+    def test_to_bytes(self):
+        moment = datetime(2023, 1, 1, 12, 30)
+        self.assertEqual(
+            SomeQO(some_id=IN([2, 1]), created_at=BETWEEN(moment, moment)).to_bytes(),
+            b'["SomeQO",[["some_id",["IN",[1,2]]],["created_at",["BETWEEN",'
+            b'["2023-01-01T12:30:00","2023-01-01T12:30:00"]]]]]'
+        )
+        self.assertEqual(SomeQO().to_bytes(), b'["SomeQO",[]]')
+        self.assertEqual(SomeOO(created_at=DESC()).to_bytes(), b'["SomeOO",[["created_at","DESC"]]]')
+
+    def test_connector_operands_order_does_not_change_bytes(self):
+        a, b = SomeQO(some_id=1), SomeQO(some_id=2)
+        self.assertEqual((a | b).to_bytes(), (b | a).to_bytes())
+        self.assertNotEqual((a | b).to_bytes(), (a & b).to_bytes())
+        self.assertNotEqual((~a).to_bytes(), a.to_bytes())
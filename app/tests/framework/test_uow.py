@@ -0,0 +1,143 @@
+import asyncio
+from unittest import TestCase
+
+from app.framework.data_logic_layer.meta import BaseMeta, MetaManipulation
+from app.framework.data_logic_layer.transaction import ABSTransaction
+from app.framework.data_logic_layer.uow import BaseUnitOfWork
+
+
+class Parent(MetaManipulation):
+
+    def __init__(self, is_changed: bool = False):
+        self._meta = BaseMeta(is_changed=is_changed)
+
+
+class Child(MetaManipulation):
+
+    def __init__(self, is_changed: bool = False):
+        self._meta = BaseMeta(is_changed=is_changed)
+
+
+class FakeRepository:
+
+    def __init__(self, name: str, calls: list, fail: bool = False):
+        self.name = name
+        self.calls = calls
+        self.fail = fail
+
+    def add_many(self, entities):
+        self.calls.append((self.name, 'add_many', len(entities)))
+
+    def update_many(self, entities):
+        if self.fail:
+            raise RuntimeError()
+        self.calls.append((self.name, 'update_many', len(entities)))
+
+
+class FakeTransaction(ABSTransaction):
+    log = []
+
+    def _begin(self):
+        self.log.append('begin')
+
+    def _commit(self):
+        self.log.append('commit')
+
+    def _rollback(self):
+        self.log.append('rollback')
+
+
+class FakeOrderedUOW(BaseUnitOfWork):
+
+    def __init__(self, fail_on_child: bool = False):
+        super().__init__(transaction_cls=FakeTransaction)
+        self.calls = []
+        self.after_commit_calls = []
+        self.parent_repo = FakeRepository('parent', self.calls)
+        self.child_repo = FakeRepository('child', self.calls, fail=fail_on_child)
+
+    @property
+    def _flush_order(self):
+        return [(Parent, self.parent_repo), (Child, self.child_repo)]
+
+    def _after_commit(self, entities: list) -> None:
+        self.after_commit_calls.append((len(entities), FakeTransaction.log[-1]))
+
+
+class TestBaseUnitOfWork(TestCase):
+
+    def setUp(self) -> None:
+        FakeTransaction.log = []
+
+    def test_flush_order_and_one_call_per_type(self):
+        uow = FakeOrderedUOW()
+        with uow:
+            uow.register_dirty(Child(is_changed=True))
+            uow.register_new(Child())
+            uow.register_new(Parent())
+            uow.register_new(Parent())
+            uow.register_dirty(Parent(is_changed=False))
+            uow.commit()
+        self.assertEqual(uow.calls, [('parent', 'add_many', 2), ('child', 'add_many', 1), ('child', 'update_many', 1)])
+        self.assertEqual(FakeTransaction.log, ['begin', 'commit'])
+
+    def test_deleted_entity_is_written_as_changed(self):
+        uow = FakeOrderedUOW()
+        child = Child()
+        with uow:
+            uow.register_deleted(child)
+            uow.commit()
+        self.assertTrue(child.is_deleted())
+        self.assertFalse(child.is_changed())
+        self.assertEqual(uow.calls, [('child', 'update_many', 1)])
+
+    def test_not_committed_changes_are_rolled_back(self):
+        uow = FakeOrderedUOW()
+        with uow:
+            uow.register_new(Parent())
+        self.assertEqual(uow.calls, [])
+        # Транзакция открывается только в commit
+        self.assertEqual(FakeTransaction.log, [])
+
+    def test_empty_commit_does_not_open_transaction(self):
+        uow = FakeOrderedUOW()
+        with uow:
+            uow.commit()
+        self.assertEqual(FakeTransaction.log, [])
+
+    def test_failed_flush_rolls_back(self):
+        uow = FakeOrderedUOW(fail_on_child=True)
+        with self.assertRaises(RuntimeError):
+            with uow:
+                uow.register_new(Parent())
+                uow.register_dirty(Child(is_changed=True))
+                uow.commit()
+        self.assertEqual(FakeTransaction.log, ['begin', 'rollback'])
+
+    def test_unknown_entity_type(self):
+        uow = FakeOrderedUOW()
+        with uow:
+            with self.assertRaises(ValueError):
+                uow.register_new(object())
+
+    def test_after_commit_runs_after_transaction_commit(self):
+        uow = FakeOrderedUOW()
+        with uow:
+            uow.register_new(Parent())
+            uow.register_deleted(Child())
+            uow.commit()
+        # Хук видит все записанные сущности и вызывается уже после фиксации транзакции
+        self.assertEqual(uow.after_commit_calls, [(2, 'commit')])
+
+    def test_async_context_and_commit(self):
+        uow = FakeOrderedUOW()
+
+        async def run():
+            async with uow:
+                uow.register_new(Parent())
+                await uow.acommit()
+                uow.register_new(Child())
+
+        asyncio.run(run())
+        self.assertEqual(uow.calls, [('parent', 'add_many', 1)])
+        self.assertEqual(FakeTransaction.log, ['begin', 'commit'])
@@ -97,3 +97,16 @@ class TestChain(TestCase):
         self.assertIn(self.chain_link2, self.chain.chain_links)
         self.assertTrue(self.chain.chain_links[0]._meta.is_changed)
         self.assertTrue(self.chain.chain_links[1]._meta.is_changed)
+
+    def test_chain_link_identity(self):
+        same_chain_link = ChainLinkFactory.create_chain_link(
+            chain_link_id=self.chain_link1.chain_link_id,
+            actor=ActorFactory.create_actor(),
+            name=generate_random_string(10)
+        )
+        new_chain_link = ChainLinkFactory.create_chain_link(chain_link_id=None, actor=None)
+        self.assertEqual(same_chain_link, self.chain_link1)
+        self.assertFalse(same_chain_link.has_same_values(self.chain_link1))
+        self.assertIn(same_chain_link, {self.chain_link1})
+        self.assertEqual(new_chain_link, new_chain_link)
+        self.assertNotEqual(new_chain_link, ChainLinkFactory.create_chain_link(chain_link_id=None, actor=None))
@@ -0,0 +1,64 @@
+"""
+Чтение пользователя по первичному ключу через UserRepository и через CachingRepository
+поверх разных бекендов кеша
+
+Запуск из корня проекта:
+    python -m benchmarks.caching_repository [количество чтений]
+
+База sqlite создается во временной директории, кеш прогревается до замера,
+так что для CachingRepository замеряется чтение из кеша: ключ поколения и само значение
+"""
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from benchmarks.utils import setup_django
+
+DEFAULT_READS = 5_000
+USERS = 50
+REPEAT = 5
+
+
+def main(reads: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3')
+        from django.conf import settings
+        # Алиасы бекендов добавляются до первого обращения к django caches
+        settings.CACHES = {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'file': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(Path(tmp) / 'cache'),
+            },
+        }
+        from django.core.management import call_command
+        from accounts.models import CustomUser
+        from app.dal.auth.qo import UserQO
+        from app.dal.auth.repo import UserRepository
+        from app.domain.auth.core import UserID
+        from app.framework.data_access_layer.cache import InMemoryCache
+        from app.framework.data_access_layer.caching_repository import CachingRepository
+        from app.framework.data_access_layer.vendor.django.cache import DjangoCache
+
+        call_command('migrate', verbosity=0)
+        users_ids = [CustomUser.objects.create(username=f'bench {i}').id for i in range(USERS)]
+        query_objects = [UserQO(user_id=UserID(users_ids[i % USERS])) for i in range(reads)]
+        repositories = {
+            'database': UserRepository(None),
+            'in-memory': CachingRepository(None, repository=UserRepository(None), cache=InMemoryCache()),
+            'locmem': CachingRepository(None, repository=UserRepository(None), cache=DjangoCache()),
+            'file': CachingRepository(None, repository=UserRepository(None), cache=DjangoCache('file')),
+        }
+        print(f'{"repository":>10} {"reads":>8} {"us per read":>12}')
+        for name, repo in repositories.items():
+            for query_object in query_objects[:USERS]:
+                repo.fetch_one(query_object)
+            elapsed = min(timeit.repeat(
+                lambda: [repo.fetch_one(i) for i in query_objects], number=1, repeat=REPEAT
+            ))
+            print(f'{name:>10} {reads:>8} {elapsed / reads * 1_000_000:>12.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_READS)
@@ -0,0 +1,73 @@
+"""
+Память и скорость доступа к полям собранных ChainLink
+
+Запуск из корня проекта:
+    python -m benchmarks.entity_memory [количество звеньев]
+
+Сравнивается ChainLink со __slots__ и его наследник без __slots__, у которого поля
+и состояние LazyLoaderInEntity лежат в __dict__ (как было до слотов в MetaManipulation).
+Актор каждого звена ленивый, первое чтение вычисляет LazyWrapper, повторное берет значение из кеша
+"""
+import sys
+import timeit
+import tracemalloc
+
+from app.domain.idea_exchange.main import Actor, ChainLink
+from app.framework.data_access_layer.lazy import LazyWrapper
+
+DEFAULT_COUNT = 100_000
+REPEAT = 5
+
+
+class DictChainLink(ChainLink):
+    pass
+
+
+def build(cls: type, count: int, actor: Actor) -> list[ChainLink]:
+    return [
+        cls(
+            chain_link_id=i,
+            actor=LazyWrapper(method=lambda: actor, params={}),
+            name=f'chain link {i}',
+            number_of_related_ideas=0
+        ) for i in range(count)
+    ]
+
+
+def instance_size(obj: object) -> int:
+    """
+    Размер самого объекта вместе с его __dict__, без значений полей
+    """
+    return sys.getsizeof(obj) + (sys.getsizeof(obj.__dict__) if hasattr(obj, '__dict__') else 0)
+
+
+def read_fields(chain_links: list[ChainLink]) -> None:
+    for i in chain_links:
+        i.actor, i.name, i.chain_link_id
+
+
+def main(count: int) -> None:
+    actor = Actor(actor_id=1, name='actor', managers=[], groups=[])
+    print(
+        f'{"mode":>6} {"count":>8} {"instance bytes":>15} {"bytes per entity":>17} '
+        f'{"first read, ms":>15} {"cached read, ms":>16}'
+    )
+    for mode, cls in (('dict', DictChainLink), ('slots', ChainLink)):
+        tracemalloc.start()
+        chain_links = build(cls, count, actor)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        first_read = min(
+            timeit.timeit(lambda: read_fields(i), number=1)
+            for i in [chain_links] + [build(cls, count, actor) for _ in range(REPEAT - 1)]
+        )
+        cached_read = min(timeit.repeat(lambda: read_fields(chain_links), number=1, repeat=REPEAT))
+        print(
+            f'{mode:>6} {count:>8} {instance_size(chain_links[0]):>15} {size // count:>17} '
+            f'{first_read * 1000:>15.1f} {cached_read * 1000:>16.1f}'
+        )
+        del chain_links
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
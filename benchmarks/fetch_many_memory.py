@@ -0,0 +1,93 @@
+"""
+Пиковый RSS при чтении идей через DjangoRepository.fetch_many в зависимости от количества строк
+и режима кеширования DBResultGenerator (cache_size)
+
+Запуск из корня проекта:
+    python -m benchmarks.fetch_many_memory [количество строк ...]
+
+Каждый замер выполняется в отдельном процессе, база sqlite создается во временной директории
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.utils import setup_django, peak_rss_kb, current_rss_kb, run_worker
+
+DEFAULT_ROWS = (1_000, 10_000, 50_000)
+BODY_SIZE = 1024
+MODES = ('queryset', 'full', 'ring', 'forward_only')
+# Размер кольцевого буфера для режима ring
+RING_SIZE = 100
+
+
+def fill_db(db_path: Path, rows: int) -> None:
+    setup_django(db_path)
+    from django.core.management import call_command
+    from accounts.models import CustomUser
+    from idea.models import Idea, Chain, ChainLink
+
+    call_command('migrate', verbosity=0)
+    author = CustomUser.objects.create(username='bench')
+    accept_chain_link = ChainLink.objects.create(name='accept', is_technical=True)
+    reject_chain_link = ChainLink.objects.create(name='reject', is_technical=True)
+    chain = Chain.objects.create(
+        author=author,
+        accept_chain_link=accept_chain_link,
+        reject_chain_link=reject_chain_link
+    )
+    body = 'x' * BODY_SIZE
+    batch_size = 5_000
+    for start in range(0, rows, batch_size):
+        Idea.objects.bulk_create(
+            Idea(
+                name=f'idea {i}',
+                author=author,
+                body=body,
+                chain=chain,
+                current_chain_link=accept_chain_link,
+                idea_uid=f'bench-{i}'
+            ) for i in range(start, min(start + batch_size, rows))
+        )
+
+
+def worker(db_path: Path, mode: str, rows: int) -> None:
+    if mode == 'fill':
+        fill_db(db_path, rows)
+        return
+    setup_django(db_path)
+    from app.dal.idea_exchange.repo import IdeaRepository
+    from app.framework.data_access_layer.db_result_generator import FORWARD_ONLY, FULL_REPLAY
+    from idea.models import Idea
+
+    repo = IdeaRepository(None)
+    rss_before = current_rss_kb()
+    total = 0
+    if mode == 'queryset':
+        # Поведение до потоковой выборки: QuerySet целиком оседает в памяти
+        for orm_idea in Idea.objects.all()[:rows]:
+            total += len(repo._orm_to_dto(orm_idea).name)
+    else:
+        cache_size = {'full': FULL_REPLAY, 'ring': RING_SIZE, 'forward_only': FORWARD_ONLY}[mode]
+        for dto in repo.fetch_many(limit=rows, cache_size=cache_size):
+            total += len(dto.name)
+    print(rss_before, peak_rss_kb())
+
+
+def main(rows_list: tuple[int, ...]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'bench.sqlite3'
+        # Наполнение тоже в отдельном процессе: на linux ru_maxrss наследуется дочерними процессами
+        run_worker('benchmarks.fetch_many_memory', str(db_path), 'fill', str(max(rows_list)))
+        print(f'{"rows":>10} {"mode":>12} {"peak rss, KiB":>14} {"delta, KiB":>11}')
+        for rows in rows_list:
+            for mode in MODES:
+                output = run_worker('benchmarks.fetch_many_memory', str(db_path), mode, str(rows))
+                rss_before, rss_after = (int(i) for i in output.split())
+                print(f'{rows:>10} {mode:>12} {rss_after:>14} {rss_after - rss_before:>11}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker(Path(sys.argv[2]), sys.argv[3], int(sys.argv[4]))
+    else:
+        main(tuple(int(i) for i in sys.argv[1:]) or DEFAULT_ROWS)
@@ -0,0 +1,55 @@
+"""
+Скорость перевода ABSQueryObject в параметры django .filter()
+
+Запуск из корня проекта:
+    python -m benchmarks.qo_translation [количество вызовов]
+
+Сравнивается перевод по строкам маппинга на каждый вызов (как было до CompiledQoTranslator)
+и собранный один раз переводчик
+"""
+import sys
+import timeit
+
+from app.framework.data_access_layer.values import Empty
+from benchmarks.utils import setup_django
+
+DEFAULT_CALLS = 100_000
+
+
+def translate_by_mapping(repo, filter_params):
+    from django.db.models import Q
+    from app.framework.data_access_layer.query_object.values import QueryParamComparison
+
+    conditions = []
+    for mapper_line in repo._qo_orm_fields_mapping:
+        field_val = getattr(filter_params, mapper_line.qo_field_name)
+        if field_val is Empty():
+            continue
+        if isinstance(field_val, QueryParamComparison):
+            lookup = repo._comparison_registry.resolve(type(field_val))
+            conditions.append(lookup(mapper_line.orm_field_name, mapper_line.modifier, field_val))
+        else:
+            conditions.append((mapper_line.orm_field_name, mapper_line.modifier(field_val)))
+    return Q(*conditions)
+
+
+def main(calls: int) -> None:
+    setup_django()
+    from app.dal.idea_exchange.qo import ChainLinkQO
+    from app.dal.idea_exchange.repo import ChainLinkDjangoRepository
+    from app.framework.data_access_layer.query_object.values import IN
+
+    repo = ChainLinkDjangoRepository(None)
+    qo = ChainLinkQO(chain_id=IN([1, 2, 3]), is_deleted=False, is_technical=False)
+    assert translate_by_mapping(repo, qo) == repo._qo_to_filter_params(qo)
+    print(f'{"mode":>10} {"calls":>10} {"us per call":>12}')
+    for mode, func in (
+            ('mapping', lambda: translate_by_mapping(repo, qo)),
+            ('compiled', lambda: repo._qo_to_filter_params(qo)),
+    ):
+        seconds = min(timeit.repeat(func, number=calls, repeat=3))
+        print(f'{mode:>10} {calls:>10} {seconds / calls * 1_000_000:>12.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CALLS)
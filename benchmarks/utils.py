@@ -0,0 +1,68 @@
+import os
+import resource
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path: Optional[Path] = None):
+    """
+    Настроить django для замеров вне тестового раннера
+    :param db_path: Путь до файла sqlite, если не передан - используется база из настроек проекта
+    :return:
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sz.settings')
+    os.environ.setdefault('INJECTION_CFG_PATH', str(BASE_DIR / 'cfg.yaml'))
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    import django
+    from django.conf import settings
+    if db_path is not None:
+        settings.DATABASES['default']['NAME'] = str(db_path)
+    django.setup()
+
+
+def peak_rss_kb() -> int:
+    """
+    Пиковый RSS текущего процесса в килобайтах (на linux ru_maxrss уже в килобайтах)
+    :return:
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak // 1024
+    return peak
+
+
+def current_rss_kb() -> int:
+    """
+    Текущий RSS процесса в килобайтах, если /proc недоступен - пиковый
+    :return:
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return peak_rss_kb()
+
+
+def run_worker(module: str, *args: str) -> str:
+    """
+    Запустить замер в отдельном процессе, чтобы пиковый RSS не накапливался между замерами
+    :param module: Модуль бенчмарка, который умеет работать в режиме --worker
+    :param args: Аргументы воркера
+    :return: stdout воркера
+    """
+    result = subprocess.run(
+        [sys.executable, '-m', module, '--worker', *args],
+        cwd=BASE_DIR,
+        check=True,
+        capture_output=True,
+        text=True
+    )
+    return result.stdout.strip()
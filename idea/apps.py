@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class IdeaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'idea'
+
+    def ready(self):
+        from idea import signals  # noqa: F401
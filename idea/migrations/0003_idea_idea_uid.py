@@ -0,0 +1,33 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:30
+
+from uuid import uuid4
+
+from django.db import migrations, models
+
+
+def fill_idea_uid(apps, schema_editor):
+    Idea = apps.get_model('idea', 'Idea')
+    for idea in Idea.objects.filter(idea_uid__isnull=True).only('id'):
+        idea.idea_uid = str(uuid4())
+        idea.save(update_fields=['idea_uid'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idea', '0002_alter_actor_groups_alter_actor_managers_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idea',
+            name='idea_uid',
+            field=models.CharField(max_length=255, null=True, verbose_name='Уникальный идентификатор'),
+        ),
+        migrations.RunPython(fill_idea_uid, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='idea',
+            name='idea_uid',
+            field=models.CharField(max_length=255, unique=True, verbose_name='Уникальный идентификатор'),
+        ),
+    ]
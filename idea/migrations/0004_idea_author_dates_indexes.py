@@ -0,0 +1,21 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idea', '0003_idea_idea_uid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['author', 'created_at'], name='idea_idea_author__a2885a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['author', 'updated_at'], name='idea_idea_author__97e1fd_idx'),
+        ),
+    ]
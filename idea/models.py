@@ -42,5 +42,12 @@ class Idea(BaseModel):
     current_chain_link = models.ForeignKey('idea.ChainLink', verbose_name='Текущий этап', on_delete=models.CASCADE)
     idea_uid = models.CharField(verbose_name='Уникальный идентификатор', max_length=255, unique=True)
 
+    class Meta:
+        indexes = [
+            # История идей автора выбирается диапазонами по датам
+            models.Index(fields=['author', 'created_at']),
+            models.Index(fields=['author', 'updated_at']),
+        ]
+
     def __str__(self):
         return f'{self.id} - {self.name}'
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from app.dal.idea_exchange.repo import CachedActorRepository
+from app.dll.idea_exchange.uow import CHAIN_CHOICES_CACHE_KEY
+from app.framework.injector.main import inject
+from idea.models import Chain, Actor
+
+
+@receiver([post_save, post_delete], sender=Chain)
+def invalidate_chain_choices(sender, using, **kwargs):
+    # Цепочки меняются и в обход ChainUOW, например из админки. Сброс только после фиксации транзакции,
+    # иначе параллельный запрос успеет снова закешировать список без этих изменений
+    transaction.on_commit(lambda: inject('Cache')().delete(CHAIN_CHOICES_CACHE_KEY), using=using)
+
+
+@receiver([post_save, post_delete], sender=Actor)
+@receiver(m2m_changed, sender=Actor.managers.through)
+@receiver(m2m_changed, sender=Actor.groups.through)
+def invalidate_actors(sender, using, **kwargs):
+    transaction.on_commit(CachedActorRepository(None).invalidate, using=using)
@@ -1,3 +1,1040 @@
-from django.test import TestCase
+from contextlib import aclosing
+from datetime import timedelta
+from unittest.mock import patch
+from itertools import chain
+from dataclasses import dataclass
+from uuid import uuid4
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser, SiteGroup
+from app.cases.idea_exchange.idea import IdeaCase, ChainCase
+from app.dal.auth.repo import SiteGroupRepository, UserRepository
+from app.dal.idea_exchange.dto import ChainIdDalDto
+from app.dal.idea_exchange.oo import IdeaOO
+from app.dal.idea_exchange.qo import IdeaQO, ChainLinkQO, ManagerQO, ChainQO, ActorQO
+from app.dal.idea_exchange.repo import IdeaRepository, ChainLinkDjangoRepository, ActorRepository, \
+    ChainRepository, ManagerRepository, CachedActorRepository
+from app.dll.idea_exchange.uow import IdeaUOW, ChainUOW
+from app.domain.auth.core import UserID
+from app.domain.idea_exchange.main import Idea as DomainIdea
+from app.domain.idea_exchange.types import ChainID, ActorID, ChainLinkID
+from app.exceptions.orm import InvalidCursorException, VersionConflictException
+from app.framework.data_access_layer.db_result_generator import DBResultGenerator
+from app.framework.data_access_layer.lazy import prefetch
+from app.framework.data_access_layer.order_object.values import ASC, DESC
+from app.framework.data_access_layer.query_object.registry import ComparisonRegistry
+from app.framework.data_access_layer.query_object.values import IN, GTE, QueryParamComparison, GT, LT, LTE, \
+    NOT_IN, IS_NULL, BETWEEN, STARTSWITH, CONTAINS
+from app.framework.data_access_layer.vendor.django.async_repository import AsyncDjangoRepository
+from app.framework.data_access_layer.vendor.django.repository import CompiledQoTranslator, QoOrmMapperLine, \
+    django_comparison_registry
+from idea.models import Idea, Chain, ChainLink, Actor
+from idea.views import AllMyIdeas, IdeaCreate
+
+
+# Тесты работают со своим кешем в памяти процесса, чтобы cache.clear() не трогал кеш настроенного бекенда
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class IdeaExchangeDBTestCase(TestCase):
+    """
+    Наполняет базу минимальной цепочкой: автор, технические звенья и сама цепочка
+    """
+
+    def setUp(self) -> None:
+        # Кеш не откатывается вместе с транзакцией теста
+        cache.clear()
+        self.author = CustomUser.objects.create(username='author')
+        self.accept_chain_link = ChainLink.objects.create(name='accept', is_technical=True)
+        self.reject_chain_link = ChainLink.objects.create(name='reject', is_technical=True)
+        self.chain = Chain.objects.create(
+            author=self.author,
+            accept_chain_link=self.accept_chain_link,
+            reject_chain_link=self.reject_chain_link
+        )
+
+    def create_chain_links(self, count: int) -> list[ChainLink]:
+        chain_links = []
+        for i in range(count):
+            actor = Actor.objects.create(name=f'actor {i}')
+            actor.managers.set([self.author])
+            chain_links.append(
+                ChainLink.objects.create(
+                    name=f'link {i}', is_technical=False, order=i, chain=self.chain, actor=actor
+                )
+            )
+        return chain_links
+
+    @staticmethod
+    def create_idea_uow(**kwargs) -> IdeaUOW:
+        return IdeaUOW(
+            idea_repo_cls=IdeaRepository,
+            chain_repo_cls=ChainRepository,
+            actor_repo_cls=ActorRepository,
+            user_repo_cls=UserRepository,
+            group_repo_cls=SiteGroupRepository,
+            chain_link_repository_cls=ChainLinkDjangoRepository,
+            manager_repository=ManagerRepository,
+            **kwargs
+        )
+
+    @staticmethod
+    def create_chain_uow(**kwargs) -> ChainUOW:
+        return ChainUOW(
+            chain_repo_cls=ChainRepository,
+            actor_repo_cls=ActorRepository,
+            user_repo_cls=UserRepository,
+            group_repo_cls=SiteGroupRepository,
+            chain_link_repository_cls=ChainLinkDjangoRepository,
+            manager_repository=ManagerRepository,
+            **kwargs
+        )
+
+    def create_idea_case(self) -> IdeaCase:
+        return IdeaCase(uow_cls=self.create_idea_uow, chain_uow_class=self.create_chain_uow)
+
+    def create_ideas(self, count: int, author: CustomUser = None, current_chain_link: ChainLink = None) -> list[Idea]:
+        author = author or self.author
+        return [
+            Idea.objects.create(
+                name=f'idea {i}',
+                author=author,
+                body=f'body {i}',
+                chain=self.chain,
+                current_chain_link=current_chain_link or self.accept_chain_link,
+                idea_uid=str(uuid4())
+            ) for i in range(count)
+        ]
+
+
+class TestDjangoRepositoryFetchMany(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ideas = self.create_ideas(5)
+        self.repo = IdeaRepository(None)
+
+    def test_offset_and_limit_are_applied(self):
+        dtos = list(self.repo.fetch_many(
+            filter_params=IdeaQO(author_id=UserID(self.author.id)),
+            order_params=IdeaOO(created_at=ASC()),
+            offset=1,
+            limit=2
+        ))
+        self.assertEqual([i.idea_id for i in dtos], [i.id for i in self.ideas[1:3]])
+
+    def test_offset_without_limit(self):
+        dtos = list(self.repo.fetch_many(order_params=IdeaOO(created_at=ASC()), offset=3))
+        self.assertEqual([i.idea_id for i in dtos], [i.id for i in self.ideas[3:]])
+
+    def test_query_is_lazy_and_single(self):
+        with self.assertNumQueries(0):
+            result = self.repo.fetch_many(chunk_size=2)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(result)), 5)
+
+
+class TestChainLinkRepository(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.chain_links = [
+            ChainLink.objects.create(name=f'link {i}', is_technical=False, order=i, chain=self.chain)
+            for i in range(3)
+        ]
+        for n, chain_link in enumerate(self.chain_links):
+            Idea.objects.bulk_create(
+                Idea(
+                    name='idea',
+                    author=self.author,
+                    body='body',
+                    chain=self.chain,
+                    current_chain_link=chain_link,
+                    idea_uid=f'{chain_link.id}-{i}'
+                ) for i in range(n)
+            )
+        self.repo = ChainLinkDjangoRepository(None)
+
+    def test_number_of_related_ideas_in_one_query(self):
+        with self.assertNumQueries(1):
+            dtos = list(self.repo.fetch_many(filter_params=ChainLinkQO(chain_id=self.chain.id)))
+        self.assertEqual(
+            {i.chain_link_id: i.number_of_related_ideas for i in dtos},
+            {i.id: n for n, i in enumerate(self.chain_links)}
+        )
+
+    def test_number_of_related_ideas_in_fetch_one(self):
+        dto = self.repo.fetch_one(filter_params=ChainLinkQO(chain_link_id=self.chain_links[2].id))
+        self.assertEqual(dto.number_of_related_ideas, 2)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestM2MIdsPrefetch(TestCase):
+
+    def setUp(self) -> None:
+        self.users = [CustomUser.objects.create(username=f'user {i}') for i in range(4)]
+        self.groups = [SiteGroup.objects.create(name=f'group {i}') for i in range(3)]
+        for n, group in enumerate(self.groups):
+            group.customuser_set.set(self.users[:n])
+        self.actors = [Actor.objects.create(name=f'actor {i}') for i in range(5)]
+        for n, actor in enumerate(self.actors):
+            actor.managers.set(self.users[:n])
+            actor.groups.set(self.groups[:n])
+
+    def test_actor_ids_one_query_per_relation(self):
+        with self.assertNumQueries(3):
+            dtos = list(ActorRepository(None).fetch_many())
+        self.assertEqual(
+            {i.actor_id: (sorted(i.manager_ids), sorted(i.groups_ids)) for i in dtos},
+            {
+                i.id: (sorted(u.id for u in self.users[:n]), sorted(g.id for g in self.groups[:n]))
+                for n, i in enumerate(self.actors)
+            }
+        )
+
+    def test_group_users_one_query_per_relation(self):
+        with self.assertNumQueries(2):
+            dtos = list(SiteGroupRepository(None).fetch_many())
+        self.assertEqual(
+            {i.group_id: sorted(i.users_ids_in_group) for i in dtos},
+            {i.id: sorted(u.id for u in self.users[:n]) for n, i in enumerate(self.groups)}
+        )
+
+    def test_chunks_are_prefetched_separately(self):
+        with self.assertNumQueries(1 + 3 * 2):
+            dtos = list(ActorRepository(None).fetch_many(chunk_size=2))
+        self.assertEqual(len(dtos), 5)
+
+
+class TestIdentityMapInIdeaUOW(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.chain_links = self.create_chain_links(3)
+
+    def list_ideas(self) -> list:
+        uow = self.create_idea_uow()
+        with uow:
+            ideas = uow.fetch_ideas(IdeaQO(author_id=UserID(self.author.id)))
+            return [uow.convert_idea_to_output(i) for i in ideas]
+
+    def test_chain_is_built_once_for_all_ideas(self):
+        uow = self.create_idea_uow()
+        self.create_ideas(3, current_chain_link=self.chain_links[0])
+        with uow:
+            ideas = uow.fetch_ideas(IdeaQO(author_id=UserID(self.author.id)))
+            self.assertEqual(len({id(i.chain) for i in ideas}), 1)
+            self.assertEqual(len({id(i.current_chain_link) for i in ideas}), 1)
+            self.assertIs(ideas[0].current_chain_link, next(iter(ideas[0].chain.chain_links)))
+
+    def test_number_of_queries_does_not_depend_on_page_size(self):
+        self.create_ideas(2, current_chain_link=self.chain_links[0])
+        with CaptureQueriesContext(connection) as small_page:
+            self.assertEqual(len(self.list_ideas()), 2)
+        Idea.objects.all().delete()
+        self.create_ideas(10, current_chain_link=self.chain_links[1])
+        with CaptureQueriesContext(connection) as big_page:
+            self.assertEqual(len(self.list_ideas()), 10)
+        self.assertEqual(len(small_page.captured_queries), len(big_page.captured_queries))
+
+
+class TestChainGraphFetch(IdeaExchangeDBTestCase):
+    """
+    Регрессия на количество запросов: агрегат идеи собирается фиксированным числом запросов,
+    независимо от количества звеньев в цепочке
+    """
+
+    # идея, автор идеи, цепочка, звенья, технические звенья, акторы + 2 m2m, группы + 1 m2m, менеджеры,
+    # выборка транзакцию UOW не открывает
+    FETCH_IDEA_QUERIES = 11
+
+    def fetch_idea(self, idea_uid: str):
+        with CaptureQueriesContext(connection) as queries:
+            idea_uo_dto = self.create_idea_case().fetch_idea(idea_uid)
+        return idea_uo_dto, len(queries.captured_queries)
+
+    def test_fetch_idea_number_of_queries(self):
+        chain_links = self.create_chain_links(2)
+        idea = self.create_ideas(1, current_chain_link=chain_links[1])[0]
+        group = SiteGroup.objects.create(name='group')
+        group.customuser_set.set([self.author])
+        chain_links[0].actor.groups.set([group])
+        with self.assertNumQueries(self.FETCH_IDEA_QUERIES):
+            idea_uo_dto = self.create_idea_case().fetch_idea(idea.idea_uid)
+        self.assertEqual([i.chain_link_id for i in idea_uo_dto.chain_links], [i.id for i in chain_links])
+        self.assertEqual([i.is_current for i in idea_uo_dto.chain_links], [False, True])
+
+    def test_number_of_queries_does_not_depend_on_chain_length(self):
+        chain_links = self.create_chain_links(2)
+        idea = self.create_ideas(1, current_chain_link=chain_links[0])[0]
+        _, short_chain_queries = self.fetch_idea(idea.idea_uid)
+        self.create_chain_links(8)
+        idea_uo_dto, long_chain_queries = self.fetch_idea(idea.idea_uid)
+        self.assertEqual(len(idea_uo_dto.chain_links), 10)
+        self.assertEqual(short_chain_queries, long_chain_queries)
+
+    def test_permission_check_does_not_hit_db(self):
+        chain_links = self.create_chain_links(3)
+        idea = self.create_ideas(1, current_chain_link=chain_links[2])[0]
+        uow = self.create_idea_uow()
+        with uow:
+            domain_idea = uow.fetch_idea(IdeaQO(idea_uid=idea.idea_uid))
+            manager = ManagerRepository(None).fetch_one(filter_params=ManagerQO(user_id=UserID(self.author.id)))
+            with self.assertNumQueries(0):
+                self.assertTrue(domain_idea.is_manager_valid_actor(manager))
+
+    def test_lazy_mode_is_still_available(self):
+        chain_links = self.create_chain_links(3)
+        idea = self.create_ideas(1, current_chain_link=chain_links[0])[0]
+        uow = self.create_idea_uow(chain_graph_fetch=False)
+        with uow:
+            domain_idea = uow.fetch_idea(IdeaQO(idea_uid=idea.idea_uid))
+            self.assertEqual(
+                [i.chain_link_id for i in domain_idea.chain.chain_links], [i.id for i in chain_links]
+            )
+
+    def test_deleted_technical_chain_links_are_loaded(self):
+        chain_links = self.create_chain_links(2)
+        idea = self.create_ideas(1, current_chain_link=chain_links[0])[0]
+        ChainLink.objects.filter(pk__in=[self.accept_chain_link.pk, self.reject_chain_link.pk]).update(is_deleted=True)
+        for chain_graph_fetch in (True, False):
+            with self.subTest(chain_graph_fetch=chain_graph_fetch):
+                uow = self.create_idea_uow(chain_graph_fetch=chain_graph_fetch)
+                with uow:
+                    domain_chain = uow.fetch_idea(IdeaQO(idea_uid=idea.idea_uid)).chain
+                    self.assertEqual(domain_chain.accept_chain_link.chain_link_id, self.accept_chain_link.pk)
+                    self.assertEqual(domain_chain.reject_chain_link.chain_link_id, self.reject_chain_link.pk)
+
+    def walk_lazy_chain(self, idea_uid: str) -> tuple[int, int]:
+        uow = self.create_idea_uow(chain_graph_fetch=False)
+        with uow:
+            domain_idea = uow.fetch_idea(IdeaQO(idea_uid=idea_uid))
+            with CaptureQueriesContext(connection) as queries:
+                managers = [
+                    manager
+                    for chain_link in domain_idea.chain.chain_links
+                    for manager in chain(
+                        chain_link.actor.managers, *(i.managers for i in chain_link.actor.groups)
+                    )
+                ]
+        return len(managers), len(queries.captured_queries)
+
+    def test_lazy_actors_are_loaded_in_batches(self):
+        group = SiteGroup.objects.create(name='group')
+        group.customuser_set.set([self.author])
+        chain_links = self.create_chain_links(2)
+        for i in chain_links:
+            i.actor.groups.set([group])
+        idea = self.create_ideas(1, current_chain_link=chain_links[0])[0]
+        short_chain_managers, short_chain_queries = self.walk_lazy_chain(idea.idea_uid)
+        for i in self.create_chain_links(8):
+            i.actor.groups.set([group])
+        long_chain_managers, long_chain_queries = self.walk_lazy_chain(idea.idea_uid)
+        self.assertEqual((short_chain_managers, long_chain_managers), (2 * 2, 10 * 2))
+        self.assertEqual(short_chain_queries, long_chain_queries)
+
+    def test_moving_idea_does_not_load_actors(self):
+        chain_links = self.create_chain_links(3)
+        idea = self.create_ideas(1, current_chain_link=chain_links[0])[0]
+        uow = self.create_idea_uow(chain_graph_fetch=False)
+        with uow:
+            domain_idea = uow.fetch_idea(IdeaQO(idea_uid=idea.idea_uid))
+            self.assertTrue(domain_idea.is_editable())
+            with self.assertNumQueries(0):
+                domain_idea.move_to_next_chain_link()
+                self.assertFalse(domain_idea.is_editable())
+                domain_idea.move_to_next_chain_link()
+                self.assertEqual(domain_idea.chain.element_position(domain_idea.current_chain_link), 3)
+                self.assertIs(
+                    domain_idea.chain.chain_link_by_id(ChainLinkID(chain_links[1].id)),
+                    domain_idea.chain.chain_links[1]
+                )
+
+    def test_prefetch_makes_permission_checks_free(self):
+        chain_links = self.create_chain_links(4)
+        for i in chain_links:
+            self.create_ideas(1, current_chain_link=i)
+        manager = ManagerRepository(None).fetch_one(filter_params=ManagerQO(user_id=UserID(self.author.id)))
+        uow = self.create_idea_uow(chain_graph_fetch=False)
+        with uow:
+            ideas = uow.fetch_ideas(IdeaQO(author_id=UserID(self.author.id)))
+            # акторы с двумя m2m и менеджеры, групп у акторов нет
+            with self.assertNumQueries(3 + 1):
+                prefetch(ideas, 'current_chain_link.actor.managers', 'current_chain_link.actor.groups.managers')
+            with self.assertNumQueries(0):
+                self.assertTrue(all(i.is_manager_valid_actor(manager) for i in ideas))
+
+
+class TestDjangoRepositoryAggregates(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.create_ideas(3)
+        self.other_author = CustomUser.objects.create(username='other')
+        self.repo = IdeaRepository(None)
+
+    def test_count_is_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.repo.count(filter_params=IdeaQO(author_id=UserID(self.author.id))), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.repo.count(filter_params=IdeaQO(author_id=UserID(self.other_author.id))), 0)
+
+    def test_count_without_filter(self):
+        self.assertEqual(self.repo.count(), 3)
+
+    def test_estimate_falls_back_to_exact_count(self):
+        self.assertEqual(self.repo.count(estimate=True), 3)
+        self.assertEqual(self.repo.count(filter_params=IdeaQO(author_id=UserID(self.author.id)), estimate=True), 3)
+
+    def test_exists_is_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(self.repo.exists(filter_params=IdeaQO(author_id=UserID(self.author.id))))
+        with self.assertNumQueries(1):
+            self.assertFalse(self.repo.exists(filter_params=IdeaQO(author_id=UserID(self.other_author.id))))
+
+    def test_annotated_repository_counts_rows(self):
+        chain_links = self.create_chain_links(2)
+        self.create_ideas(2, author=self.other_author, current_chain_link=chain_links[0])
+        repo = ChainLinkDjangoRepository(None)
+        self.assertEqual(repo.count(filter_params=ChainLinkQO(chain_id=self.chain.id)), 2)
+
+
+class TestAllMyIdeasPagination(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.create_chain_links(1)
+        self.create_ideas(AllMyIdeas.paginate_by + 1)
+        self.client.force_login(self.author)
+
+    def test_pages(self):
+        response = self.client.get(reverse('idea:my_ideas'))
+        self.assertEqual(len(response.context['ideas']), AllMyIdeas.paginate_by)
+        self.assertIsNotNone(response.context['next_cursor'])
+        response = self.client.get(reverse('idea:my_ideas'), {'after': response.context['next_cursor']})
+        self.assertEqual(len(response.context['ideas']), 1)
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('idea:my_ideas'), {'after': 'broken'})
+        self.assertEqual(response.status_code, 404)
+
+
+class TestIdeaView(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.create_chain_links(1)
+        self.idea = self.create_ideas(1)[0]
+        self.client.force_login(self.author)
+
+    def test_idea(self):
+        response = self.client.get(reverse('idea:idea', kwargs={'idea_uid': self.idea.idea_uid}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['idea'].idea_uid, self.idea.idea_uid)
+
+    def test_missing_idea(self):
+        response = self.client.get(reverse('idea:idea', kwargs={'idea_uid': str(uuid4())}))
+        self.assertEqual(response.status_code, 404)
+
+
+class TestDjangoRepositoryFetchPage(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ideas = self.create_ideas(7)
+        # Одинаковое время создания у части идей, порядок внутри них задает pk
+        created_at = Idea.objects.get(pk=self.ideas[0].pk).created_at
+        Idea.objects.filter(pk__in=[i.pk for i in self.ideas[2:5]]).update(created_at=created_at)
+        self.repo = IdeaRepository(None)
+
+    def read_all_pages(self, order_params: IdeaOO, limit: int) -> list[int]:
+        result = []
+        page = self.repo.fetch_page(order_params=order_params, limit=limit)
+        result.extend(i.idea_id for i in page.items)
+        while page.has_next:
+            page = self.repo.fetch_page(order_params=order_params, after=page.next_cursor, limit=limit)
+            result.extend(i.idea_id for i in page.items)
+        return result
+
+    def expected_ids(self, *order_fields: str) -> list[int]:
+        return list(Idea.objects.order_by(*order_fields).values_list('pk', flat=True))
+
+    def test_pages_cover_all_rows_in_order(self):
+        for limit in (1, 2, 3, 7, 10):
+            self.assertEqual(self.read_all_pages(IdeaOO(created_at=ASC()), limit), self.expected_ids('created_at', 'pk'))
+
+    def test_descending_order(self):
+        self.assertEqual(self.read_all_pages(IdeaOO(created_at=DESC()), 2), self.expected_ids('-created_at', '-pk'))
+
+    def test_page_is_single_query(self):
+        page = self.repo.fetch_page(order_params=IdeaOO(created_at=ASC()), limit=3)
+        with self.assertNumQueries(1):
+            self.repo.fetch_page(order_params=IdeaOO(created_at=ASC()), after=page.next_cursor, limit=3)
+
+    def test_filter_is_applied(self):
+        other_author = CustomUser.objects.create(username='other')
+        self.create_ideas(2, author=other_author)
+        page = self.repo.fetch_page(filter_params=IdeaQO(author_id=UserID(other_author.id)), limit=5)
+        self.assertEqual(len(page.items), 2)
+        self.assertFalse(page.has_next)
+
+    def test_cursor_from_another_ordering(self):
+        page = self.repo.fetch_page(order_params=IdeaOO(created_at=ASC()), limit=2)
+        with self.assertRaises(InvalidCursorException):
+            self.repo.fetch_page(order_params=IdeaOO(created_at=DESC()), after=page.next_cursor, limit=2)
+
+    def test_malformed_cursor(self):
+        with self.assertRaises(InvalidCursorException):
+            self.repo.fetch_page(after='not a cursor', limit=2)
+
+
+class TestIdeaUOWCommitUpdates(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.chain_links = self.create_chain_links(2)
+        self.create_ideas(1000, current_chain_link=self.chain_links[0])
+
+    def test_moving_ideas_is_batched(self):
+        uow = self.create_idea_uow()
+        with uow:
+            ideas = uow.fetch_ideas(IdeaQO(author_id=UserID(self.author.id)))
+            for idea in ideas:
+                idea.move_to_next_chain_link()
+                uow.add_idea_for_save(idea)
+            with CaptureQueriesContext(connection) as commit_queries:
+                uow.commit()
+        updates = [i['sql'] for i in commit_queries.captured_queries if i['sql'].startswith('UPDATE')]
+        self.assertTrue(0 < len(updates) < 10)
+        for sql in updates:
+            self.assertIn('"current_chain_link_id"', sql)
+            self.assertIn('"updated_at"', sql)
+            self.assertNotIn('"body"', sql)
+        self.assertEqual(Idea.objects.filter(current_chain_link=self.chain_links[1]).count(), 1000)
+        self.assertFalse(any(i.is_changed() for i in ideas))
+
+    def test_only_changed_ideas_are_written(self):
+        uow = self.create_idea_uow()
+        with uow:
+            ideas = uow.fetch_ideas(IdeaQO(author_id=UserID(self.author.id)), limit=2)
+            ideas[0].update(body='new body')
+            ideas[1].reject_idea()
+            uow.add_idea_for_save(ideas[0])
+            uow.add_idea_for_save(ideas[1])
+            with CaptureQueriesContext(connection) as commit_queries:
+                uow.commit()
+        updates = [i['sql'] for i in commit_queries.captured_queries if i['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(Idea.objects.get(pk=ideas[0].idea_id).body, 'new body')
+        self.assertEqual(Idea.objects.get(pk=ideas[1].idea_id).current_chain_link_id, self.reject_chain_link.id)
+
+
+class TestOptimisticLocking(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.chain_links = self.create_chain_links(2)
+        self.ideas = self.create_ideas(3, current_chain_link=self.chain_links[0])
+
+    def move_all_ideas(self, uow: IdeaUOW) -> list:
+        ideas = uow.fetch_ideas(IdeaQO(author_id=UserID(self.author.id)), IdeaOO(created_at=ASC()))
+        for idea in ideas:
+            idea.move_to_next_chain_link()
+            uow.add_idea_for_save(idea)
+        return ideas
+
+    def test_version_is_checked_and_incremented(self):
+        uow = self.create_idea_uow()
+        with uow:
+            ideas = self.move_all_ideas(uow)
+            versions = [i.get_version() for i in ideas]
+            with CaptureQueriesContext(connection) as commit_queries:
+                uow.commit()
+        updates = [i['sql'] for i in commit_queries.captured_queries if i['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"version" = ', updates[0].split('WHERE')[1])
+        self.assertEqual([i.get_version() for i in ideas], [i + 1 for i in versions])
+        self.assertEqual(
+            list(Idea.objects.order_by('created_at').values_list('version', flat=True)),
+            [i + 1 for i in versions]
+        )
+
+    def test_concurrent_change_raises_and_rolls_back(self):
+        uow = self.create_idea_uow()
+        with uow:
+            self.move_all_ideas(uow)
+            # Параллельный запрос успел изменить одну из идей
+            Idea.objects.filter(pk=self.ideas[1].pk).update(version=F('version') + 1)
+            with self.assertRaises(VersionConflictException) as e:
+                uow.commit()
+        self.assertEqual(e.exception.ids, [self.ideas[1].pk])
+        self.assertEqual(Idea.objects.filter(current_chain_link=self.chain_links[0]).count(), 3)
+
+    def test_deleted_row_is_conflict(self):
+        uow = self.create_idea_uow()
+        with uow:
+            self.move_all_ideas(uow)
+            Idea.objects.filter(pk=self.ideas[0].pk).delete()
+            with self.assertRaises(VersionConflictException) as e:
+                uow.commit()
+        self.assertEqual(e.exception.ids, [self.ideas[0].pk])
+
+    def test_same_row_twice_is_rejected(self):
+        uow = self.create_idea_uow()
+        with uow:
+            first = uow.fetch_idea(IdeaQO(idea_uid=self.ideas[0].idea_uid))
+        with uow:
+            second = uow.fetch_idea(IdeaQO(idea_uid=self.ideas[0].idea_uid))
+        for idea in (first, second):
+            idea.mark_changed('body')
+        with self.assertRaises(ValueError):
+            IdeaRepository(None).update_many([first, second])
+        self.assertEqual(Idea.objects.get(pk=self.ideas[0].pk).version, self.ideas[0].version)
+
+    def test_version_is_loaded_into_meta(self):
+        ChainLink.objects.filter(pk=self.chain_links[0].pk).update(version=5)
+        uow = self.create_idea_uow()
+        with uow:
+            idea = uow.fetch_idea(IdeaQO(idea_uid=self.ideas[0].idea_uid))
+            self.assertEqual(idea.get_version(), Idea.objects.get(pk=self.ideas[0].pk).version)
+            self.assertEqual(idea.current_chain_link.get_version(), 5)
+
+
+class TestIdeaUOWTransaction(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.chain_links = self.create_chain_links(2)
+        self.idea = self.create_ideas(1, current_chain_link=self.chain_links[0])[0]
+
+    def test_new_idea_gets_storage_id(self):
+        uow = self.create_idea_uow()
+        with uow:
+            new_idea = DomainIdea.initialize_new_idea(
+                author=uow.fetch_author(UserID(self.author.id)),
+                body='body',
+                chain=uow.fetch_chain(ChainID(self.chain.id)),
+                name='new'
+            )
+            uow.add_idea_for_save(new_idea)
+            uow.commit()
+        self.assertIsNotNone(new_idea.idea_id)
+        self.assertEqual(Idea.objects.get(pk=new_idea.idea_id).idea_uid, new_idea.idea_uid)
+
+    def test_failed_commit_rolls_back_whole_flush(self):
+        uow = self.create_idea_uow()
+        with self.assertRaises(VersionConflictException):
+            with uow:
+                idea = uow.fetch_idea(IdeaQO(idea_uid=self.idea.idea_uid))
+                new_idea = DomainIdea.initialize_new_idea(
+                    author=uow.fetch_author(UserID(self.author.id)),
+                    body='body',
+                    chain=idea.chain,
+                    name='new'
+                )
+                uow.add_idea_for_save(new_idea)
+                idea.move_to_next_chain_link()
+                uow.add_idea_for_save(idea)
+                Idea.objects.filter(pk=self.idea.pk).update(version=F('version') + 1)
+                uow.commit()
+        self.assertEqual(Idea.objects.count(), 1)
+
+    def test_not_committed_changes_are_not_written(self):
+        uow = self.create_idea_uow()
+        with uow:
+            idea = uow.fetch_idea(IdeaQO(idea_uid=self.idea.idea_uid))
+            idea.move_to_next_chain_link()
+            uow.add_idea_for_save(idea)
+        self.assertEqual(Idea.objects.get(pk=self.idea.pk).current_chain_link_id, self.chain_links[0].id)
+
+    def test_reads_do_not_open_transaction(self):
+        uow = self.create_idea_uow()
+        with CaptureQueriesContext(connection) as queries:
+            with uow:
+                uow.fetch_idea(IdeaQO(idea_uid=self.idea.idea_uid))
+                uow.commit()
+        self.assertFalse([i for i in queries.captured_queries if 'SAVEPOINT' in i['sql']])
+
+    def test_chain_can_not_be_registered(self):
+        chain_uow = self.create_chain_uow()
+        with chain_uow:
+            chains = chain_uow.fetch_chains(ChainQO(chain_id=ChainID(self.chain.id)))
+            # Звенья и цепочки пока не записываются, ошибка сразу при регистрации, а не внутри update_many
+            with self.assertRaises(ValueError):
+                chain_uow.register_dirty(chains[0])
+
+
+class TestCompiledQoTranslator(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.repo = ChainLinkDjangoRepository(None)
+
+    def test_translation(self):
+        self.assertEqual(
+            self.repo._qo_to_filter_params(ChainLinkQO(chain_id=IN(['1', 2]), chain_link_id=GTE('3'), is_deleted=False)),
+            Q(('id__gte', 3), ('chain_id__in', [1, 2]), ('is_deleted', False))
+        )
+
+    def test_translator_is_built_once(self):
+        translator = self.repo._get_qo_translator(ChainLinkQO)
+        self.assertIs(ChainLinkDjangoRepository(None)._get_qo_translator(ChainLinkQO), translator)
+        self.assertIsNot(IdeaRepository(None)._get_qo_translator(IdeaQO), translator)
+
+    def test_comparison_subclass_uses_parent_lookup(self):
+        class MyIN(IN):
+            pass
+
+        self.assertEqual(self.repo._qo_to_filter_params(ChainLinkQO(chain_id=MyIN([1]))), Q(chain_id__in=[1]))
+
+    def test_unknown_comparison(self):
+        class Unknown(QueryParamComparison):
+            pass
+
+        with self.assertRaises(TypeError):
+            self.repo._qo_to_filter_params(ChainLinkQO(chain_id=Unknown(1)))
+
+    def test_mapping_with_missing_qo_field(self):
+        with self.assertRaises(AttributeError):
+            CompiledQoTranslator(ChainLinkQO, [QoOrmMapperLine('id', 'idea_id')], ComparisonRegistry())
+
+
+class TestComparisonOperators(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ideas = self.create_ideas(5)
+        self.ids = [i.id for i in self.ideas]
+        now = timezone.now()
+        for days_ago, idea in zip(range(len(self.ideas), 0, -1), self.ideas):
+            Idea.objects.filter(id=idea.id).update(created_at=now - timedelta(days=days_ago))
+        self.repo = IdeaRepository(None)
+
+    def fetch_ids(self, **qo_kwargs) -> list[int]:
+        return [i.idea_id for i in self.repo.fetch_many(
+            filter_params=IdeaQO(author_id=UserID(self.author.id), **qo_kwargs),
+            order_params=IdeaOO(created_at=ASC())
+        )]
+
+    def test_ranges(self):
+        self.assertEqual(self.fetch_ids(idea_id=GT(self.ids[2])), self.ids[3:])
+        self.assertEqual(self.fetch_ids(idea_id=GTE(self.ids[2])), self.ids[2:])
+        self.assertEqual(self.fetch_ids(idea_id=LT(self.ids[2])), self.ids[:2])
+        self.assertEqual(self.fetch_ids(idea_id=LTE(self.ids[2])), self.ids[:3])
+        self.assertEqual(self.fetch_ids(idea_id=BETWEEN(self.ids[1], self.ids[3])), self.ids[1:4])
+
+    def test_not_in(self):
+        self.assertEqual(self.fetch_ids(idea_id=NOT_IN([self.ids[0], self.ids[4]])), self.ids[1:4])
+
+    def test_strings(self):
+        self.assertEqual(self.fetch_ids(name=STARTSWITH('idea 3')), [self.ids[3]])
+        self.assertEqual(self.fetch_ids(name=CONTAINS('ea 1')), [self.ids[1]])
+
+    def test_is_null(self):
+        ChainLink.objects.filter(id=self.accept_chain_link.id).update(actor=None)
+        repo = ChainLinkDjangoRepository(None)
+        chain_link_ids = [i.chain_link_id for i in repo.fetch_many(filter_params=ChainLinkQO(actor_id=IS_NULL()))]
+        self.assertIn(self.accept_chain_link.id, chain_link_ids)
+        self.assertEqual(list(repo.fetch_many(filter_params=ChainLinkQO(actor_id=IS_NULL(False)))), [])
+
+    def test_created_at_range(self):
+        created_at = [Idea.objects.get(id=i).created_at for i in self.ids]
+        self.assertEqual(self.fetch_ids(created_at=BETWEEN(created_at[1], created_at[2])), self.ids[1:3])
+        self.assertEqual(self.fetch_ids(created_at=GTE(created_at[3])), self.ids[3:])
+        self.assertEqual(self.repo.count(IdeaQO(updated_at=LT(created_at[0]))), 0)
+
+    def test_created_at_range_uses_index(self):
+        queryset = Idea.objects.filter(
+            self.repo._qo_to_filter_params(IdeaQO(author_id=UserID(self.author.id), created_at=GTE(timezone.now())))
+        )
+        self.assertIn('idea_idea_author__a2885a_idx', queryset.explain())
+
+    def test_custom_registry(self):
+        class EndsWith(QueryParamComparison[str]):
+            pass
+
+        class CustomIdeaRepository(IdeaRepository):
+            _comparison_registry = django_comparison_registry.copy()
+
+        CustomIdeaRepository._comparison_registry.register(EndsWith)(
+            lambda orm_field_name, modifier, val: (f'{orm_field_name}__endswith', modifier(val.value))
+        )
+        dtos = list(CustomIdeaRepository(None).fetch_many(filter_params=IdeaQO(name=EndsWith(' 4'))))
+        self.assertEqual([i.idea_id for i in dtos], [self.ids[4]])
+        self.assertNotIn(EndsWith, django_comparison_registry)
+
+
+class TestCompositeQueryObjects(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.other_author = CustomUser.objects.create(username='other')
+        self.my_ideas = self.create_ideas(2)
+        self.ideas_on_reject = self.create_ideas(2, author=self.other_author, current_chain_link=self.reject_chain_link)
+        self.other_ideas = self.create_ideas(2, author=self.other_author)
+        self.repo = IdeaRepository(None)
+
+    def fetch_ids(self, filter_params) -> set[int]:
+        return {i.idea_id for i in self.repo.fetch_many(filter_params=filter_params)}
+
+    def test_or_is_single_query(self):
+        filter_params = (
+            IdeaQO(current_chain_link_id=IN([self.reject_chain_link.id])) | IdeaQO(author_id=UserID(self.author.id))
+        )
+        with self.assertNumQueries(1):
+            ids = self.fetch_ids(filter_params)
+        self.assertEqual(ids, {i.id for i in self.my_ideas + self.ideas_on_reject})
+
+    def test_not(self):
+        self.assertEqual(
+            self.fetch_ids(~IdeaQO(author_id=UserID(self.author.id))),
+            {i.id for i in self.ideas_on_reject + self.other_ideas}
+        )
+
+    def test_nested(self):
+        filter_params = IdeaQO(author_id=UserID(self.other_author.id)) & ~(
+            IdeaQO(current_chain_link_id=self.reject_chain_link.id) | IdeaQO(idea_id=self.other_ideas[0].id)
+        )
+        self.assertEqual(self.fetch_ids(filter_params), {self.other_ideas[1].id})
+        self.assertEqual(self.repo.count(filter_params), 1)
+
+    def test_empty_operand(self):
+        all_ids = {i.id for i in self.my_ideas + self.ideas_on_reject + self.other_ideas}
+        self.assertEqual(self.fetch_ids(IdeaQO(idea_id=self.my_ideas[0].id) | IdeaQO()), all_ids)
+        self.assertEqual(self.fetch_ids(~IdeaQO()), set())
+
+
+@dataclass(slots=True)
+class IdeaNameDto:
+    idea_id: int
+    idea_uid: str
+    name: str
+
+
+class TestProjection(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ideas = self.create_ideas(3)
+        self.repo = IdeaRepository(None)
+
+    def test_only_projected_columns_are_selected(self):
+        with CaptureQueriesContext(connection) as context:
+            dtos = list(self.repo.fetch_many(
+                filter_params=IdeaQO(author_id=UserID(self.author.id)),
+                order_params=IdeaOO(created_at=ASC()),
+                projection=IdeaNameDto
+            ))
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('"body"', context.captured_queries[0]['sql'])
+        self.assertEqual([i.idea_id for i in dtos], [i.id for i in self.ideas])
+        self.assertIsInstance(dtos[0], IdeaNameDto)
+        self.assertEqual(dtos[0].idea_uid, self.ideas[0].idea_uid)
+        self.assertFalse(hasattr(dtos[0], '__dict__'))
+
+    def test_annotation_is_skipped_when_not_projected(self):
+        @dataclass
+        class ChainLinkIdDalDto:
+            chain_link_id: int
+
+        with CaptureQueriesContext(connection) as context:
+            list(ChainLinkDjangoRepository(None).fetch_many(projection=ChainLinkIdDalDto))
+        self.assertNotIn('GROUP BY', context.captured_queries[0]['sql'])
+
+    def test_not_dataclass(self):
+        with self.assertRaises(TypeError):
+            list(self.repo.fetch_many(projection=object))
+
+    def test_chain_choices(self):
+        chain_uow = self.create_chain_uow()
+        with self.assertNumQueries(1):
+            with chain_uow:
+                chain_ids = chain_uow.fetch_chain_ids(ChainQO(is_deleted=False))
+        self.assertEqual(chain_ids, [self.chain.id])
+
+
+class TestAsyncStack(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.chain_links = self.create_chain_links(3)
+
+    async def test_async_chain_is_built_like_sync(self):
+        uow = self.create_chain_uow()
+        async with uow:
+            chain = await uow.afetch_chain(ChainID(self.chain.id))
+            self.assertIs(await uow.afetch_chain(ChainID(self.chain.id)), chain)
+        self.assertEqual([i.chain_link_id for i in chain.chain_links], [i.id for i in self.chain_links])
+        self.assertEqual(chain.accept_chain_link.chain_link_id, self.accept_chain_link.id)
+        self.assertEqual(chain.reject_chain_link.chain_link_id, self.reject_chain_link.id)
+        self.assertEqual(chain.author.user_id, self.author.id)
+        self.assertEqual(
+            [[i.user_id for i in chain_link.actor.managers] for chain_link in chain.chain_links],
+            [[self.author.id]] * 3
+        )
+
+    async def test_async_deleted_technical_chain_links_are_loaded(self):
+        await ChainLink.objects.filter(
+            pk__in=[self.accept_chain_link.pk, self.reject_chain_link.pk]
+        ).aupdate(is_deleted=True)
+        uow = self.create_chain_uow()
+        async with uow:
+            chain = await uow.afetch_chain(ChainID(self.chain.id))
+        self.assertEqual(chain.accept_chain_link.chain_link_id, self.accept_chain_link.id)
+        self.assertEqual(chain.reject_chain_link.chain_link_id, self.reject_chain_link.id)
+
+    async def test_async_repository_streams_in_chunks(self):
+        await sync_to_async(self.create_ideas)(5)
+        repo = AsyncDjangoRepository(None, repository=IdeaRepository(None))
+        idea_qo = IdeaQO(author_id=UserID(self.author.id))
+        ideas = [i async for i in repo.fetch_many(filter_params=idea_qo, order_params=IdeaOO(created_at=ASC()), chunk_size=2)]
+        expected = await sync_to_async(lambda: [i.idea_id for i in IdeaRepository(None).fetch_many(
+            filter_params=idea_qo, order_params=IdeaOO(created_at=ASC())
+        )])()
+        self.assertEqual([i.idea_id for i in ideas], expected)
+        self.assertEqual(await repo.count(idea_qo), 5)
+        self.assertTrue(await repo.exists(idea_qo))
+        self.assertEqual((await repo.fetch_one(idea_qo, IdeaOO(created_at=ASC()))).idea_id, expected[0])
+        projection = [i async for i in repo.fetch_many(filter_params=idea_qo, projection=IdeaNameDto)]
+        self.assertEqual(sorted(i.idea_id for i in projection), sorted(expected))
+
+    async def test_async_repository_closes_cursor_on_break(self):
+        await sync_to_async(self.create_ideas)(5)
+        closed = []
+        iterator = QuerySet.iterator
+
+        def tracked_iterator(queryset, *args, **kwargs):
+            try:
+                yield from iterator(queryset, *args, **kwargs)
+            finally:
+                closed.append(True)
+
+        repo = AsyncDjangoRepository(None, repository=IdeaRepository(None))
+        with patch.object(QuerySet, 'iterator', tracked_iterator):
+            async with aclosing(repo.fetch_many(chunk_size=2)) as ideas:
+                async for _ in ideas:
+                    break
+        self.assertEqual(closed, [True])
+
+    async def test_async_repository_streams_and_closes_non_orm_result(self):
+        read, closed = [], []
+
+        class StreamRepository:
+
+            def __init__(self, session):
+                pass
+
+            def fetch_many(self, *args, **kwargs):
+                def rows():
+                    try:
+                        for i in range(10):
+                            read.append(i)
+                            yield i
+                    finally:
+                        closed.append(True)
+                return DBResultGenerator(rows(), cache_size=kwargs['cache_size'])
+
+        repo = AsyncDjangoRepository(None, repository=StreamRepository(None))
+        async with aclosing(repo.fetch_many(chunk_size=2)) as rows:
+            async for row in rows:
+                break
+        self.assertEqual(row, 0)
+        self.assertEqual(read, [0, 1])
+        self.assertEqual(closed, [True])
+
+    async def test_async_repository_over_non_orm_repository(self):
+        repo = AsyncDjangoRepository(None, repository=CachedActorRepository(None))
+        actors = [i async for i in repo.fetch_many(filter_params=ActorQO(actor_id=IN([i.actor_id for i in self.chain_links])))]
+        self.assertEqual(len(actors), 3)
+
+    async def fetch_and_delete_idea(self, uow: IdeaUOW, commit: bool) -> Idea:
+        idea = (await sync_to_async(self.create_ideas)(1))[0]
+        async with uow:
+            domain_idea = await sync_to_async(uow.fetch_idea)(IdeaQO(idea_uid=idea.idea_uid))
+            uow.register_deleted(domain_idea)
+            if commit:
+                await uow.acommit()
+        return await Idea.objects.aget(id=idea.id)
+
+    async def test_async_commit(self):
+        idea = await self.fetch_and_delete_idea(self.create_idea_uow(), commit=True)
+        self.assertTrue(idea.is_deleted)
+
+    async def test_async_rollback_on_exit(self):
+        idea = await self.fetch_and_delete_idea(self.create_idea_uow(), commit=False)
+        self.assertFalse(idea.is_deleted)
+
+
+class TestChainChoices(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.chain_case = ChainCase(uow_cls=self.create_chain_uow)
+
+    def create_chain(self) -> Chain:
+        return Chain.objects.create(
+            author=self.author,
+            accept_chain_link=self.accept_chain_link,
+            reject_chain_link=self.reject_chain_link
+        )
+
+    def test_choices_are_cached(self):
+        with self.assertNumQueries(1):
+            choices = self.chain_case.fetch_chain_choices()
+        self.assertEqual(choices, [(self.chain.id, f'Chain: {self.chain.id}')])
+        with self.assertNumQueries(0):
+            self.assertEqual(ChainCase(uow_cls=self.create_chain_uow).fetch_chain_choices(), choices)
+
+    def test_orm_changes_invalidate_choices(self):
+        self.chain_case.fetch_chain_choices()
+        with self.captureOnCommitCallbacks(execute=True):
+            new_chain = self.create_chain()
+        self.assertIn(new_chain.id, dict(self.chain_case.fetch_chain_choices()))
+        with self.captureOnCommitCallbacks(execute=True):
+            new_chain.delete()
+        self.assertNotIn(new_chain.id, dict(self.chain_case.fetch_chain_choices()))
+
+    def test_choices_are_kept_until_commit(self):
+        choices = self.chain_case.fetch_chain_choices()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_chain()
+            self.assertEqual(self.chain_case.fetch_chain_choices(), choices)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_create_form_choices(self):
+        self.create_chain()
+        form = IdeaCreate.CreateIdeaForm()
+        self.assertEqual(form.fields['chain_id'].choices, self.chain_case.fetch_chain_choices())
+
+
+class TestCachedActorRepository(IdeaExchangeDBTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.chain_links = self.create_chain_links(2)
+        self.actor = self.chain_links[0].actor
+        self.repo = CachedActorRepository(None)
+
+    def test_reads_are_served_from_cache(self):
+        with self.assertNumQueries(3):
+            dto = self.repo.fetch_one(ActorQO(actor_id=ActorID(self.actor.id)))
+        self.assertEqual(dto.manager_ids, [self.author.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedActorRepository(None).fetch_one(ActorQO(actor_id=ActorID(self.actor.id))), dto)
+
+    def test_orm_changes_invalidate(self):
+        self.repo.fetch_one(ActorQO(actor_id=ActorID(self.actor.id)))
+        other_user = CustomUser.objects.create(username='other')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.actor.managers.add(other_user)
+        dto = self.repo.fetch_one(ActorQO(actor_id=ActorID(self.actor.id)))
+        self.assertEqual(set(dto.manager_ids), {self.author.id, other_user.id})
@@ -1,10 +1,11 @@
 from django import forms
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, Http404
 from django.urls import reverse
 from django.views.generic import TemplateView, FormView
 
 from app.cases.idea_exchange.idea import IdeaCase, ChainCase
+from app.exceptions.orm import InvalidCursorException
 
 
 class IndexView(TemplateView):
@@ -17,11 +18,21 @@ class IndexView(TemplateView):
 class AllMyIdeas(LoginRequiredMixin, TemplateView):
 
     template_name = 'my_ideas.html'
+    paginate_by = 20
 
     def get_context_data(self, **kwargs):
         ctx = super(AllMyIdeas, self).get_context_data(**kwargs)
         case = IdeaCase()
-        ctx['ideas'] = case.user_ideas(author_id=self.request.user.id)
+        try:
+            page = case.user_ideas_page(
+                author_id=self.request.user.id,
+                after=self.request.GET.get('after'),
+                limit=self.paginate_by
+            )
+        except InvalidCursorException:
+            raise Http404('Invalid cursor')
+        ctx['ideas'] = page.items
+        ctx['next_cursor'] = page.next_cursor
         return ctx
 
 class IdeaView(LoginRequiredMixin, TemplateView):
@@ -32,7 +43,10 @@ class IdeaView(LoginRequiredMixin, TemplateView):
         def get_context_data(self, **kwargs):
             ctx = super(IdeaView, self).get_context_data(**kwargs)
             case = IdeaCase()
-            ctx['idea'] = case.fetch_idea(idea_uid=kwargs['idea_uid'])
+            idea = case.fetch_idea(idea_uid=kwargs['idea_uid'])
+            if idea is None:
+                raise Http404('Idea not found')
+            ctx['idea'] = idea
             return ctx
 
 class IdeaCreate(LoginRequiredMixin, FormView):
@@ -47,9 +61,7 @@ class IdeaCreate(LoginRequiredMixin, FormView):
         def __init__(self, *args, model_instance=None, **kwargs):
             super().__init__(*args, **kwargs)
             chain_case = ChainCase()
-            self.fields['chain_id'].choices = [
-                (i.chain_id, f'Chain: {i.chain_id}') for i in chain_case.fetch_allowed_chains()
-            ]
+            self.fields['chain_id'].choices = chain_case.fetch_chain_choices()
 
 
 
@@ -79,6 +91,4 @@ class IdeaUpdate(LoginRequiredMixin, FormView):
         def __init__(self, *args, model_instance=None, **kwargs):
             super().__init__(*args, **kwargs)
             chain_case = ChainCase()
-            self.fields['chain_id'].choices = [
-                (i.chain_id, f'Chain: {i.chain_id}') for i in chain_case.fetch_allowed_chains()
-            ]
\ No newline at end of file
+            self.fields['chain_id'].choices = chain_case.fetch_chain_choices()
\ No newline at end of file
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -119,6 +120,16 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
 STATIC_URL = 'static/'
+
+# По умолчанию locmem, он у каждого процесса свой: сброс кеша после записи в одном воркере
+# остальные не видят. При нескольких воркерах задается общий сетевой бекенд, например
+# SZ_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache SZ_CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('SZ_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SZ_CACHE_LOCATION', ''),
+    }
+}
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]